@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the Toggl MCP server
+
+Run with ``python -m benchmarks.run --help``. The real TogglClient and tool
+functions run against the in-memory Toggl stub from benchmarks/stub.py.
+"""
@@ -0,0 +1,243 @@
+"""
+Benchmark runner: per-tool throughput and latency percentiles
+
+Example:
+    python -m benchmarks.run --latency 0.02 --jitter 0.01 --iterations 200 \\
+        --concurrency 10 --compare benchmarks/results/baseline.json
+
+Results are written as JSON to benchmarks/results/ (or --output) so runs can
+be compared with --compare.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from toggl_mcp import main
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+from .workloads import WORKLOADS, BenchContext, Workload
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+    return samples[index]
+
+
+async def bench_workload(
+    workload: Workload,
+    ctx: BenchContext,
+    iterations: int,
+    concurrency: int,
+    warmup: int
+) -> Dict[str, Any]:
+    """Run one workload and summarize its latencies"""
+    for i in range(warmup):
+        await workload.call(ctx, i)
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(warmup, warmup + iterations))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                result = await workload.call(ctx, i)
+                if isinstance(result, dict) and "error" in result:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    upstream_before = sum(ctx.stub.calls.values())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    upstream = sum(ctx.stub.calls.values()) - upstream_before
+
+    latencies.sort()
+    ms = 1000.0
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(len(latencies) / wall, 1) if wall else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * ms, 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 0.50) * ms, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * ms, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * ms, 3),
+        "max_ms": round(latencies[-1] * ms, 3) if latencies else None,
+        "upstream_requests_per_call": round(upstream / len(latencies), 2) if latencies else None,
+    }
+
+
+async def run_benchmarks(
+    tools: Optional[Sequence[str]] = None,
+    iterations: int = 100,
+    concurrency: int = 1,
+    warmup: int = 5,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    padding: int = 0,
+    entries: int = 500,
+    projects: int = 20,
+    cache_ttl: Optional[float] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Benchmark tools against a fresh stub
+
+    Args:
+        tools: Workload names (all by default)
+        iterations: Measured calls per tool
+        concurrency: Calls in flight at once
+        warmup: Unmeasured calls per tool before measuring
+        latency: Stub base latency per request, seconds
+        jitter: Extra uniform random stub latency per request, seconds
+        padding: Filler characters per seeded project and time entry
+        entries: Time entries to seed
+        projects: Projects to seed
+        cache_ttl: Reference data cache TTL (client default if None, 0 disables)
+        seed: Random seed for jitter
+    """
+    names = list(tools or WORKLOADS)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        raise ValueError(f"Unknown workloads: {', '.join(unknown)}")
+
+    stub = TogglStub(latency=latency, jitter=jitter, projects=projects, seed=seed, padding=padding)
+    ctx = BenchContext(
+        stub=stub,
+        entry_ids=[e["id"] for e in stub.seed_time_entries(entries)],
+        project_ids=list(stub.projects),
+    )
+    client = stub.client(cache_ttl=cache_ttl)
+    previous = main.toggl_client, main.default_workspace_id
+    main.toggl_client, main.default_workspace_id = client, WORKSPACE_ID
+    try:
+        results = {}
+        for name in names:
+            results[name] = await bench_workload(WORKLOADS[name], ctx, iterations, concurrency, warmup)
+    finally:
+        main.toggl_client, main.default_workspace_id = previous
+        await client.close()
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "latency": latency,
+            "jitter": jitter,
+            "padding": padding,
+            "entries": entries,
+            "projects": projects,
+            "cache_ttl": cache_ttl,
+            "seed": seed,
+        },
+        "tools": results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Render results as a table, with relative change against a baseline run"""
+    header = f"{'tool':34} {'calls/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/call':>9} {'errors':>7}"
+    lines = [header, "-" * len(header)]
+    for name, row in results["tools"].items():
+        line = (
+            f"{name:34} {row['throughput_per_s']:>10} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+            f"{row['p99_ms']:>9} {row['upstream_requests_per_call']:>9} {row['errors']:>7}"
+        )
+        base = (baseline or {}).get("tools", {}).get(name)
+        if base:
+            changes = []
+            for key, label in (("throughput_per_s", "calls/s"), ("p50_ms", "p50"), ("p99_ms", "p99")):
+                if base.get(key):
+                    changes.append(f"{label} {(row[key] - base[key]) / base[key]:+.0%}")
+            line += "   (" + ", ".join(changes) + ")"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def run():
+    """Command line entry point"""
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--tools", nargs="*", help=f"Workloads to run (default: all). One of: {', '.join(WORKLOADS)}")
+    arg_parser.add_argument("--iterations", type=int, default=100, help="Measured calls per tool")
+    arg_parser.add_argument("--concurrency", type=int, default=1, help="Calls in flight at once")
+    arg_parser.add_argument("--warmup", type=int, default=5, help="Unmeasured calls per tool")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Stub latency per request, seconds")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency, seconds")
+    arg_parser.add_argument("--padding", type=int, default=0, help="Filler characters per record (payload size)")
+    arg_parser.add_argument("--entries", type=int, default=500, help="Time entries to seed")
+    arg_parser.add_argument("--projects", type=int, default=20, help="Projects to seed")
+    arg_parser.add_argument("--cache-ttl", type=float, help="Reference data cache TTL (0 disables)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed for jitter")
+    arg_parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    arg_parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = arg_parser.parse_args()
+    # Per-request INFO logs would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        results = asyncio.run(run_benchmarks(
+            tools=args.tools,
+            iterations=args.iterations,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            latency=args.latency,
+            jitter=args.jitter,
+            padding=args.padding,
+            entries=args.entries,
+            projects=args.projects,
+            cache_ttl=args.cache_ttl,
+            seed=args.seed,
+        ))
+    except ValueError as e:
+        arg_parser.error(str(e))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_report(results, baseline))
+    print(f"\nResults written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    run()
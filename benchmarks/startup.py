@@ -0,0 +1,184 @@
+"""
+Cold-start benchmark: import time and time to a usable stdio server
+
+Example:
+    python -m benchmarks.startup --runs 10
+
+Two measurements, each repeated and reported as the median:
+
+* imports: ``python -X importtime -c "import toggl_mcp.main"``, split into the
+  time spent in toggl_mcp's own modules (including tool registration) and the
+  largest third-party imports
+* handshake: spawning ``python -m toggl_mcp`` until the initialize response,
+  and until the first tools/list response (which builds the tool schemas)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from .stdio_load import REPO_ROOT, StdioClient
+
+# Modules that must stay off the start-up path; they are imported on first use
+DEFERRED_MODULES = (
+    "dateutil.parser",
+    "pytz",
+    "tracemalloc",
+    "cProfile",
+    "toggl_mcp.cassette",
+    "toggl_mcp.exporters",
+    "toggl_mcp.faults",
+    "toggl_mcp.profiling",
+)
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """Parse -X importtime output into {module: (self_us, cumulative_us)}"""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_imports(module: str = "toggl_mcp.main") -> Dict[str, Tuple[int, int]]:
+    """Import module in a fresh interpreter and return its import times"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+    )
+    return parse_importtime(result.stderr)
+
+
+def summarize_imports(modules: Dict[str, Tuple[int, int]], package: str = "toggl_mcp") -> Dict[str, Any]:
+    """Total, own-package and top third-party import times in milliseconds"""
+    own = sum(self_us for name, (self_us, _) in modules.items() if name.split(".")[0] == package)
+    total = sum(self_us for self_us, _ in modules.values())
+    return {
+        "total_ms": round(total / 1000, 2),
+        "own_ms": round(own / 1000, 2),
+        "modules": len(modules),
+        "deferred_imported": [name for name in DEFERRED_MODULES if name in modules],
+    }
+
+
+def top_imports(modules: Dict[str, Tuple[int, int]], limit: int = 10) -> List[Tuple[str, float]]:
+    """Top-level packages by cumulative import time, in milliseconds"""
+    packages: Dict[str, int] = {}
+    for name, (_, cumulative_us) in modules.items():
+        root = name.split(".")[0]
+        packages[root] = max(packages.get(root, 0), cumulative_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [(name, round(us / 1000, 2)) for name, us in ranked]
+
+
+async def measure_handshake() -> Dict[str, float]:
+    """Spawn the stdio server and time the handshake and first tools/list"""
+    env = {
+        **os.environ,
+        "TOGGL_API_TOKEN": "startup-benchmark",
+        # Neither request reaches the Toggl API
+        "TOGGL_API_BASE_URL": "http://127.0.0.1:9/api/v9",
+        "TOGGL_MCP_TRANSPORT": "stdio",
+    }
+    spawned = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "toggl_mcp",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        cwd=REPO_ROOT,
+        env=env,
+    )
+    client = StdioClient(process)
+    try:
+        await client.request("initialize", {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "toggl-mcp-startup", "version": "1.0"},
+        })
+        initialized = time.perf_counter()
+        await client.notify("notifications/initialized")
+        response, _, _ = await client.request("tools/list")
+        listed = time.perf_counter()
+    finally:
+        await client.close()
+    return {
+        "initialize_ms": round((initialized - spawned) * 1000, 2),
+        "tools_list_ms": round((listed - spawned) * 1000, 2),
+        "tools": len(response["result"]["tools"]),
+    }
+
+
+def run_startup(runs: int = 5) -> Dict[str, Any]:
+    """Repeat both measurements and report medians"""
+    imports = [measure_imports() for _ in range(runs)]
+    summaries = [summarize_imports(modules) for modules in imports]
+    handshakes = [asyncio.run(measure_handshake()) for _ in range(runs)]
+
+    def median(rows: List[Dict[str, Any]], key: str) -> float:
+        return round(statistics.median(row[key] for row in rows), 2)
+
+    return {
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "imports": {
+            "total_ms": median(summaries, "total_ms"),
+            "own_ms": median(summaries, "own_ms"),
+            "modules": summaries[-1]["modules"],
+            "deferred_imported": summaries[-1]["deferred_imported"],
+            "top": top_imports(imports[-1]),
+        },
+        "handshake": {
+            "initialize_ms": median(handshakes, "initialize_ms"),
+            "tools_list_ms": median(handshakes, "tools_list_ms"),
+            "tools": handshakes[-1]["tools"],
+        },
+    }
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    imports, handshake = results["imports"], results["handshake"]
+    lines = [
+        f"Median of {results['runs']} runs, Python {results['python']}",
+        f"import toggl_mcp.main   {imports['total_ms']:>8} ms total, {imports['own_ms']} ms in toggl_mcp "
+        f"({imports['modules']} modules)",
+        f"initialize response     {handshake['initialize_ms']:>8} ms after spawn",
+        f"tools/list response     {handshake['tools_list_ms']:>8} ms after spawn ({handshake['tools']} tools)",
+        "",
+        "Slowest imports (cumulative ms):",
+    ]
+    lines.extend(f"  {name:28} {ms:>8}" for name, ms in imports["top"])
+    if imports["deferred_imported"]:
+        lines.append(f"\nImported at start-up but meant to be deferred: {', '.join(imports['deferred_imported'])}")
+    return "\n".join(lines)
+
+
+def run():
+    """Command line entry point"""
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup", description=__doc__.strip().splitlines()[0]
+    )
+    arg_parser.add_argument("--runs", type=int, default=5, help="Repetitions of each measurement")
+    arg_parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = arg_parser.parse_args()
+
+    results = run_startup(args.runs)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,440 @@
+"""
+Stdio JSON-RPC load generator for the whole server
+
+Spawns ``python -m toggl_mcp`` on real stdio pipes, pointed at the Toggl stub
+served over local HTTP, performs the MCP handshake and drives concurrent
+tools/call requests with a weighted tool mix.
+
+Example:
+    python -m benchmarks.stdio_load --requests 2000 --concurrency 16 \\
+        --mix toggl_get_user=2,toggl_list_time_entries=1 --latency 0.01
+
+Besides end-to-end latency, throughput and server RSS, the report isolates
+the cost of the stdio path itself:
+
+* ping: round trip of an MCP ping, the framing and dispatch floor
+* per tool, measured sequentially before the load phase: end-to-end latency
+  minus the time the stub spent answering upstream requests (server
+  overhead), response size, and the time the client spent decoding it
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+from .run import RESULTS_DIR, _git_commit, percentile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "toggl_get_user=2,toggl_list_projects=3,toggl_list_time_entries=2,toggl_get_current_timer=2,toggl_create_time_entry=1"
+
+# Arguments for tools that need them; other tools are called without arguments
+TOOL_ARGUMENTS: Dict[str, Dict[str, Any]] = {
+    "toggl_list_time_entries": {"start_date": "2024-01-01T00:00:00Z", "end_date": "2030-01-01T00:00:00Z"},
+    "toggl_create_time_entry": {
+        "description": "Load test", "start": "2024-03-01T09:00:00", "stop": "2024-03-01T10:00:00",
+        "user_timezone": "Europe/Berlin",
+    },
+    "toggl_start_timer": {"description": "Load test"},
+    "toggl_create_tag": {"name": "load-test"},
+}
+
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    """Parse "tool=weight,tool=weight" (weight defaults to 1)"""
+    parsed = []
+    for item in filter(None, (part.strip() for part in mix.split(","))):
+        name, _, weight = item.partition("=")
+        parsed.append((name, float(weight) if weight else 1.0))
+    if not parsed:
+        raise ValueError("Empty tool mix")
+    return parsed
+
+
+def _rss_kb(pid: int, field: str = "VmRSS") -> Optional[int]:
+    """Resident memory of a process in KiB, from /proc (None where unavailable)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class StdioClient:
+    """Minimal newline-delimited JSON-RPC client on a subprocess's stdio
+
+    Records bytes and client-side encode/decode time for every message so the
+    framing and serialization costs can be reported.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader = asyncio.create_task(self._read())
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.encode_time = 0.0
+        self.decode_time = 0.0
+
+    async def _read(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            started = time.perf_counter()
+            message = json.loads(line)
+            decode = time.perf_counter() - started
+            self.decode_time += decode
+            self.bytes_received += len(line)
+            future = self._pending.pop(message.get("id"), None)
+            if future and not future.done():
+                future.set_result((message, len(line), decode))
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Server closed stdout"))
+
+    async def _write(self, message: Dict[str, Any]):
+        started = time.perf_counter()
+        line = (json.dumps(message) + "\n").encode()
+        self.encode_time += time.perf_counter() - started
+        self.bytes_sent += len(line)
+        self.process.stdin.write(line)
+        await self.process.stdin.drain()
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], int, float]:
+        """Send a request and wait for its response
+
+        Returns:
+            (response message, response size in bytes, client decode seconds)
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._write(message)
+        return await future
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._write(message)
+
+    async def close(self):
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        self._reader.cancel()
+
+
+def _is_error(response: Dict[str, Any]) -> bool:
+    if "error" in response:
+        return True
+    result = response.get("result", {})
+    if result.get("isError"):
+        return True
+    # Tools report failures as an {"error": ...} result
+    content = result.get("content") or []
+    if len(content) == 1 and content[0].get("type") == "text":
+        text = content[0].get("text", "")
+        return text.startswith('{"error"') or text.startswith('{\n  "error"')
+    return False
+
+
+async def run_load(
+    requests: int = 1000,
+    concurrency: int = 8,
+    mix: str = DEFAULT_MIX,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    padding: int = 0,
+    entries: int = 200,
+    calibration: int = 20,
+    pings: int = 200,
+    seed: int = 0,
+    server_log: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the stub, spawn the server over stdio and load it
+
+    Args:
+        requests: tools/call requests in the load phase
+        concurrency: Requests in flight at once
+        mix: Weighted tool mix, "tool=weight,..."
+        latency: Stub latency per upstream request, seconds
+        jitter: Extra random stub latency, seconds
+        padding: Filler characters per seeded record (payload size)
+        entries: Time entries seeded in the stub
+        calibration: Sequential calls per tool used to isolate server overhead
+        pings: Sequential pings measuring the framing floor
+        seed: Random seed for the mix and jitter
+        server_log: File receiving the server's stderr (discarded if None)
+    """
+    tools = parse_mix(mix)
+    rng = random.Random(seed)
+
+    stub = TogglStub(latency=latency, jitter=jitter, projects=20, seed=seed, padding=padding)
+    stub.seed_time_entries(entries)
+    stub_server = uvicorn.Server(uvicorn.Config(
+        stub.asgi_app(), host="127.0.0.1", port=0, log_level="warning", lifespan="off"
+    ))
+    serving = asyncio.create_task(stub_server.serve())
+    while not stub_server.started:
+        await asyncio.sleep(0.01)
+    port = stub_server.servers[0].sockets[0].getsockname()[1]
+
+    env = {
+        **os.environ,
+        "TOGGL_API_TOKEN": "stub-token",
+        "TOGGL_API_BASE_URL": f"http://127.0.0.1:{port}/api/v9",
+        "TOGGL_WORKSPACE_ID": str(WORKSPACE_ID),
+        "TOGGL_MCP_TRANSPORT": "stdio",
+    }
+    log = open(server_log, "w") if server_log else None
+    spawned = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "toggl_mcp",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=log or asyncio.subprocess.DEVNULL,
+        cwd=REPO_ROOT,
+        env=env,
+        limit=1 << 26,
+    )
+    client = StdioClient(process)
+    try:
+        await client.request("initialize", {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "toggl-mcp-load", "version": "1.0"},
+        })
+        await client.notify("notifications/initialized")
+        startup_ms = (time.perf_counter() - spawned) * 1000
+        rss_idle = _rss_kb(process.pid)
+
+        # Framing floor: ping involves no tool code and no upstream request
+        ping_latencies = []
+        for _ in range(pings):
+            started = time.perf_counter()
+            await client.request("ping")
+            ping_latencies.append(time.perf_counter() - started)
+        ping_latencies.sort()
+
+        # Sequential calibration: end-to-end time minus upstream service time
+        breakdown = {}
+        for name, _ in tools:
+            e2e, upstream, sizes, decode = [], [], [], []
+            for _ in range(calibration + 1):
+                service_before = stub.service_time
+                started = time.perf_counter()
+                response, size, decode_s = await client.request(
+                    "tools/call", {"name": name, "arguments": TOOL_ARGUMENTS.get(name, {})}
+                )
+                elapsed = time.perf_counter() - started
+                if "error" in response:
+                    raise RuntimeError(f"{name} failed: {response['error']}")
+                e2e.append(elapsed)
+                upstream.append(stub.service_time - service_before)
+                sizes.append(size)
+                decode.append(decode_s)
+            # The first call warms caches and connections
+            e2e, upstream, sizes, decode = e2e[1:], upstream[1:], sizes[1:], decode[1:]
+            n = len(e2e)
+            overhead = sorted(max(0.0, a - b) for a, b in zip(e2e, upstream))
+            breakdown[name] = {
+                "e2e_p50_ms": round(sorted(e2e)[n // 2] * 1000, 3),
+                "upstream_ms": round(sum(upstream) / n * 1000, 3),
+                "server_overhead_p50_ms": round(overhead[n // 2] * 1000, 3),
+                "response_bytes": int(sum(sizes) / n),
+                "client_decode_us": round(sum(decode) / n * 1e6, 1),
+            }
+
+        # Load phase
+        names = [name for name, _ in tools]
+        weights = [weight for _, weight in tools]
+        plan = rng.choices(names, weights=weights, k=requests)
+        queue = iter(plan)
+        latencies: Dict[str, List[float]] = {name: [] for name in names}
+        errors: Dict[str, int] = {name: 0 for name in names}
+        rss_peak = rss_idle or 0
+        bytes_before = client.bytes_received
+
+        async def worker():
+            for name in queue:
+                started = time.perf_counter()
+                try:
+                    response, _, _ = await client.request(
+                        "tools/call", {"name": name, "arguments": TOOL_ARGUMENTS.get(name, {})}
+                    )
+                    if _is_error(response):
+                        errors[name] += 1
+                except ConnectionError:
+                    errors[name] += 1
+                latencies[name].append(time.perf_counter() - started)
+
+        async def sample_rss():
+            nonlocal rss_peak
+            while True:
+                rss_peak = max(rss_peak, _rss_kb(process.pid) or 0)
+                await asyncio.sleep(0.05)
+
+        sampler = asyncio.create_task(sample_rss())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        sampler.cancel()
+        rss_end = _rss_kb(process.pid)
+    finally:
+        await client.close()
+        if log:
+            log.close()
+        stub_server.should_exit = True
+        await serving
+
+    all_latencies = sorted(itertools.chain.from_iterable(latencies.values()))
+    ms = 1000.0
+    per_tool = {}
+    for name in names:
+        samples = sorted(latencies[name])
+        per_tool[name] = {
+            "calls": len(samples),
+            "errors": errors[name],
+            "p50_ms": round(percentile(samples, 0.50) * ms, 3),
+            "p95_ms": round(percentile(samples, 0.95) * ms, 3),
+            "p99_ms": round(percentile(samples, 0.99) * ms, 3),
+        }
+
+    return {
+        "timestamp": datetime.now().astimezone().isoformat(),
+        "commit": _git_commit(),
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "mix": mix,
+            "latency": latency,
+            "jitter": jitter,
+            "padding": padding,
+            "entries": entries,
+            "seed": seed,
+        },
+        "startup_ms": round(startup_ms, 1),
+        "ping": {
+            "p50_ms": round(percentile(ping_latencies, 0.50) * ms, 3),
+            "p99_ms": round(percentile(ping_latencies, 0.99) * ms, 3),
+        },
+        "breakdown": breakdown,
+        "load": {
+            "wall_s": round(wall, 3),
+            "throughput_per_s": round(len(all_latencies) / wall, 1),
+            "p50_ms": round(percentile(all_latencies, 0.50) * ms, 3),
+            "p95_ms": round(percentile(all_latencies, 0.95) * ms, 3),
+            "p99_ms": round(percentile(all_latencies, 0.99) * ms, 3),
+            "response_mb": round((client.bytes_received - bytes_before) / 2 ** 20, 2),
+            "tools": per_tool,
+        },
+        "rss_kb": {"idle": rss_idle, "peak": rss_peak or None, "end": rss_end},
+        "client": {
+            "bytes_sent": client.bytes_sent,
+            "bytes_received": client.bytes_received,
+            "encode_ms": round(client.encode_time * 1000, 1),
+            "decode_ms": round(client.decode_time * 1000, 1),
+        },
+    }
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    """Render load results as text"""
+    load = results["load"]
+    rss = results["rss_kb"]
+    lines = [
+        f"startup {results['startup_ms']} ms, ping p50 {results['ping']['p50_ms']} ms "
+        f"(framing floor), p99 {results['ping']['p99_ms']} ms",
+        "",
+        f"{'sequential':34} {'e2e p50':>9} {'upstream':>9} {'overhead':>9} {'resp KiB':>9} {'decode us':>10}",
+    ]
+    for name, row in results["breakdown"].items():
+        lines.append(
+            f"{name:34} {row['e2e_p50_ms']:>9} {row['upstream_ms']:>9} {row['server_overhead_p50_ms']:>9} "
+            f"{row['response_bytes'] / 1024:>9.1f} {row['client_decode_us']:>10}"
+        )
+    lines += [
+        "",
+        f"load: {load['throughput_per_s']} calls/s over {load['wall_s']} s, "
+        f"p50 {load['p50_ms']} ms, p95 {load['p95_ms']} ms, p99 {load['p99_ms']} ms, "
+        f"{load['response_mb']} MiB of responses",
+        f"{'tool':34} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}",
+    ]
+    for name, row in load["tools"].items():
+        lines.append(
+            f"{name:34} {row['calls']:>7} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['errors']:>7}"
+        )
+    lines += ["", f"server RSS: idle {rss['idle']} KiB, peak {rss['peak']} KiB, end {rss['end']} KiB"]
+    return "\n".join(lines)
+
+
+def run():
+    """Command line entry point"""
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.stdio_load", description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--requests", type=int, default=1000, help="tools/call requests in the load phase")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    arg_parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted tool mix, tool=weight,...")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Stub latency per request, seconds")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub latency, seconds")
+    arg_parser.add_argument("--padding", type=int, default=0, help="Filler characters per record (payload size)")
+    arg_parser.add_argument("--entries", type=int, default=200, help="Time entries to seed")
+    arg_parser.add_argument("--calibration", type=int, default=20, help="Sequential calls per tool for the overhead breakdown")
+    arg_parser.add_argument("--pings", type=int, default=200, help="Sequential pings for the framing floor")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed for the mix and jitter")
+    arg_parser.add_argument("--server-log", help="File receiving the server's stderr")
+    arg_parser.add_argument("--output", help="Result file (default: benchmarks/results/stdio-<timestamp>.json)")
+    args = arg_parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        results = asyncio.run(run_load(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            mix=args.mix,
+            latency=args.latency,
+            jitter=args.jitter,
+            padding=args.padding,
+            entries=args.entries,
+            calibration=args.calibration,
+            pings=args.pings,
+            seed=args.seed,
+            server_log=args.server_log,
+        ))
+    except ValueError as e:
+        arg_parser.error(str(e))
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, "stdio-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(format_report(results))
+    print(f"\nResults written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,277 @@
+"""In-memory stub of the Toggl API v9 for offline load and integration tests
+
+The stub keeps a small workspace in memory and answers the endpoints used by
+TogglClient. Use ``TogglStub.transport()`` to plug it into an
+``httpx.AsyncClient`` and ``TogglStub.client()`` for a ready-made TogglClient.
+``TogglStub.asgi_app()`` serves it over real HTTP (e.g. with uvicorn) for a
+server running in another process.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from toggl_mcp.toggl_client import TogglClient
+
+WORKSPACE_ID = 1234567
+
+_ID_SEGMENT = re.compile(r"/\d+(?:,\d+)*")
+
+
+def endpoint_template(path: str) -> str:
+    """Collapse numeric path segments, e.g. /workspaces/1/tags/2 -> /workspaces/{id}/tags/{id}"""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class TogglStub:
+    """Stateful fake of the Toggl API
+
+    Args:
+        latency: Base delay in seconds added to every response
+        jitter: Extra uniformly distributed delay in seconds
+        projects: Number of projects to seed the workspace with
+        seed: Random seed for jitter
+        padding: Characters of filler added to seeded projects and time
+                 entries, to model larger payloads
+        workspace_tasks: Serve the paginated workspace-level tasks endpoint;
+                         when False it answers 404, as for older plans
+        unique_names: Answer 400 to creating a project, tag or client whose
+                      name is taken in the workspace (ignoring case), as Toggl does
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, projects: int = 3, seed: int = 0,
+                 padding: int = 0, workspace_tasks: bool = True, unique_names: bool = False):
+        self.latency = latency
+        self.workspace_tasks = workspace_tasks
+        self.unique_names = unique_names
+        self.jitter = jitter
+        self.padding = "x" * padding
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.service_time = 0.0  # Total seconds spent answering requests
+        self._next_id = 1000
+        self.workspaces = [{"id": WORKSPACE_ID, "name": "Stub Workspace", "organization_id": 1}]
+        self.users = [
+            {"id": 1, "fullname": "Stub User", "email": "stub@example.com", "workspace_id": WORKSPACE_ID},
+        ]
+        self.projects: Dict[int, Dict[str, Any]] = {}
+        self.tags: Dict[int, Dict[str, Any]] = {}
+        self.clients: Dict[int, Dict[str, Any]] = {}
+        self.tasks: Dict[int, Dict[str, Any]] = {}
+        self.time_entries: Dict[int, Dict[str, Any]] = {}
+        for i in range(projects):
+            self._add(self.projects, {"name": f"Project {i}", "workspace_id": WORKSPACE_ID, "active": True,
+                                      "notes": self.padding})
+
+    def _add(self, table: Dict[int, Dict[str, Any]], record: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_id += 1
+        record = {**record, "id": self._next_id}
+        table[self._next_id] = record
+        return record
+
+    def transport(self) -> httpx.MockTransport:
+        """Return an httpx transport serving this stub"""
+        return httpx.MockTransport(self.handle)
+
+    def client(self, api_token: str = "stub-token", **kwargs) -> TogglClient:
+        """Return a TogglClient wired to this stub"""
+        return TogglClient(api_token, httpx.AsyncClient(transport=self.transport()), **kwargs)
+
+    def asgi_app(self):
+        """Return an ASGI application serving this stub"""
+        async def app(scope, receive, send):
+            if scope["type"] == "lifespan":
+                while True:
+                    message = await receive()
+                    if message["type"] == "lifespan.startup":
+                        await send({"type": "lifespan.startup.complete"})
+                    elif message["type"] == "lifespan.shutdown":
+                        await send({"type": "lifespan.shutdown.complete"})
+                        return
+            body = b""
+            more = True
+            while more:
+                message = await receive()
+                body += message.get("body", b"")
+                more = message.get("more_body", False)
+            request = httpx.Request(
+                scope["method"],
+                httpx.URL(f"http://stub{scope['path']}", params=scope["query_string"].decode()),
+                headers=[(k.decode(), v.decode()) for k, v in scope["headers"]],
+                content=body,
+            )
+            response = await self.handle(request)
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(k.encode(), v.encode()) for k, v in response.headers.items()],
+            })
+            await send({"type": "http.response.body", "body": response.content})
+        return app
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Dispatch a request to the matching fake endpoint"""
+        started = time.perf_counter()
+        try:
+            return await self._handle(request)
+        finally:
+            self.service_time += time.perf_counter() - started
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/api/v9", 1)[-1]
+        self.calls[(request.method, endpoint_template(path))] += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        body = json.loads(request.content) if request.content else None
+        status, payload = self._route(request.method, path, body, request.url.params)
+        if payload is None:
+            return httpx.Response(status, content=b"null", headers={"Content-Type": "application/json"})
+        return httpx.Response(status, json=payload)
+
+    def _route(self, method: str, path: str, body: Any, params) -> Tuple[int, Any]:
+        parts = path.strip("/").split("/")
+        if parts == ["me"]:
+            return 200, {"id": 1, "fullname": "Stub User", "email": "stub@example.com",
+                         "default_workspace_id": WORKSPACE_ID}
+        if parts == ["workspaces"]:
+            return 200, self.workspaces
+        if parts == ["organizations"]:
+            return 200, [{"id": 1, "name": "Stub Org"}]
+        if parts[:2] == ["me", "time_entries"]:
+            if parts[2:] == ["current"]:
+                running = [e for e in self.time_entries.values() if e.get("duration", 0) < 0]
+                return 200, running[-1] if running else None
+            if len(parts) == 3:
+                entry = self.time_entries.get(int(parts[2]))
+                return (200, entry) if entry else (404, {"error": "time entry not found"})
+            return 200, self._filter_entries(params)
+        if len(parts) < 3 or parts[0] != "workspaces":
+            return 404, {"error": "not found"}
+
+        wid, resource, rest = int(parts[1]), parts[2], parts[3:]
+        if resource == "users" and method == "GET":
+            return 200, [u for u in self.users if u["workspace_id"] == wid]
+        if resource == "time_entries":
+            return self._time_entries(method, wid, rest, body)
+        if resource == "projects" and len(rest) >= 2 and rest[1] == "tasks":
+            project_id = int(rest[0])
+            if method == "POST":
+                return 200, self._add(self.tasks, {**body, "project_id": project_id, "workspace_id": wid})
+            tasks = [t for t in self.tasks.values() if t["project_id"] == project_id]
+            return (200, tasks) if tasks else (404, {"error": "tasks not enabled"})
+        if resource == "tasks" and not rest and method == "GET" and self.workspace_tasks:
+            page, per_page = int(params.get("page", 1)), int(params.get("per_page", 50))
+            tasks = [t for t in self.tasks.values() if t["workspace_id"] == wid]
+            return 200, {"data": tasks[(page - 1) * per_page:page * per_page], "page": page,
+                         "per_page": per_page, "total_count": len(tasks)}
+
+        table = {"projects": self.projects, "tags": self.tags, "clients": self.clients}.get(resource)
+        if table is None:
+            return 404, {"error": "not found"}
+        if not rest:
+            if method == "GET":
+                return 200, [r for r in table.values() if r.get("workspace_id") == wid]
+            if method == "POST":
+                name = (body.get("name") or "").casefold()
+                if self.unique_names and any(
+                    r.get("workspace_id") == wid and (r.get("name") or "").casefold() == name for r in table.values()
+                ):
+                    return 400, f"{resource[:-1]} name already exists"
+                return 200, self._add(table, {**body, "workspace_id": wid})
+        elif int(rest[0]) in table:
+            record_id = int(rest[0])
+            if method == "PUT":
+                table[record_id].update(body or {})
+                return 200, table[record_id]
+            if method == "DELETE":
+                del table[record_id]
+                return 200, None
+        return 404, {"error": "not found"}
+
+    def _filter_entries(self, params) -> List[Dict[str, Any]]:
+        entries = list(self.time_entries.values())
+        start, end = params.get("start_date"), params.get("end_date")
+        if start:
+            entries = [e for e in entries if _parse(e["start"]) >= _parse(start)]
+        if end:
+            entries = [e for e in entries if _parse(e["start"]) <= _parse(end)]
+        return sorted(entries, key=lambda e: e["start"], reverse=True)
+
+    def _time_entries(self, method: str, wid: int, rest: List[str], body: Any) -> Tuple[int, Any]:
+        if not rest and method == "POST":
+            items = body if isinstance(body, list) else [body]
+            created = []
+            for item in items:
+                item = {**item, "workspace_id": wid}
+                item.setdefault("start", datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"))
+                item.setdefault("duration", -1)
+                created.append(self._add(self.time_entries, item))
+            return 200, created if isinstance(body, list) else created[0]
+
+        ids = [int(i) for i in rest[0].split(",")] if rest else []
+        missing = [i for i in ids if i not in self.time_entries]
+        if rest[1:] == ["stop"] and method == "PATCH":
+            if missing:
+                return 404, {"error": "not found"}
+            entry = self.time_entries[ids[0]]
+            entry["duration"] = 120
+            entry["stop"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            return 200, entry
+        if method == "PUT" and len(ids) == 1 and not missing:
+            self.time_entries[ids[0]].update(body or {})
+            return 200, self.time_entries[ids[0]]
+        if method == "PATCH":
+            for i in ids:
+                if i in self.time_entries:
+                    self.time_entries[i].update(body or {})
+            return 200, {"success": [i for i in ids if i not in missing], "failure": missing}
+        if method == "DELETE":
+            for i in ids:
+                self.time_entries.pop(i, None)
+            return 200, None
+        return 404, {"error": "not found"}
+
+    def seed_time_entries(self, count: int, start: str = "2024-01-01T09:00:00Z", step: int = 3600,
+                          duration: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Seed the stub with completed time entries spaced step seconds apart"""
+        base = _parse(start).timestamp()
+        project_ids = list(self.projects)
+        created = []
+        for i in range(count):
+            begin = base + i * step
+            length = step if duration is None else duration
+            created.append(self._add(self.time_entries, {
+                "workspace_id": WORKSPACE_ID,
+                "project_id": project_ids[i % len(project_ids)] if project_ids else None,
+                "description": f"Entry {i} {self.padding}".rstrip(),
+                "start": _format(begin),
+                "stop": _format(begin + length),
+                "duration": length,
+                "tags": [],
+                "billable": False,
+            }))
+        return created
+
+
+def _parse(value: str) -> datetime:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _format(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
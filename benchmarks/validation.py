@@ -0,0 +1,82 @@
+"""
+Argument validation benchmark: per-call cost of the compiled validators
+
+Example:
+    python -m benchmarks.validation --calls 100000
+
+For each write tool, compiles its validator the way toggl_tool does on the
+first call and times it on arguments as MCP clients send them (IDs and
+booleans as strings). Reports the one-off compile time and the median
+per-call time over several rounds, in microseconds.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from toggl_mcp import main
+from toggl_mcp.validation import compile_validator
+
+# (tool, endpoint, positional arguments, keyword arguments)
+CASES: List[Tuple[str, str, Tuple[Any, ...], Dict[str, Any]]] = [
+    ("toggl_start_timer", "time_entries.start_timer", ("Standup",),
+     {"workspace_id": "1001", "project_id": "2002", "tags": ["meeting"], "billable": "false"}),
+    ("toggl_create_time_entry", "time_entries.create", ("Review", "2024-01-01T09:00:00Z", "2024-01-01T10:00:00Z"),
+     {"project_id": "2002", "task_id": "3003", "tag_ids": ["1", "2"], "billable": "yes", "duronly": 0}),
+    ("toggl_update_time_entry", "time_entries.update", ("4004",), {"description": "Review", "billable": "true"}),
+    ("toggl_bulk_update_time_entries", "time_entries.update", ([str(i) for i in range(100)],),
+     {"tags": ["billing"], "tag_action": "add"}),
+    ("toggl_create_project_task", "tasks.create", ("2002", "Design"), {}),
+]
+
+
+def measure(calls: int = 100_000, rounds: int = 5) -> List[Dict[str, Any]]:
+    """Compile and per-call times of each case's validator"""
+    results = []
+    for tool, endpoint, args, kwargs in CASES:
+        fn = main.TOOLS[tool].__wrapped__
+        started = time.perf_counter()
+        validate = compile_validator(fn, endpoint)
+        compiled = time.perf_counter() - started
+        per_call = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(calls):
+                validate(args, kwargs)
+            per_call.append((time.perf_counter() - started) / calls)
+        results.append({
+            "tool": tool,
+            "compile_us": round(compiled * 1e6, 1),
+            "per_call_us": round(statistics.median(per_call) * 1e6, 3),
+        })
+    return results
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines = [f"Python {sys.version.split()[0]}", f"{'tool':32} {'compile us':>12} {'per call us':>12}"]
+    lines.extend(f"{row['tool']:32} {row['compile_us']:>12} {row['per_call_us']:>12}" for row in results)
+    return "\n".join(lines)
+
+
+def run():
+    """Command line entry point"""
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.validation", description=__doc__.strip().splitlines()[0]
+    )
+    arg_parser.add_argument("--calls", type=int, default=100_000, help="Validator calls per round")
+    arg_parser.add_argument("--rounds", type=int, default=5, help="Rounds, reported as the median")
+    arg_parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = arg_parser.parse_args()
+
+    results = measure(args.calls, args.rounds)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    run()
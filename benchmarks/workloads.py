@@ -0,0 +1,61 @@
+"""
+Tool workloads measured by the benchmark runner
+
+Each workload calls one real tool function from toggl_mcp.main. The call
+receives the running iteration number so writes can target distinct records.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List
+
+from toggl_mcp import main
+from benchmarks.stub import TogglStub
+
+
+@dataclass
+class BenchContext:
+    """State shared by the workloads of one run"""
+
+    stub: TogglStub
+    entry_ids: List[int]
+    project_ids: List[int]
+
+
+@dataclass
+class Workload:
+    name: str
+    call: Callable[[BenchContext, int], Awaitable[Any]]
+
+
+def _entry(ctx: BenchContext, i: int) -> int:
+    return ctx.entry_ids[i % len(ctx.entry_ids)]
+
+
+async def _start_and_stop(ctx: BenchContext, i: int) -> Any:
+    timer = await main.toggl_start_timer(f"Bench timer {i}")
+    if "error" in timer:
+        return timer
+    return await main.toggl_stop_timer(timer["id"])
+
+
+WORKLOADS: Dict[str, Workload] = {w.name: w for w in (
+    Workload("toggl_get_user", lambda ctx, i: main.toggl_get_user()),
+    Workload("toggl_list_workspaces", lambda ctx, i: main.toggl_list_workspaces()),
+    Workload("toggl_list_projects", lambda ctx, i: main.toggl_list_projects()),
+    Workload("toggl_list_tags", lambda ctx, i: main.toggl_list_tags()),
+    Workload("toggl_list_time_entries", lambda ctx, i: main.toggl_list_time_entries(
+        "2024-01-01T00:00:00Z", "2030-01-01T00:00:00Z"
+    )),
+    Workload("toggl_get_current_timer", lambda ctx, i: main.toggl_get_current_timer()),
+    Workload("toggl_start_stop_timer", _start_and_stop),
+    Workload("toggl_create_time_entry", lambda ctx, i: main.toggl_create_time_entry(
+        f"Bench entry {i}", "2024-03-01T09:00:00", "2024-03-01T10:00:00", user_timezone="Europe/Berlin"
+    )),
+    Workload("toggl_update_time_entry", lambda ctx, i: main.toggl_update_time_entry(
+        _entry(ctx, i), description=f"Updated {i}", billable="true"
+    )),
+    Workload("toggl_bulk_update_time_entries", lambda ctx, i: main.toggl_bulk_update_time_entries(
+        ctx.entry_ids[:250], billable=bool(i % 2)
+    )),
+    Workload("toggl_create_tag", lambda ctx, i: main.toggl_create_tag(f"bench-{i}")),
+)}
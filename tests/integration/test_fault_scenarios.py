@@ -0,0 +1,204 @@
+"""Resilience scenarios: tools under injected upstream fault mixes
+
+Each scenario drives real tool functions from toggl_mcp.main concurrently
+against the in-memory stub behind a FaultInjectionTransport, and asserts on
+throughput, error rate and how quickly the tools recover once faults stop.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import httpx
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.faults import Fault, FaultInjectionTransport, FaultRule
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+RANGE = ("2024-01-01T00:00:00Z", "2030-01-01T00:00:00Z")
+
+
+@dataclass
+class ScenarioResult:
+    wall: float
+    outcomes: List[Tuple[float, float, bool]] = field(default_factory=list)  # (started, finished, ok)
+
+    @property
+    def calls(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def errors(self) -> int:
+        return sum(not ok for _, _, ok in self.outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.calls / self.wall
+
+    def recovery_time(self, faults_end: float) -> float:
+        """Seconds after faults stopped until the last failed call finished"""
+        failed = [finished for _, finished, ok in self.outcomes if not ok]
+        return max(0.0, max(failed, default=faults_end) - faults_end)
+
+
+async def run_scenario(
+    stub: TogglStub,
+    rules: List[FaultRule],
+    call: Callable[[int], Awaitable[Any]],
+    concurrency: int,
+    calls: Optional[int] = None,
+    duration: Optional[float] = None,
+    retry_backoff: float = 0.02
+) -> Tuple[ScenarioResult, FaultInjectionTransport]:
+    """Run call concurrently until calls are made or duration has passed"""
+    transport = FaultInjectionTransport(stub.transport(), rules, seed=0)
+    client = stub.client(cache_ttl=0)
+    client.client = httpx.AsyncClient(transport=transport)
+    client.RETRY_BACKOFF = retry_backoff
+    previous = main.toggl_client, main.default_workspace_id
+    main.toggl_client, main.default_workspace_id = client, WORKSPACE_ID
+
+    counter = iter(range(calls) if calls is not None else iter(int, 1))
+    result = ScenarioResult(wall=0.0)
+    started = time.monotonic()
+    transport.started = started
+
+    async def worker():
+        for i in counter:
+            if duration is not None and time.monotonic() - started >= duration:
+                return
+            call_started = time.monotonic() - started
+            try:
+                outcome = await call(i)
+                ok = not (isinstance(outcome, dict) and "error" in outcome)
+            except Exception:
+                ok = False
+            result.outcomes.append((call_started, time.monotonic() - started, ok))
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        main.toggl_client, main.default_workspace_id = previous
+        await client.close()
+    result.wall = time.monotonic() - started
+    return result, transport
+
+
+def _list_entries(i: int):
+    return main.toggl_list_time_entries(*RANGE)
+
+
+@pytest.mark.asyncio
+class TestFaultScenarios:
+    """Tool behaviour under 429 storms, 5xx bursts, slow bodies and resets"""
+
+    @pytest.mark.slow
+    async def test_baseline(self):
+        """Without faults every call succeeds"""
+        stub = TogglStub(latency=0.005)
+        stub.seed_time_entries(20)
+        result, transport = await run_scenario(stub, [], _list_entries, concurrency=4, calls=40)
+        assert result.errors == 0
+        assert transport.stats()["injected"] == {}
+        assert result.throughput > 100
+
+    @pytest.mark.slow
+    async def test_429_storm(self):
+        """A 429 storm is ridden out through Retry-After and ends without lasting damage"""
+        stub = TogglStub(latency=0.005)
+        stub.seed_time_entries(20)
+        storm = FaultRule(
+            endpoint="GET /me/time_entries", probability=1.0, start=0.2, duration=0.3,
+            fault=Fault(status=429, retry_after=0.05),
+        )
+        result, transport = await run_scenario(stub, [storm], _list_entries, concurrency=4, duration=1.2)
+
+        assert storm.injected > 0
+        # Only calls that ran out of retries (MAX_RETRIES * Retry-After) while
+        # the storm lasted fail; nothing outside the storm does
+        assert all(ok for started, finished, ok in result.outcomes if finished < 0.2 or started >= 0.5)
+        assert all(0.2 <= finished < 0.5 for _, finished, ok in result.outcomes if not ok)
+        assert result.error_rate < 0.5
+        assert result.recovery_time(faults_end=0.5) < 0.25
+        # Throughput after the storm is back to at least half the pre-storm rate
+        before = sum(1 for _, finished, ok in result.outcomes if ok and finished < 0.2) / 0.2
+        after = sum(1 for started, finished, ok in result.outcomes if ok and started >= 0.6) / (result.wall - 0.6)
+        assert after > before / 2
+
+    @pytest.mark.slow
+    async def test_5xx_burst_on_reads_is_absorbed(self):
+        """A 503 burst shorter than the retry schedule costs latency, not errors"""
+        stub = TogglStub(latency=0.002)
+        stub.seed_time_entries(20)
+        burst = FaultRule(
+            endpoint="GET *", probability=1.0, start=0.1, duration=0.1, fault=Fault(status=503),
+        )
+        result, transport = await run_scenario(
+            stub, [burst], _list_entries, concurrency=4, duration=0.6, retry_backoff=0.05
+        )
+        assert burst.injected > 0
+        assert result.errors == 0
+        assert result.calls > 20
+
+    async def test_5xx_burst_on_writes_surfaces_errors(self):
+        """Non-idempotent creates are not retried on 5xx: each fault is one error, no duplicates"""
+        stub = TogglStub(latency=0.002)
+        burst = FaultRule(
+            endpoint="POST /workspaces/{wid}/time_entries", probability=0.3, fault=Fault(status=502),
+        )
+
+        def create(i: int):
+            return main.toggl_create_time_entry(f"Entry {i}", "2024-03-01T09:00:00Z", "2024-03-01T10:00:00Z")
+
+        result, transport = await run_scenario(stub, [burst], create, concurrency=4, calls=60)
+        assert result.errors == burst.injected > 0
+        assert len(stub.time_entries) == result.calls - result.errors
+        assert 0.1 < result.error_rate < 0.5
+
+    @pytest.mark.slow
+    async def test_slow_bodies_overlap(self):
+        """Slow response bodies are waited on concurrently, not one after another"""
+        stub = TogglStub()
+        stub.seed_time_entries(20)
+        slow = FaultRule(
+            endpoint="GET /me/time_entries", probability=1.0, fault=Fault(kind="slow_body", delay=0.1),
+        )
+        result, transport = await run_scenario(stub, [slow], _list_entries, concurrency=4, calls=12)
+        assert result.errors == 0
+        assert slow.injected == 12
+        # Serially this would take 1.2s; the default admission limit of 4 overlaps them
+        assert result.wall < 0.8
+        assert result.throughput > 15
+
+    async def test_reset_mid_bulk_operation(self):
+        """Connections reset mid-bulk fail only their chunk; the rest are still reported as applied"""
+        stub = TogglStub(latency=0.002)
+        ids = [e["id"] for e in stub.seed_time_entries(250)]
+        reset = Fault(kind="reset", after_send=True)
+        resets = FaultRule(
+            endpoint="PATCH /workspaces/{wid}/time_entries/{ids}", script=[reset, None, None, None] * 4,
+        )
+        responses = []
+
+        async def bulk(i: int):
+            responses.append(await main.toggl_bulk_update_time_entries(ids, billable=bool(i % 2)))
+            return responses[-1]
+
+        result, transport = await run_scenario(stub, [resets], bulk, concurrency=2, calls=6)
+        assert resets.injected == 4
+        assert result.errors == 0
+        failed = [r for r in responses if r["failure"]]
+        assert len(failed) == 4
+        for response in responses:
+            assert sorted(response["success"] + response["failure"]) == ids
+        for response in failed:
+            assert len(response["errors"]) == 1
+            assert response["errors"][0]["time_entry_ids"] == response["failure"]
+        # Bulk PATCH is not retried, and the reset chunks did reach upstream
+        assert sum(n for (method, _), n in stub.calls.items() if method == "PATCH") == 6 * 3
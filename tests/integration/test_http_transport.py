@@ -0,0 +1,146 @@
+"""Load test for the streamable HTTP transport against a local Toggl stub"""
+
+import asyncio
+import json
+import os
+from unittest.mock import patch, AsyncMock
+
+import pytest
+import uvicorn
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+SESSIONS = 25
+
+
+def _data(result):
+    return json.loads(result.content[0].text)
+
+
+def _items(result):
+    # FastMCP returns each element of a list result as its own content block
+    return [json.loads(content.text) for content in result.content]
+
+
+async def _session_workload(url: str, index: int):
+    """One MCP session: list reference data, then start and stop a timer"""
+    async with streamable_http_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            projects = _items(await session.call_tool("toggl_list_projects", {}))
+            tags = _items(await session.call_tool("toggl_list_tags", {}))
+            started = _data(await session.call_tool("toggl_start_timer", {
+                "description": f"Session {index}",
+                "project_id": projects[0]["id"],
+            }))
+            stopped = _data(await session.call_tool("toggl_stop_timer", {"time_entry_id": started["id"]}))
+            return projects, tags, started, stopped
+
+
+@pytest.mark.asyncio
+class TestStreamableHttpTransport:
+    """Many concurrent sessions served by one process"""
+
+    async def test_concurrent_sessions_share_client(self):
+        """Concurrent sessions succeed and share one client pool and cache"""
+        from toggl_mcp import main
+
+        stub = TogglStub(latency=0.01)
+        client = stub.client()
+        server = uvicorn.Server(uvicorn.Config(
+            main.mcp.streamable_http_app(), host="127.0.0.1", port=0, log_level="warning"
+        ))
+
+        with patch.object(main, "toggl_client", client), patch.object(main, "default_workspace_id", WORKSPACE_ID):
+            serve = asyncio.create_task(server.serve())
+            try:
+                while not server.started:
+                    await asyncio.sleep(0.01)
+                port = server.servers[0].sockets[0].getsockname()[1]
+                url = f"http://127.0.0.1:{port}{main.mcp.settings.streamable_http_path}"
+
+                results = await asyncio.gather(*(_session_workload(url, i) for i in range(SESSIONS)))
+            finally:
+                server.should_exit = True
+                await serve
+                await client.close()
+
+        entry_ids = {started["id"] for _, _, started, _ in results}
+        assert len(entry_ids) == SESSIONS
+        assert all(stopped["duration"] == 120 for *_, stopped in results)
+        assert all(len(projects) == 3 for projects, *_ in results)
+
+        # Reference data is fetched once for all sessions; only timers hit upstream per session
+        assert stub.calls[("GET", "/workspaces/{id}/projects")] == 1
+        assert stub.calls[("GET", "/workspaces/{id}/tags")] == 1
+        assert stub.calls[("POST", "/workspaces/{id}/time_entries")] == SESSIONS
+        assert stub.calls[("PATCH", "/workspaces/{id}/time_entries/{id}/stop")] == SESSIONS
+
+        # Sessions overlap upstream rather than running one after another
+        assert stub.max_in_flight > 1
+
+
+@pytest.mark.asyncio
+class TestTransportSelection:
+    """Transport selection via argument and environment"""
+
+    @patch('toggl_mcp.main.mcp.run_streamable_http_async')
+    @patch('toggl_mcp.main.TogglClient')
+    async def test_streamable_http_from_env(self, mock_client_class, mock_run_http):
+        """TOGGL_MCP_TRANSPORT selects the HTTP transport and port"""
+        from toggl_mcp import main
+
+        mock_client_class.return_value = AsyncMock()
+        with patch.dict(os.environ, {
+            'TOGGL_API_TOKEN': 'test_token',
+            'TOGGL_MCP_TRANSPORT': 'streamable-http',
+            'TOGGL_MCP_PORT': '9123',
+        }):
+            await main.setup_and_run()
+
+        mock_run_http.assert_called_once()
+        assert main.mcp.settings.port == 9123
+
+    @patch('toggl_mcp.main.mcp.run_sse_async')
+    @patch('toggl_mcp.main.mcp.run_stdio_async')
+    @patch('toggl_mcp.main.TogglClient')
+    async def test_argument_overrides_env(self, mock_client_class, mock_run_stdio, mock_run_sse):
+        """An explicit transport argument wins over the environment"""
+        from toggl_mcp import main
+
+        mock_client_class.return_value = AsyncMock()
+        with patch.dict(os.environ, {'TOGGL_API_TOKEN': 'test_token', 'TOGGL_MCP_TRANSPORT': 'stdio'}):
+            await main.setup_and_run("sse", port=9124)
+
+        mock_run_sse.assert_called_once()
+        mock_run_stdio.assert_not_called()
+
+    @patch('toggl_mcp.main.mcp.run_streamable_http_async')
+    @patch('toggl_mcp.main.TogglClient')
+    async def test_rebinding_protection_on_public_host(self, mock_client_class, mock_run_http):
+        """Binding beyond loopback keeps DNS rebinding protection, allowing configured names"""
+        from toggl_mcp import main
+
+        mock_client_class.return_value = AsyncMock()
+        settings = main.mcp.settings
+        with patch.dict(os.environ, {
+            'TOGGL_API_TOKEN': 'test_token',
+            'TOGGL_MCP_ALLOWED_HOSTS': 'mcp.example.com, mcp.example.com:*',
+            'TOGGL_MCP_ALLOWED_ORIGINS': 'https://mcp.example.com',
+        }), patch.object(settings, "host", settings.host), \
+                patch.object(settings, "transport_security", settings.transport_security):
+            await main.setup_and_run("streamable-http", host="0.0.0.0", port=9125)
+            security = settings.transport_security
+
+        assert security.enable_dns_rebinding_protection
+        assert {"localhost:*", "mcp.example.com", "mcp.example.com:*"} <= set(security.allowed_hosts)
+        assert "0.0.0.0:*" not in security.allowed_hosts
+        assert "https://mcp.example.com" in security.allowed_origins
+
+        security = main.transport_security("10.0.0.5")
+        assert "10.0.0.5:*" in security.allowed_hosts and "http://10.0.0.5:*" in security.allowed_origins
+        assert "[fd00::5]:*" in main.transport_security("fd00::5").allowed_hosts
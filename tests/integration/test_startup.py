@@ -0,0 +1,75 @@
+"""Cold-start budget for importing the server and answering the handshake"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.startup import measure_handshake, measure_imports, parse_importtime, summarize_imports
+from toggl_mcp import lazy_tools, main
+from toggl_mcp.lazy_tools import LazyToolManager
+
+# Milliseconds spent importing toggl_mcp's own modules, including tool
+# registration; third-party imports (mcp, httpx, pydantic) are not counted.
+# Eagerly building every tool schema alone costs about 45 ms.
+OWN_IMPORT_BUDGET_MS = 40
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   toggl_mcp.metrics\n"
+        "import time:      3000 |       3120 | toggl_mcp.main\n"
+        "import time:      5000 |       5000 | pytz\n"
+    )
+    modules = parse_importtime(output)
+    assert modules["toggl_mcp.main"] == (3000, 3120)
+    summary = summarize_imports(modules)
+    assert summary["own_ms"] == 3.12
+    assert summary["deferred_imported"] == ["pytz"]
+
+
+def test_tool_manager_replaced():
+    """FastMCP still keeps its tool manager where lazy_tools.install replaces it
+
+    Fails when an mcp release renames FastMCP._tool_manager, in which case
+    tool schemas silently go back to being built at import.
+    """
+    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp.tools import ToolManager
+
+    assert isinstance(main.mcp._tool_manager, LazyToolManager)
+    server = FastMCP("probe")
+    assert type(server._tool_manager) is ToolManager
+    assert lazy_tools.install(server)
+    assert not lazy_tools.install(server)  # Already lazy: left alone
+
+
+def test_tool_schemas_built_on_first_use():
+    """Tools are registered at import but their schemas wait until listed or called"""
+    manager = main.mcp._tool_manager
+    tools = asyncio.run(main.mcp.list_tools())
+    assert manager.pending == 0
+    assert {tool.name for tool in tools} == set(main.TOOLS)
+
+
+def test_optional_modules_deferred():
+    """Importing the server leaves slow and optional modules unloaded"""
+    assert summarize_imports(measure_imports())["deferred_imported"] == []
+
+
+@pytest.mark.slow
+def test_import_budget():
+    """Importing the server stays within budget"""
+    # Best of three, to absorb noise from other processes
+    summaries = [summarize_imports(measure_imports()) for _ in range(3)]
+    own_ms = min(summary["own_ms"] for summary in summaries)
+    assert own_ms < OWN_IMPORT_BUDGET_MS, f"toggl_mcp import took {own_ms} ms"
+
+
+@pytest.mark.asyncio
+@pytest.mark.slow
+async def test_handshake():
+    """A spawned server answers initialize and then lists every tool"""
+    result = await measure_handshake()
+    assert result["tools"] == len(main.TOOLS)
+    assert 0 < result["initialize_ms"] <= result["tools_list_ms"]
@@ -0,0 +1,33 @@
+"""End-to-end load through a spawned stdio server and a local HTTP Toggl stub"""
+
+import sys
+
+import pytest
+
+from benchmarks.stdio_load import parse_mix, run_load
+
+
+def test_parse_mix():
+    assert parse_mix("toggl_get_user=2, toggl_list_tags") == [("toggl_get_user", 2.0), ("toggl_list_tags", 1.0)]
+    with pytest.raises(ValueError):
+        parse_mix(" , ")
+
+
+@pytest.mark.asyncio
+@pytest.mark.slow
+async def test_stdio_load():
+    """Concurrent tools/call requests over real pipes all succeed"""
+    results = await run_load(
+        requests=60, concurrency=6, calibration=2, pings=5, entries=20,
+        mix="toggl_get_user=1,toggl_list_time_entries=1,toggl_create_time_entry=1",
+    )
+    load = results["load"]
+    assert sum(row["calls"] for row in load["tools"].values()) == 60
+    assert all(row["errors"] == 0 for row in load["tools"].values())
+    assert load["throughput_per_s"] > 0
+    # Listing entries reaches the stub; the cached user lookup does not
+    assert results["breakdown"]["toggl_list_time_entries"]["upstream_ms"] > 0
+    assert results["breakdown"]["toggl_get_user"]["upstream_ms"] == 0
+    assert results["ping"]["p50_ms"] <= results["breakdown"]["toggl_get_user"]["e2e_p50_ms"]
+    if sys.platform.startswith("linux"):
+        assert results["rss_kb"]["peak"] >= results["rss_kb"]["idle"] > 0
@@ -202,10 +202,46 @@ class TestServerStartup:
             await main.setup_and_run()
             
             # Verify client was created with token
-            mock_client_class.assert_called_once_with('test_token')
+            mock_client_class.assert_called_once_with('test_token', http_client=None, base_url=None)
             
             # Verify server was started
             mock_run_stdio.assert_called_once()
+            
+            # The client is closed on shutdown
+            mock_client.close.assert_awaited_once()
+    
+    @patch('toggl_mcp.main.mcp.run_stdio_async')
+    @patch('toggl_mcp.main.TogglClient')
+    async def test_metrics_listener_closed_on_shutdown(self, mock_client_class, mock_run_stdio):
+        """Test the Prometheus listener is closed when the server stops"""
+        from toggl_mcp import main
+        
+        mock_client_class.return_value = AsyncMock()
+        server = MagicMock(wait_closed=AsyncMock())
+        
+        with patch.dict(os.environ, {'TOGGL_API_TOKEN': 'test_token'}), \
+                patch('toggl_mcp.main.serve_prometheus', AsyncMock(return_value=server)):
+            await main.setup_and_run(metrics_port=9190)
+        
+        server.close.assert_called_once()
+        server.wait_closed.assert_awaited_once()
+    
+    @patch('toggl_mcp.main.mcp.run_stdio_async')
+    @patch('toggl_mcp.main.TogglClient')
+    async def test_setup_with_base_url(self, mock_client_class, mock_run_stdio):
+        """Test TOGGL_API_BASE_URL points the client at another API root"""
+        from toggl_mcp import main
+        
+        mock_client_class.return_value = AsyncMock()
+        
+        with patch.dict(os.environ, {
+            'TOGGL_API_TOKEN': 'test_token',
+            'TOGGL_API_BASE_URL': 'http://127.0.0.1:9000/api/v9'
+        }):
+            await main.setup_and_run()
+            mock_client_class.assert_called_once_with(
+                'test_token', http_client=None, base_url='http://127.0.0.1:9000/api/v9'
+            )
     
     async def test_setup_and_run_no_token(self):
         """Test server exits when no API token is provided"""
@@ -0,0 +1,115 @@
+"""Unit tests for upstream usage accounting"""
+
+import logging
+
+import httpx
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.accounting import UsageLedger, ledger
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+@pytest.fixture(autouse=True)
+def reset_ledger():
+    ledger.reset()
+    yield
+    ledger.reset()
+    ledger.warn_rate = None
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = TogglStub()
+    monkeypatch.setattr(main, "toggl_client", stub.client())
+    monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+    return stub
+
+
+@pytest.mark.asyncio
+class TestToolAccounting:
+    """Test attribution of upstream requests to tool calls"""
+
+    async def test_n_plus_one_visible(self, stub):
+        """A per-project loop shows up as many calls of one tool"""
+        projects = await main.toggl_list_projects()
+        for project in projects:
+            await main.toggl_list_project_tasks(project["id"])
+        await main.toggl_list_projects()
+
+        stats = await main.toggl_usage_stats()
+        tasks = stats["tools"]["toggl_list_project_tasks"]
+        assert tasks["calls"] == len(projects)
+        assert tasks["requests"] == len(projects)
+        # The second project listing was served from the cache
+        assert stats["tools"]["toggl_list_projects"]["calls"] == 2
+        assert stats["tools"]["toggl_list_projects"]["requests"] == 1
+        local = stats["sessions"]["local"]
+        assert local["requests"] == len(projects) + 1
+        assert local["top_tools"]["toggl_list_project_tasks"] == len(projects)
+
+    async def test_heaviest_call(self, stub):
+        """A single fan-out call is reported with its request count and bytes"""
+        ids = [e["id"] for e in stub.seed_time_entries(250)]
+        await main.toggl_bulk_update_time_entries(ids, billable=True)
+        await main.toggl_list_tags()
+
+        stats = ledger.stats()
+        heaviest = stats["heaviest_calls"][0]
+        assert heaviest["tool"] == "toggl_bulk_update_time_entries"
+        assert heaviest["requests"] == 3
+        assert heaviest["bytes_out"] > 0 and heaviest["bytes_in"] > 0
+        assert list(stats["fan_out"])[0] == "toggl_bulk_update_time_entries"
+
+    async def test_limit_zero_lists_nothing(self, stub):
+        await main.toggl_list_tags()
+        stats = await main.toggl_usage_stats(limit=0)
+        assert stats["tools"] == {} and stats["heaviest_calls"] == []
+        assert "error" in await main.toggl_usage_stats(limit=-1)
+
+    async def test_throttled_requests_not_quota(self, monkeypatch):
+        """429 responses count as requests but not quota units"""
+        responses = iter([httpx.Response(429), httpx.Response(200, json={"id": 1})])
+        client = main.TogglClient(
+            "token", httpx.AsyncClient(transport=httpx.MockTransport(lambda r: next(responses)))
+        )
+        client.RETRY_BACKOFF = 0.001
+        monkeypatch.setattr(main, "toggl_client", client)
+        await main.toggl_get_user()
+        usage = ledger.stats()["tools"]["toggl_get_user"]
+        assert usage["requests"] == 2
+        assert usage["quota_units"] == 1
+
+
+class TestUsageLedger:
+    """Test ledger bookkeeping"""
+
+    def test_rate_warning_once_per_window(self, caplog):
+        usage_ledger = UsageLedger(warn_rate=3)
+        call = usage_ledger.start_call("toggl_list_project_tasks", "s1")
+        with caplog.at_level(logging.WARNING, logger="toggl_mcp.accounting"):
+            for _ in range(10):
+                usage_ledger.record_request(call, 0, 10, True)
+        warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+        assert len(warnings) == 1
+        assert "Session s1" in warnings[0].getMessage()
+        assert "toggl_list_project_tasks" in warnings[0].getMessage()
+
+    def test_session_filter_and_bounds(self):
+        usage_ledger = UsageLedger(max_sessions=2, top_calls=2)
+        for session, requests in (("a", 1), ("b", 5), ("c", 3)):
+            call = usage_ledger.start_call("toggl_get_user", session)
+            for _ in range(requests):
+                usage_ledger.record_request(call, 0, 0, True)
+            usage_ledger.finish_call(call)
+
+        assert list(usage_ledger.sessions) == ["b", "c"]
+        stats = usage_ledger.stats()
+        assert [c["requests"] for c in stats["heaviest_calls"]] == [5, 3]
+        own = usage_ledger.stats(session="c")
+        assert list(own["sessions"]) == ["c"]
+        assert [c["session"] for c in own["heaviest_calls"]] == ["c"]
+        # Tool totals are the session's own, not the process-wide ones
+        assert stats["tools"]["toggl_get_user"]["requests"] == 9
+        assert own["tools"]["toggl_get_user"]["requests"] == 3
+        assert usage_ledger.stats(session="unknown")["tools"] == {}
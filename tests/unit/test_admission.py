@@ -0,0 +1,139 @@
+"""Unit tests and benchmark for priority-based admission control"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.admission import (
+    AdmissionController, INTERACTIVE, READ, BULK, BACKGROUND, current_call_class
+)
+from toggl_mcp.limits import RateBudget
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+@pytest.mark.asyncio
+class TestAdmissionController:
+    """Test slot scheduling"""
+
+    async def test_class_limits(self):
+        """Bulk work cannot take more than its share of slots"""
+        controller = AdmissionController(capacity=4)
+        for _ in range(2):
+            await controller.acquire(BULK)
+        blocked = asyncio.ensure_future(controller.acquire(BULK))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        # Interactive and read calls still get in
+        await controller.acquire(INTERACTIVE)
+        await controller.acquire(READ)
+        assert controller.in_flight == 4
+        controller.release(BULK)
+        await asyncio.sleep(0)
+        assert blocked.done()
+
+    async def test_priority_order(self):
+        """Freed slots go to the highest priority waiter first"""
+        controller = AdmissionController(capacity=1, limits={BULK: 1, BACKGROUND: 1})
+        await controller.acquire(READ)
+        order = []
+
+        async def waiter(cls):
+            async with controller.slot(cls):
+                order.append(cls)
+
+        tasks = [asyncio.ensure_future(waiter(cls)) for cls in (BACKGROUND, BULK, READ, INTERACTIVE)]
+        await asyncio.sleep(0)
+        controller.release(READ)
+        await asyncio.gather(*tasks)
+        assert order == [INTERACTIVE, READ, BULK, BACKGROUND]
+
+    async def test_cancelled_waiter_releases(self):
+        """Cancelling a queued request does not leak a slot"""
+        controller = AdmissionController(capacity=1)
+        await controller.acquire(READ)
+        waiter = asyncio.ensure_future(controller.acquire(READ))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        controller.release(READ)
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.in_flight == 0
+
+    async def test_tool_sets_call_class(self, mock_toggl_client):
+        """Tool handlers run with their call class"""
+        seen = []
+        mock_toggl_client.create_time_entry.side_effect = lambda *a, **k: seen.append(current_call_class.get()) or {}
+        mock_toggl_client.bulk_delete_time_entries.side_effect = lambda *a, **k: seen.append(current_call_class.get()) or {}
+        with patch.object(main, "toggl_client", mock_toggl_client), patch.object(main, "default_workspace_id", 1):
+            await main.toggl_start_timer(description="x")
+            await main.toggl_bulk_delete_time_entries(time_entry_ids=[1, 2])
+        assert seen == [INTERACTIVE, BULK]
+        assert current_call_class.get() == READ
+
+    async def test_rate_budget_waits_outside_slot(self):
+        """A request waiting for its client's rate budget holds no admission slot"""
+        stub = TogglStub()
+        client = stub.client(admission=AdmissionController(capacity=1))
+        client.rate_budget = RateBudget(rate=20, burst=1)
+        await client.get_time_entries()  # Spends the only token
+        waiting = asyncio.ensure_future(client.get_time_entries())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        assert client.admission.in_flight == 0
+        await waiting
+        await client.close()
+
+
+class FifoController(AdmissionController):
+    """Baseline without priorities: every request queues in one class"""
+
+    async def acquire(self, call_class=None):
+        return await super().acquire(READ)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _timer_latencies_during_bulk_update(prioritized: bool, latency: float = 0.01):
+    """Start/stop timers while a 5,000-entry bulk update runs; return timer latencies"""
+    stub = TogglStub(latency=latency)
+    entry_ids = [e["id"] for e in stub.seed_time_entries(5000)]
+    controller = AdmissionController(capacity=8) if prioritized else FifoController(capacity=8)
+    client = stub.client(admission=controller)
+
+    latencies = []
+    with patch.object(main, "toggl_client", client), patch.object(main, "default_workspace_id", WORKSPACE_ID):
+        bulk = asyncio.ensure_future(main.toggl_bulk_update_time_entries(
+            time_entry_ids=entry_ids, project_id=1
+        ))
+        await asyncio.sleep(latency)
+        for i in range(20):
+            started = time.perf_counter()
+            entry = await main.toggl_start_timer(description=f"Interactive {i}")
+            await main.toggl_stop_timer(time_entry_id=entry["id"])
+            latencies.append((time.perf_counter() - started) / 2)
+        result = await bulk
+    assert len(result["success"]) == 5000
+    return latencies
+
+
+@pytest.mark.asyncio
+@pytest.mark.slow
+class TestAdmissionBenchmark:
+    """p99 of timer calls during a concurrent 5,000-entry bulk update"""
+
+    async def test_timer_p99_flat_under_bulk_load(self):
+        """Prioritized timer calls are not queued behind bulk chunks"""
+        latency = 0.01
+        prioritized = await _timer_latencies_during_bulk_update(True, latency)
+        fifo = await _timer_latencies_during_bulk_update(False, latency)
+        p99, fifo_p99 = _percentile(prioritized, 99), _percentile(fifo, 99)
+        print(f"timer p99 with admission control: {p99 * 1000:.1f} ms, FIFO: {fifo_p99 * 1000:.1f} ms")
+        # With priority scheduling a timer call waits for its own request, not
+        # for the bulk chunks queued ahead of it
+        assert p99 < fifo_p99 / 2
@@ -0,0 +1,125 @@
+"""Unit tests for batched tool calls"""
+
+import asyncio
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.batch import BatchError, parse_operations, resolve, run_batch
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+TOOLS = {"toggl_create_tag", "toggl_start_timer", "toggl_get_user"}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = TogglStub(latency=0.02)
+    monkeypatch.setattr(main, "toggl_client", stub.client())
+    monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+    return stub
+
+
+class TestParseOperations:
+    """Test batch validation"""
+
+    def test_dependencies(self):
+        ops = parse_operations([
+            {"id": "tag", "tool": "toggl_create_tag", "arguments": {"name": "x"}},
+            {"tool": "toggl_get_user"},
+            {"tool": "toggl_start_timer", "arguments": {"description": "d", "tags": [{"$ref": "tag.name"}],
+                                                        "workspace_id": {"$ref": "1.default_workspace_id"}}},
+        ], TOOLS, 10)
+        assert [op.id for op in ops] == ["tag", "1", "2"]
+        assert ops[2].depends == {"tag", "1"}
+        assert ops[1].arguments == {}
+
+    @pytest.mark.parametrize("operations, message", [
+        ([], "No operations"),
+        ([{"tool": "toggl_get_user"}] * 4, "Too many"),
+        ([{"arguments": {}}], "'tool' name"),
+        ([{"tool": "toggl_delete_everything"}], "unknown tool"),
+        ([{"id": "a", "tool": "toggl_get_user"}, {"id": "a", "tool": "toggl_get_user"}], "Duplicate"),
+        ([{"tool": "toggl_create_tag", "arguments": {"name": {"$ref": "1.name"}}},
+          {"tool": "toggl_get_user"}], "earlier operation"),
+        ([{"tool": "toggl_get_user", "arguments": ["x"]}], "must be an object"),
+    ])
+    def test_invalid(self, operations, message):
+        with pytest.raises(BatchError, match=message):
+            parse_operations(operations, TOOLS, 3)
+
+    def test_resolve(self):
+        results = {"tag": {"id": 7, "name": "urgent"}, "list": [{"id": 1}, {"id": 2}]}
+        value = {"ids": [{"$ref": "tag.id"}, {"$ref": "list.-1.id"}], "all": {"$ref": "list"}, "n": 3}
+        assert resolve(value, results) == {"ids": [7, 2], "all": results["list"], "n": 3}
+        with pytest.raises(LookupError, match="tag.missing"):
+            resolve({"$ref": "tag.missing"}, results)
+
+
+@pytest.mark.asyncio
+class TestRunBatch:
+    """Test scheduling of batch operations"""
+
+    async def test_independent_operations_overlap(self):
+        running = 0
+        peak = 0
+
+        async def call(tool, arguments):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"tool": tool}
+
+        ops = parse_operations([{"tool": "toggl_get_user"}] * 6, TOOLS, 10)
+        results = await run_batch(ops, call, concurrency=4)
+        assert peak == 4
+        assert [r["status"] for r in results] == ["ok"] * 6
+
+    async def test_failed_dependency_skips_dependents(self):
+        async def call(tool, arguments):
+            if tool == "toggl_create_tag":
+                return {"error": "HTTP 400: tag exists"}
+            return {"ok": True}
+
+        ops = parse_operations([
+            {"id": "tag", "tool": "toggl_create_tag", "arguments": {"name": "x"}},
+            {"tool": "toggl_start_timer", "arguments": {"description": "d", "tags": [{"$ref": "tag.name"}]}},
+            {"tool": "toggl_get_user"},
+        ], TOOLS, 10)
+        results = await run_batch(ops, call, concurrency=4)
+        assert [r["status"] for r in results] == ["error", "skipped", "ok"]
+        assert results[0]["error"] == "HTTP 400: tag exists"
+        assert "'tag'" in results[1]["error"]
+
+
+@pytest.mark.asyncio
+class TestBatchTool:
+    """Test the toggl_batch tool against the stub"""
+
+    async def test_create_and_start_in_one_call(self, stub):
+        result = await main.toggl_batch([
+            {"id": "tag", "tool": "toggl_create_tag", "arguments": {"name": "urgent"}},
+            {"id": "project", "tool": "toggl_create_project", "arguments": {"name": "Launch"}},
+            {"id": "timer", "tool": "toggl_start_timer", "arguments": {
+                "description": "Kickoff", "project_id": {"$ref": "project.id"}, "tags": [{"$ref": "tag.name"}],
+            }},
+        ])
+        assert (result["succeeded"], result["failed"], result["skipped"]) == (3, 0, 0)
+        timer = result["results"][2]["result"]
+        assert timer["project_id"] == result["results"][1]["result"]["id"]
+        assert timer["tags"] == ["urgent"]
+        assert stub.max_in_flight == 2  # The tag and project were created concurrently
+
+    async def test_errors_are_reported_per_operation(self, stub):
+        result = await main.toggl_batch([
+            {"tool": "toggl_stop_timer", "arguments": {"time_entry_id": 999999}},
+            {"tool": "toggl_get_user", "arguments": {"unexpected": 1}},
+            {"tool": "toggl_get_user"},
+        ])
+        assert [r["status"] for r in result["results"]] == ["error", "error", "ok"]
+        assert "unexpected" in result["results"][1]["error"]
+
+    async def test_invalid_batch(self, stub):
+        assert "error" in await main.toggl_batch([{"tool": "toggl_batch", "arguments": {"operations": []}}])
+        assert not stub.calls
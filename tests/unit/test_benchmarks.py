@@ -0,0 +1,43 @@
+"""Smoke tests for the benchmark runner"""
+
+import json
+
+import pytest
+
+from benchmarks.run import format_report, percentile, run_benchmarks
+from toggl_mcp import main
+
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_all_workloads():
+    """Every workload runs cleanly and the results are JSON serializable"""
+    previous = main.toggl_client
+    results = await run_benchmarks(iterations=4, concurrency=2, warmup=1, entries=20, padding=50)
+    assert main.toggl_client is previous
+    json.dumps(results)
+    for name, row in results["tools"].items():
+        assert row["calls"] == 4, name
+        assert row["errors"] == 0, name
+        assert row["p50_ms"] <= row["p99_ms"]
+    assert results["tools"]["toggl_bulk_update_time_entries"]["upstream_requests_per_call"] == 1.0
+    assert "toggl_create_tag" in format_report(results, baseline=results)
+
+
+@pytest.mark.asyncio
+async def test_unknown_workload():
+    with pytest.raises(ValueError):
+        await run_benchmarks(tools=["toggl_nope"])
+
+
+def test_validation_benchmark():
+    from benchmarks import validation
+    results = validation.measure(calls=10, rounds=1)
+    assert [row["tool"] for row in results] == [case[0] for case in validation.CASES]
+    assert "toggl_update_time_entry" in validation.format_report(results)
@@ -0,0 +1,147 @@
+"""Unit tests for the record/replay cassette transports"""
+
+import json
+import time
+
+import httpx
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.cassette import CassetteMiss, RecordingTransport, ReplayTransport
+from toggl_mcp.toggl_client import TogglClient
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+async def _workflow(client: TogglClient):
+    """A mix of cached reads, writes and a chunked bulk request"""
+    me = await client.get_me()
+    projects = await client.get_projects(WORKSPACE_ID)
+    entry = await client.create_time_entry(WORKSPACE_ID, "Recorded", project_id=projects[0]["id"], duration=-1)
+    entries = await client.get_time_entries("2024-01-01T00:00:00Z", "2024-12-31T00:00:00Z")
+    bulk = await client.bulk_update_time_entries(WORKSPACE_ID, [e["id"] for e in entries], {"billable": True})
+    tags = await client.get_tags(WORKSPACE_ID)
+    return me, projects, {k: v for k, v in entry.items() if k != "start"}, entries, bulk, tags
+
+
+def _record(path, stub: TogglStub) -> RecordingTransport:
+    return RecordingTransport(str(path), stub.transport())
+
+
+@pytest.mark.asyncio
+class TestCassette:
+    """Test recording and replaying Toggl traffic"""
+
+    async def test_replay_matches_recording(self, tmp_path):
+        """Replayed traffic gives the same results without a live upstream"""
+        path = tmp_path / "traffic.jsonl"
+        stub = TogglStub()
+        stub.seed_time_entries(150)
+        recorder = _record(path, stub)
+        recorded = await _workflow(TogglClient("secret-token", httpx.AsyncClient(transport=recorder)))
+        await recorder.aclose()
+        assert recorder.recorded == 7
+
+        replay = ReplayTransport(str(path))
+        replayed = await _workflow(TogglClient("other-token", httpx.AsyncClient(transport=replay)))
+        assert replayed == recorded
+        assert replay.replayed == 7
+        assert replay.remaining() == 0
+
+    async def test_credentials_redacted(self, tmp_path):
+        """Neither credentials in requests nor session headers and api_token fields in responses are stored"""
+        path = tmp_path / "me.jsonl"
+        response_headers = [
+            ("set-cookie", "__Host-timer-session=cookie123; Secure"),
+            ("x-session-id", "session123"),
+            ("x-auth-token", "auth123"),
+            ("www-authenticate", "Basic"),
+            ("x-request-id", "req-1"),
+        ]
+        upstream = httpx.MockTransport(
+            lambda request: httpx.Response(200, headers=response_headers, json={"id": 1, "api_token": "abc123"})
+        )
+        recorder = RecordingTransport(str(path), upstream)
+        client = TogglClient("secret-token", httpx.AsyncClient(transport=recorder))
+        assert (await client.get_me())["api_token"] == "abc123"
+        await recorder.aclose()
+
+        text = path.read_text()
+        assert "secret-token" not in text
+        assert client.headers["Authorization"].split()[1] not in text
+        for secret in ("abc123", "cookie123", "session123", "auth123"):
+            assert secret not in text
+        assert "REDACTED" in text
+        stored = dict(json.loads(text.splitlines()[-1])["response"]["headers"])
+        assert stored["www-authenticate"] == "Basic" and stored["x-request-id"] == "req-1"
+
+    async def test_scaled_timing(self, tmp_path):
+        """Recorded latency is replayed as is or scaled"""
+        path = tmp_path / "slow.jsonl"
+        recorder = _record(path, TogglStub(latency=0.05))
+        await TogglClient("t", httpx.AsyncClient(transport=recorder)).get_workspaces()
+        await recorder.aclose()
+
+        async def timed(time_scale):
+            client = TogglClient("t", httpx.AsyncClient(transport=ReplayTransport(str(path), time_scale=time_scale)))
+            started = time.perf_counter()
+            await client.get_workspaces()
+            return time.perf_counter() - started
+
+        assert await timed(1.0) >= 0.045
+        assert await timed(0.1) < 0.03
+
+    async def test_current_time_requests_replay(self, tmp_path, monkeypatch):
+        """Requests carrying the current time, like a timer start, replay later"""
+        path = tmp_path / "timer.jsonl"
+        recorder = _record(path, TogglStub())
+        monkeypatch.setattr(main, "toggl_client", TogglClient("t", httpx.AsyncClient(transport=recorder)))
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        started = await main.toggl_start_timer(description="Standup")
+        listed = await main.toggl_list_time_entries()
+        await recorder.aclose()
+
+        time.sleep(0.01)  # Every timestamp the tools send now differs from the recording
+        replay = ReplayTransport(str(path), time_scale=0, repeat=False)
+        monkeypatch.setattr(main, "toggl_client", TogglClient("t", httpx.AsyncClient(transport=replay)))
+        assert await main.toggl_start_timer(description="Standup") == started
+        assert await main.toggl_list_time_entries() == listed
+        assert replay.misses == [] and replay.remaining() == 0
+
+        # Other values still have to match
+        with pytest.raises(CassetteMiss):
+            await main.toggl_start_timer(description="Review")
+
+    async def test_miss_fails_fast(self, tmp_path):
+        """Requests missing from a strict cassette fail without retries"""
+        path = tmp_path / "empty.jsonl"
+        recorder = _record(path, TogglStub())
+        client = TogglClient("t", httpx.AsyncClient(transport=recorder))
+        await client.get_workspaces()
+        await recorder.aclose()
+
+        replay = ReplayTransport(str(path), repeat=False)
+        client = TogglClient("t", httpx.AsyncClient(transport=replay), cache_ttl=0)
+        await client.get_workspaces()
+        with pytest.raises(CassetteMiss):
+            await client.get_workspaces()
+        with pytest.raises(CassetteMiss):
+            await client.get_tags(WORKSPACE_ID)
+        assert len(replay.misses) == 2
+
+    async def test_compressed_large_workspace(self, tmp_path):
+        """Large recorded workspaces replay from a gzip cassette, also streamed"""
+        path = tmp_path / "large.jsonl.gz"
+        stub = TogglStub(projects=2000)
+        stub.seed_time_entries(20_000, step=60)
+        recorder = _record(path, stub)
+        client = TogglClient("t", httpx.AsyncClient(transport=recorder))
+        projects = await client.get_projects(WORKSPACE_ID)
+        entries = await client.get_time_entries()
+        await recorder.aclose()
+        assert path.stat().st_size < 1_000_000
+
+        client = TogglClient("t", httpx.AsyncClient(transport=ReplayTransport(str(path))))
+        assert await client.get_projects(WORKSPACE_ID) == projects
+        streamed = []
+        await client.stream_time_entries(streamed.append)
+        assert streamed == entries
@@ -0,0 +1,158 @@
+"""Unit tests for no-op elision of time entry updates"""
+
+import pytest
+
+from toggl_mcp.changes import WrittenState, changed_fields, plan_bulk_update, unchanged
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+ENTRY = {
+    "id": 1, "workspace_id": WORKSPACE_ID, "description": "Review", "project_id": 7, "task_id": None,
+    "tags": ["billing", "ops"], "tag_ids": [3, 4], "billable": True,
+    "start": "2024-01-01T09:00:00+00:00", "stop": "2024-01-01T10:00:00+00:00", "duration": 3600,
+}
+
+
+class TestChangedFields:
+    """Test comparison of updates with known entry state"""
+
+    def test_drops_fields_the_entry_has(self):
+        updates = {"description": "Review", "project_id": 7, "billable": False, "start": "2024-01-01T09:00:00Z"}
+        assert changed_fields(ENTRY, updates) == {"billable": False}
+
+    def test_tags_compare_as_sets(self):
+        assert unchanged(ENTRY, "tags", ["ops", "billing"])
+        assert not unchanged(ENTRY, "tags", ["ops"])
+        assert unchanged(ENTRY, "tags", ["ops"], tag_action="add")
+        assert not unchanged(ENTRY, "tag_ids", [5], tag_action="add")
+
+    def test_unknown_fields_are_changed(self):
+        assert changed_fields({"id": 1}, {"description": "", "duronly": False}) == {"description": "", "duronly": False}
+        assert unchanged({"description": None}, "description", "")
+        assert not unchanged(ENTRY, "stop", "yesterday")
+
+
+class TestPlanBulkUpdate:
+    """Test grouping of bulk updates by change set"""
+
+    def test_skips_unchanged_and_groups_changes(self):
+        known = {
+            1: {**ENTRY, "id": 1},
+            2: {**ENTRY, "id": 2, "project_id": 8},
+            3: {**ENTRY, "id": 3, "billable": False},
+            4: {**ENTRY, "id": 4, "billable": False},
+        }
+        skipped, groups = plan_bulk_update([1, 2, 3, 4, 5], {"project_id": 7, "billable": True}, known, 100)
+        assert skipped == [1]
+        # Separate groups would take three requests where one suffices
+        assert groups == [({"project_id": 7, "billable": True}, [2, 3, 4, 5])]
+
+        skipped, groups = plan_bulk_update([2, 3, 4], {"project_id": 7, "billable": True}, known, 2)
+        assert groups == [({"project_id": 7}, [2]), ({"billable": True}, [3, 4])]
+
+    def test_tag_action_follows_tag_changes(self):
+        known = {1: ENTRY, 2: {**ENTRY, "tags": []}}
+        skipped, groups = plan_bulk_update([1, 2], {"tags": ["ops"], "tag_action": "add"}, known, 100)
+        assert skipped == [1]
+        assert groups == [({"tags": ["ops"], "tag_action": "add"}, [2])]
+
+
+class TestWrittenState:
+    """Test the record of recently written entry state"""
+
+    def test_merges_writes_and_expires(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("toggl_mcp.changes.time.monotonic", lambda: now[0])
+        written = WrittenState(10)
+        written.record(1, {"project_id": 7, "tags": ["ops"]})
+        written.record(1, {"billable": True, "tags": ["billing"], "tag_action": "add"}, tag_action="add")
+        assert written.get(1) == {"project_id": 7, "billable": True, "tags": ["billing", "ops"]}
+        written.record(2, {"tags": ["billing"]}, tag_action="add")
+        assert written.get(2) == {}
+
+        now[0] += 11
+        assert written.get(1) is None
+        written.record(3, {"billable": False})
+        assert len(written) == 1
+
+    def test_concurrent_writes_are_not_recorded(self):
+        written = WrittenState(10)
+        written.begin([1, 2])
+        written.begin([1])
+        written.finish(1, {"billable": True})
+        written.finish(2, {"billable": True})
+        written.finish(1, {"billable": False})
+        assert written.get(1) is None and written.get(2) == {"billable": True}
+        written.begin([1])
+        written.finish(1, {"billable": False})
+        assert written.get(1) == {"billable": False}
+
+    def test_zero_ttl_records_nothing(self):
+        written = WrittenState(0)
+        written.record(1, {"billable": True})
+        assert written.get(1) is None
+
+
+@pytest.mark.asyncio
+class TestClientElision:
+    """Test that the client skips updates it has just written"""
+
+    @pytest.fixture
+    async def setup(self):
+        stub = TogglStub(projects=2)
+        stub.seed_time_entries(150)
+        client = stub.client()
+        entries = await client.get_time_entries("2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z")
+        yield stub, client, entries
+        await client.close()
+
+    async def test_fetched_state_is_not_trusted(self, setup):
+        stub, client, entries = setup
+        entry = entries[0]
+        await client.update_time_entry(WORKSPACE_ID, entry["id"], description=entry["description"])
+        assert stub.calls[("PUT", "/workspaces/{id}/time_entries/{id}")] == 1
+
+        ids = [e["id"] for e in entries]
+        result = await client.bulk_update_time_entries(WORKSPACE_ID, ids, {"project_id": next(iter(stub.projects))})
+        assert sorted(result["success"]) == sorted(ids) and "elided" not in result
+        assert client.elided["entries"] == 0
+
+    async def test_update_sends_only_changes(self, setup):
+        stub, client, entries = setup
+        entry_id = entries[0]["id"]
+        await client.update_time_entry(WORKSPACE_ID, entry_id, description="Review")
+        result = await client.update_time_entry(WORKSPACE_ID, entry_id, description="Review")
+        assert result["elided"] is True and result["id"] == entry_id and result["description"] == "Review"
+        assert stub.calls[("PUT", "/workspaces/{id}/time_entries/{id}")] == 1
+
+        stub.time_entries[entry_id]["description"] = "sent"  # Detect what the PUT carries
+        await client.update_time_entry(WORKSPACE_ID, entry_id, description="Review", billable=True)
+        assert stub.time_entries[entry_id]["description"] == "sent"
+        assert stub.time_entries[entry_id]["billable"] is True
+        assert stub.calls[("PUT", "/workspaces/{id}/time_entries/{id}")] == 2
+
+        await client.update_time_entry(WORKSPACE_ID, entry_id, force=True, billable=True)
+        assert stub.calls[("PUT", "/workspaces/{id}/time_entries/{id}")] == 3
+        assert client.elided["entries"] == 1
+
+    async def test_bulk_update_skips_entries_just_written(self, setup):
+        stub, client, entries = setup
+        first, second = stub.projects
+        ids = [e["id"] for e in entries]
+        await client.bulk_update_time_entries(WORKSPACE_ID, ids[:100], {"project_id": first})
+        result = await client.bulk_update_time_entries(WORKSPACE_ID, ids, {"project_id": first})
+        assert sorted(result["success"]) == sorted(ids[100:])
+        assert sorted(result["elided"]) == sorted(ids[:100])
+        assert stub.calls[("PATCH", "/workspaces/{id}/time_entries/{id}")] == 2
+        assert all(e["project_id"] == first for e in stub.time_entries.values())
+
+        result = await client.bulk_update_time_entries(WORKSPACE_ID, ids, {"project_id": first})
+        assert result == {"success": [], "failure": [], "elided": ids}
+        assert stub.calls[("PATCH", "/workspaces/{id}/time_entries/{id}")] == 2
+
+    async def test_written_state_expires(self, setup, monkeypatch):
+        stub, client, entries = setup
+        monkeypatch.setattr(client.written, "ttl", 0)
+        entry = entries[0]
+        await client.update_time_entry(WORKSPACE_ID, entry["id"], description="Review")
+        await client.update_time_entry(WORKSPACE_ID, entry["id"], description="Review")
+        assert stub.calls[("PUT", "/workspaces/{id}/time_entries/{id}")] == 2
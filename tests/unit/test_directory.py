@@ -0,0 +1,133 @@
+"""Unit tests for the cached user directory"""
+
+import asyncio
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.accounting import CallUsage, current_usage
+from toggl_mcp.admission import BACKGROUND, current_call_class
+from toggl_mcp.directory import UserDirectory
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+USERS = [
+    {"id": 1, "fullname": "Priya Raman", "email": "priya@example.com"},
+    {"id": 2, "fullname": "Priyanka Shah", "email": "pshah@example.com"},
+    {"id": 3, "fullname": "Sam Lee", "email": "sam.lee@example.com"},
+]
+
+
+class Loader:
+    """Counts loads and records the call class they ran in"""
+
+    def __init__(self, users=USERS, delay=0.0):
+        self.users = users
+        self.delay = delay
+        self.calls = 0
+        self.classes = []
+        self.usages = []
+        self.fail = False
+
+    async def __call__(self, workspace_id):
+        self.calls += 1
+        self.classes.append(current_call_class.get())
+        self.usages.append(current_usage.get())
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [dict(user) for user in self.users]
+
+
+@pytest.mark.asyncio
+class TestUserDirectory:
+    """Test indexing, lookup and refresh"""
+
+    @pytest.mark.parametrize("query, ids", [
+        ("PRIYA@example.com", [1]),
+        ("priya raman", [1]),
+        ("Priya", [1]),  # A whole word beats the longer "Priyanka"
+        ("priy", [1, 2]),
+        ("lee@", [3]),
+        ("nobody", []),
+    ])
+    async def test_find(self, query, ids):
+        directory = UserDirectory(Loader())
+        assert [u["id"] for u in await directory.find(WORKSPACE_ID, query)] == ids
+
+    async def test_lookups_share_one_fetch(self):
+        loader = Loader(delay=0.01)
+        directory = UserDirectory(loader)
+        await asyncio.gather(*(directory.find(WORKSPACE_ID, "sam") for _ in range(10)))
+        assert len(await directory.users(WORKSPACE_ID)) == 3
+        assert loader.calls == 1
+
+    async def test_stale_users_refresh_in_background(self):
+        loader = Loader(delay=0.01)
+        directory = UserDirectory(loader, ttl=0.05)
+        await directory.users(WORKSPACE_ID)
+        loader.users = USERS + [{"id": 4, "fullname": "New Hire", "email": "new@example.com"}]
+        await asyncio.sleep(0.06)
+
+        # Served from the stale index without waiting for the refresh
+        assert await directory.find(WORKSPACE_ID, "new hire") == []
+        assert directory.stats()["refreshing"] == 1
+        await asyncio.sleep(0.02)
+        assert [u["id"] for u in await directory.find(WORKSPACE_ID, "new hire")] == [4]
+        assert loader.calls == 2
+        assert loader.classes[-1] == BACKGROUND
+
+    async def test_refresh_not_charged_to_tool_call(self):
+        loader = Loader()
+        directory = UserDirectory(loader, ttl=0.01)
+        await directory.users(WORKSPACE_ID)
+        await asyncio.sleep(0.02)
+
+        usage = CallUsage(1, "toggl_find_user", "s1")
+        token = current_usage.set(usage)
+        try:
+            await directory.users(WORKSPACE_ID)
+        finally:
+            current_usage.reset(token)
+        await asyncio.sleep(0.01)
+        assert loader.calls == 2
+        assert loader.usages[-1] is None
+
+    async def test_failed_refresh_keeps_stale_users(self):
+        loader = Loader()
+        directory = UserDirectory(loader, ttl=0.01)
+        await directory.users(WORKSPACE_ID)
+        loader.fail = True
+        await asyncio.sleep(0.02)
+        await directory.users(WORKSPACE_ID)
+        await asyncio.sleep(0.01)
+        assert directory.stats()["refresh_failures"] == 1
+        assert len(await directory.users(WORKSPACE_ID)) == 3
+
+
+@pytest.mark.asyncio
+class TestFindUsersTool:
+    """Test toggl_find_users against the stub"""
+
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub(latency=0.01, projects=0)
+        stub.workspaces = [{"id": 100 + i, "name": f"Team {i}"} for i in range(3)]
+        stub.users = [
+            {"id": 10 + i, "fullname": name, "email": f"{name.split()[0].lower()}@example.com", "workspace_id": 100 + i}
+            for i, name in enumerate(["Priya Raman", "Sam Lee", "Priya Nair"])
+        ]
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", 100)
+        return stub
+
+    async def test_find_in_default_workspace(self, stub):
+        assert [u["id"] for u in await main.toggl_find_users("priya")] == [10]
+        assert await main.toggl_find_users("sam") == []
+        await main.toggl_find_users()
+        assert stub.calls[("GET", "/workspaces/{id}/users")] == 1
+
+    async def test_find_in_all_workspaces(self, stub):
+        result = await main.toggl_find_users("Priya", all_workspaces=True)
+        assert sorted((u["id"], u["workspace_name"]) for u in result["users"]) == [(10, "Team 0"), (12, "Team 2")]
+        await main.toggl_find_users("sam", all_workspaces="true")
+        assert stub.calls[("GET", "/workspaces/{id}/users")] == 3
@@ -0,0 +1,148 @@
+"""Unit tests for the fault-injection transport"""
+
+import time
+
+import httpx
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.faults import Fault, FaultInjectionTransport, FaultRule, load_rules
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+def _client(stub: TogglStub, *rules: FaultRule, seed: int = 0):
+    transport = FaultInjectionTransport(stub.transport(), rules, seed=seed)
+    client = stub.client()
+    client.client = httpx.AsyncClient(transport=transport)
+    client.RETRY_BACKOFF = 0.001
+    return client, transport
+
+
+class TestFaultRule:
+    """Test rule matching and parsing"""
+
+    def test_endpoint_patterns(self):
+        rule = FaultRule(endpoint="PATCH /workspaces/{wid}/time_entries/*")
+        assert rule.matches("PATCH", "/workspaces/{wid}/time_entries/{ids}")
+        assert not rule.matches("GET", "/workspaces/{wid}/time_entries/{ids}")
+        assert FaultRule(endpoint="/me*").matches("GET", "/me/time_entries")
+        assert FaultRule().matches("DELETE", "/anything")
+
+    def test_time_window(self):
+        rule = FaultRule(start=1.0, duration=2.0)
+        assert not rule.active(0.5)
+        assert rule.active(1.5)
+        assert not rule.active(3.0)
+        assert FaultRule(start=1.0).active(1000)
+
+    def test_load_rules(self):
+        rules = load_rules(
+            '[{"endpoint": "GET /me", "probability": 0.5, "fault": {"kind": "status", "status": 429,'
+            ' "retry_after": 1}}, {"script": [{"kind": "reset"}, null]}]'
+        )
+        assert rules[0].fault == Fault(status=429, retry_after=1)
+        assert rules[0].probability == 0.5
+        assert rules[1].script == [Fault(kind="reset"), None]
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            Fault(kind="explode")
+
+
+@pytest.mark.asyncio
+class TestFaultInjectionTransport:
+    """Test injecting faults into TogglClient traffic"""
+
+    async def test_scripted_faults_are_retried(self):
+        """A GET failing twice with 503 succeeds on the third attempt"""
+        stub = TogglStub()
+        client, transport = _client(stub, FaultRule(endpoint="GET /me", script=[Fault(status=503)] * 2))
+        me = await client.get_me()
+        assert me["fullname"] == "Stub User"
+        assert transport.requests == 3
+        assert stub.calls[("GET", "/me")] == 1
+        assert transport.stats()["injected"] == {"GET /me status": 2}
+
+    async def test_status_with_retry_after(self):
+        """Injected 429s carry Retry-After and are retried even for POST"""
+        stub = TogglStub()
+        client, transport = _client(
+            stub, FaultRule(endpoint="POST *", script=[Fault(status=429, retry_after=0.01)])
+        )
+        entry = await client.create_time_entry(WORKSPACE_ID, "After 429", duration=-1)
+        assert entry["description"] == "After 429"
+        assert transport.requests == 2
+
+    async def test_reset_before_and_after_send(self):
+        """Resets before sending never reach upstream; resets after sending do"""
+        stub = TogglStub()
+        client, _ = _client(stub, FaultRule(endpoint="POST *", script=[Fault(kind="reset")]))
+        with pytest.raises(httpx.ConnectError):
+            await client.create_time_entry(WORKSPACE_ID, "Lost", duration=-1)
+        assert not stub.time_entries
+
+        client, _ = _client(stub, FaultRule(endpoint="POST *", script=[Fault(kind="reset", after_send=True)]))
+        with pytest.raises(httpx.ReadError):
+            await client.create_time_entry(WORKSPACE_ID, "Applied", duration=-1)
+        assert [e["description"] for e in stub.time_entries.values()] == ["Applied"]
+
+    async def test_probability_and_limit(self):
+        """Probabilistic faults are reproducible per seed and capped by limit"""
+        stub = TogglStub()
+        rule = FaultRule(endpoint="GET /me/time_entries", probability=1.0, fault=Fault(status=502), limit=3)
+        client, transport = _client(stub, rule)
+        for _ in range(3):
+            await client.get_time_entries()
+        assert rule.injected == 3
+        assert stub.calls[("GET", "/me/time_entries")] == 3
+        assert transport.requests == 6
+
+    async def test_slow_body_and_timeout(self):
+        """Slow bodies arrive intact but late; timeouts raise after the delay"""
+        stub = TogglStub()
+        client, _ = _client(stub, FaultRule(
+            endpoint="GET /me", script=[Fault(kind="slow_body", delay=0.08), Fault(kind="timeout", delay=0.02)]
+        ))
+        client.MAX_RETRIES = 0
+        started = time.monotonic()
+        assert (await client.get_me())["id"] == 1
+        assert time.monotonic() - started >= 0.07
+
+        client._cache.clear()
+        with pytest.raises(httpx.ReadTimeout):
+            await client.get_me()
+
+    async def test_bulk_chunk_failure_keeps_other_chunks(self):
+        """A chunk that keeps failing is reported, the other chunks still apply"""
+        stub = TogglStub()
+        ids = [e["id"] for e in stub.seed_time_entries(250)]
+        client, _ = _client(stub, FaultRule(endpoint="PATCH *", script=[None, Fault(kind="reset")]))
+        client.MAX_RETRIES = 0
+        result = await client.bulk_update_time_entries(WORKSPACE_ID, ids, {"billable": True})
+        assert len(result["success"]) == 150
+        assert len(result["failure"]) == 100
+        assert sorted(result["success"] + result["failure"]) == ids
+        assert result["errors"][0]["time_entry_ids"] == result["failure"]
+        assert sum(e.get("billable", False) for e in stub.time_entries.values()) == 150
+
+    async def test_bulk_delete_reports_failed_chunk(self, monkeypatch):
+        """The bulk delete tool does not claim success for entries in a failed chunk"""
+        stub = TogglStub()
+        ids = [e["id"] for e in stub.seed_time_entries(150)]
+        client, _ = _client(stub, FaultRule(endpoint="DELETE *", script=[None, Fault(status=500)]))
+        client.MAX_RETRIES = 0
+        monkeypatch.setattr(main, "toggl_client", client)
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        result = await main.toggl_bulk_delete_time_entries(ids)
+        assert result["success"] is False
+        assert result["message"] == "Deleted 100 of 150 time entries; 50 were not deleted"
+        assert sorted(result["failed_time_entry_ids"]) == sorted(stub.time_entries)
+        assert len(stub.time_entries) == 50
+
+    async def test_bulk_all_chunks_failing_raises(self):
+        stub = TogglStub()
+        ids = [e["id"] for e in stub.seed_time_entries(150)]
+        client, _ = _client(stub, FaultRule(endpoint="PATCH *", probability=1.0, fault=Fault(status=500)))
+        client.MAX_RETRIES = 0
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.bulk_update_time_entries(WORKSPACE_ID, ids, {"billable": True})
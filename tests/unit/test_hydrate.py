@@ -0,0 +1,72 @@
+"""Unit tests for hydrated time entries"""
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.hydrate import ReferenceIndex, hydrate_entries
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+RANGE = ("2024-01-01T00:00:00Z", "2024-12-31T00:00:00Z")
+
+
+def test_hydrate_entries():
+    index = ReferenceIndex.build(
+        projects=[{"id": 1, "name": "Launch", "client_id": 5}, {"id": 2, "name": "Internal"}],
+        clients=[{"id": 5, "name": "Acme"}],
+        tags=[{"id": 7, "name": "urgent"}, {"id": 8, "name": "review"}],
+        tasks=[{"id": 9, "name": "Design"}],
+    )
+    entries = [
+        {"id": 100, "workspace_id": 1, "project_id": 1, "task_id": 9, "tag_ids": [8, 7, 99]},
+        {"id": 101, "workspace_id": 1, "project_id": 2, "tags": ["kept"], "tag_ids": [7]},
+        {"id": 102, "workspace_id": 1, "project_id": 3},
+        {"id": 103, "workspace_id": 2, "project_id": 1},
+    ]
+    hydrated = hydrate_entries(entries, {1: index})
+    assert [(e["project_name"], e["client_name"], e["task_name"], e.get("tags")) for e in hydrated] == [
+        ("Launch", "Acme", "Design", ["review", "urgent"]),
+        ("Internal", None, None, ["kept"]),
+        (None, None, None, None),
+        (None, None, None, None),  # No reference data for workspace 2
+    ]
+    assert "project_name" not in entries[0]
+
+
+@pytest.mark.asyncio
+class TestHydratedListing:
+    """Test toggl_list_time_entries(hydrate=True) against the stub"""
+
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub(latency=0.02, projects=0)
+        client = stub._add(stub.clients, {"name": "Acme", "workspace_id": WORKSPACE_ID})
+        project = stub._add(stub.projects, {"name": "Launch", "workspace_id": WORKSPACE_ID, "client_id": client["id"]})
+        tag = stub._add(stub.tags, {"name": "urgent", "workspace_id": WORKSPACE_ID})
+        task = stub._add(stub.tasks, {"name": "Design", "project_id": project["id"], "workspace_id": WORKSPACE_ID})
+        for i in range(20):
+            stub._add(stub.time_entries, {
+                "description": f"Entry {i}", "workspace_id": WORKSPACE_ID, "start": f"2024-03-{i + 1:02d}T09:00:00Z",
+                "duration": 3600, "project_id": project["id"], "tag_ids": [tag["id"]],
+                "task_id": task["id"] if i % 2 else None,
+            })
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        return stub
+
+    async def test_names_resolved_with_one_fetch_each(self, stub):
+        entries = await main.toggl_list_time_entries(*RANGE, hydrate=True)
+        assert len(entries) == 20
+        assert {(e["project_name"], e["client_name"], tuple(e["tags"])) for e in entries} == {
+            ("Launch", "Acme", ("urgent",))
+        }
+        assert sorted({e["task_name"] for e in entries}, key=str) == ["Design", None]
+        for endpoint in ("/me/time_entries", "/workspaces/{id}/projects", "/workspaces/{id}/clients",
+                         "/workspaces/{id}/tags", "/workspaces/{id}/tasks"):
+            assert stub.calls[("GET", endpoint)] == 1
+        # The entries and the reference data were fetched concurrently
+        assert stub.max_in_flight == 4
+
+    async def test_plain_listing_unchanged(self, stub):
+        entries = await main.toggl_list_time_entries(*RANGE)
+        assert "project_name" not in entries[0]
+        assert sum(stub.calls.values()) == 1
@@ -0,0 +1,142 @@
+"""Unit tests for the adaptive concurrency limiter and client retries"""
+
+import httpx
+import pytest
+
+from toggl_mcp.limits import AdaptiveLimiter
+from toggl_mcp.toggl_client import TogglClient
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+class TestAdaptiveLimiter:
+    """Test AIMD behavior"""
+
+    def test_additive_increase_when_saturated(self):
+        """The limit grows by about one per window of successes"""
+        limiter = AdaptiveLimiter(initial=4, max_limit=10)
+        for _ in range(5):
+            limiter.on_success(0.05, in_flight=4)
+        assert limiter.limit == 5
+        for _ in range(200):
+            limiter.on_success(0.05, in_flight=limiter.limit)
+        assert limiter.limit == 10
+
+    def test_no_growth_when_idle(self):
+        """An unused limit does not inflate"""
+        limiter = AdaptiveLimiter(initial=4)
+        for _ in range(100):
+            limiter.on_success(0.05, in_flight=1)
+        assert limiter.limit == 4
+
+    def test_multiplicative_decrease(self):
+        """Back off halves the limit, once per round trip"""
+        limiter = AdaptiveLimiter(initial=16)
+        limiter.on_success(10.0, in_flight=1)  # 10s baseline: later failures are one burst
+        limiter.on_backoff("throttled")
+        limiter.on_backoff("throttled")
+        assert limiter.limit == 8
+        assert limiter.backoffs == 1
+
+    def test_latency_spike_backs_off(self):
+        """Latency far above the baseline counts as congestion"""
+        limiter = AdaptiveLimiter(initial=8)
+        limiter.on_success(0.01, in_flight=1)
+        limiter.on_success(0.2, in_flight=8)
+        assert limiter.limit == 4
+        assert limiter.stats()["backoffs"] == 1
+
+    def test_bounds(self):
+        """The limit stays within min and max"""
+        limiter = AdaptiveLimiter(initial=2, min_limit=2)
+        limiter.on_backoff("timeout")
+        assert limiter.limit == 2
+
+
+def _client(handler, **kwargs) -> TogglClient:
+    client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+    client.RETRY_BACKOFF = 0.001
+    return client
+
+
+@pytest.mark.asyncio
+class TestRetries:
+    """Test retry of throttled and failed requests"""
+
+    async def test_429_retried_with_retry_after(self):
+        """Throttled requests are retried and shrink the limit"""
+        responses = iter([
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"id": 1}),
+        ])
+        client = _client(lambda request: next(responses))
+        assert await client.create_tag(WORKSPACE_ID, "x") == {"id": 1}
+        assert client.limiter.backoffs == 1
+
+    async def test_post_not_retried_on_5xx(self):
+        """Non-idempotent requests fail fast on server errors"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        client = _client(handler)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.create_tag(WORKSPACE_ID, "x")
+        assert len(calls) == 1
+
+    async def test_errors_do_not_grow_limit(self):
+        """Server errors shrink the limit; client errors leave it alone"""
+        statuses = iter([404, 500])
+        client = _client(lambda request: httpx.Response(next(statuses)))
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.create_tag(WORKSPACE_ID, "x")
+        assert client.limiter.baseline is None  # No latency sample taken
+        assert client.limiter.backoffs == 1
+
+    async def test_get_retried_on_connection_error(self):
+        """Idempotent requests survive a dropped connection"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("reset")
+            return httpx.Response(200, json=[])
+
+        client = _client(handler)
+        assert await client.get_tags(WORKSPACE_ID) == []
+        assert len(calls) == 2
+
+    async def test_gives_up_after_max_retries(self):
+        """Persistent throttling is eventually reported"""
+        client = _client(lambda request: httpx.Response(429))
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_me()
+
+
+@pytest.mark.asyncio
+class TestSharedLimiter:
+    """Every concurrent path in the client shares one limiter"""
+
+    async def test_bulk_converges_below_upstream_capacity(self):
+        """Chunks of a large bulk update back off to what upstream accepts"""
+        stub = TogglStub(latency=0.005)
+        ids = [e["id"] for e in stub.seed_time_entries(3000)]
+        upstream_capacity = 3
+        rejected = []
+
+        async def handler(request):
+            if stub.in_flight >= upstream_capacity:
+                rejected.append(request)
+                return httpx.Response(429)
+            return await stub.handle(request)
+
+        client = _client(handler)
+        client.limiter.max_limit = 16
+        result = await client.bulk_update_time_entries(WORKSPACE_ID, ids, {"billable": True})
+        assert len(result["success"]) == 3000
+        assert client.limiter.backoffs >= 1
+        assert client.limiter_stats()["limiter"]["limit"] <= 2 * upstream_capacity
+        assert client.admission.in_flight == 0
@@ -0,0 +1,155 @@
+"""Unit tests for request and tool metrics"""
+
+import time
+
+import httpx
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.metrics import Histogram, Metrics, endpoint_template, metrics, serve_prometheus
+from toggl_mcp.registry import ClientRegistry
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestEndpointTemplate:
+    """Test grouping of API paths"""
+
+    def test_ids_replaced(self):
+        assert endpoint_template("/workspaces/12/time_entries/34") == "/workspaces/{wid}/time_entries/{id}"
+        assert endpoint_template("/workspaces/12/projects/5/tasks") == "/workspaces/{wid}/projects/{id}/tasks"
+        assert endpoint_template("/workspaces/12/time_entries/1,2,3") == "/workspaces/{wid}/time_entries/{ids}"
+        assert endpoint_template("/me/time_entries") == "/me/time_entries"
+
+
+class TestHistogram:
+    """Test latency histograms"""
+
+    def test_quantiles(self):
+        histogram = Histogram()
+        for _ in range(98):
+            histogram.observe(0.003)
+        histogram.observe(0.2)
+        histogram.observe(20.0)
+        assert histogram.quantile(0.5) == 0.005
+        assert histogram.quantile(0.99) == 0.25
+        assert histogram.quantile(1.0) == float("inf")
+        assert histogram.summary()["p50_ms"] == 5.0
+
+    def test_empty(self):
+        assert Histogram().summary()["p99_ms"] is None
+
+    def test_prometheus_format(self):
+        recorded = Metrics()
+        recorded.observe_request("GET", "/workspaces/1/tags", 200, 0.02, 0, 100)
+        recorded.observe_tool("toggl_list_tags", 0.03)
+        text = recorded.render_prometheus()
+        assert 'toggl_request_duration_seconds_bucket{method="GET",endpoint="/workspaces/{wid}/tags",le="0.025"} 1' in text
+        assert 'toggl_requests_total{method="GET",endpoint="/workspaces/{wid}/tags",status="200"} 1' in text
+        assert 'toggl_response_bytes_total{method="GET",endpoint="/workspaces/{wid}/tags"} 100' in text
+        assert 'toggl_tool_duration_seconds_count{tool="toggl_list_tags"} 1' in text
+
+    @pytest.mark.slow
+    def test_recording_overhead(self):
+        """Recording an event costs a few microseconds at most"""
+        recorded = Metrics()
+        n = 20_000
+        started = time.perf_counter()
+        for i in range(n):
+            recorded.observe_request("GET", "/workspaces/1/tags", 200, 0.01, 10, 100)
+        per_event = (time.perf_counter() - started) / n
+        assert per_event < 20e-6
+
+
+@pytest.mark.asyncio
+class TestClientMetrics:
+    """Test metrics recorded by TogglClient"""
+
+    async def test_requests_and_cache(self):
+        """Requests, bytes and cache lookups are counted per endpoint template"""
+        stub = TogglStub()
+        client = stub.client()
+        await client.get_tags(WORKSPACE_ID)
+        await client.get_tags(WORKSPACE_ID)
+        await client.create_tag(WORKSPACE_ID, "x")
+        snapshot = metrics.snapshot()
+        tags = snapshot["endpoints"]["GET /workspaces/{wid}/tags"]
+        assert tags["count"] == 1
+        assert tags["status"] == {"200": 1}
+        assert tags["bytes_in"] > 0
+        assert snapshot["endpoints"]["POST /workspaces/{wid}/tags"]["bytes_out"] > 0
+        assert snapshot["cache"] == {"hits": 1, "misses": 1}
+        await client.close()
+
+    async def test_retries_counted(self):
+        """Each retry and the status that caused it are recorded"""
+        responses = iter([httpx.Response(429), httpx.Response(200, json={})])
+        client = main.TogglClient(
+            "token", httpx.AsyncClient(transport=httpx.MockTransport(lambda r: next(responses)))
+        )
+        client.RETRY_BACKOFF = 0.001
+        await client.get_me()
+        me = metrics.snapshot()["endpoints"]["GET /me"]
+        assert me["status"] == {"429": 1, "200": 1}
+        assert me["retries"] == 1
+
+
+@pytest.mark.asyncio
+class TestToolMetrics:
+    """Test per-tool metrics and the stats tool"""
+
+    async def test_tool_latency_and_errors(self, monkeypatch):
+        stub = TogglStub()
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        await main.toggl_list_tags()
+        await main.toggl_list_project_tasks(999)
+        monkeypatch.setattr(main, "toggl_client", None)
+        await main.toggl_list_tags()
+
+        tools = metrics.snapshot()["tools"]
+        assert tools["toggl_list_tags"]["count"] == 2
+        assert tools["toggl_list_tags"]["errors"] == 1
+        assert tools["toggl_list_project_tasks"]["errors"] == 0
+
+    async def test_server_stats(self, monkeypatch):
+        stub = TogglStub()
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        await main.toggl_list_workspaces()
+        stats = await main.toggl_server_stats()
+        assert "GET /workspaces" in stats["endpoints"]
+        assert stats["concurrency"]["limiter"]["limit"] >= 1
+        assert stats["tools"]["toggl_list_workspaces"]["count"] == 1
+
+    async def test_server_stats_multi_tenant(self, monkeypatch):
+        """Tenants see their own client's stats, not process-wide metrics"""
+        stub = TogglStub()
+        registry = ClientRegistry(http_client=stub.client().client)
+        monkeypatch.setattr(main, "client_registry", registry)
+        monkeypatch.setattr(main, "session_credentials", lambda: ("alice", None))
+        await main.toggl_list_workspaces()
+        stats = await main.toggl_server_stats()
+        assert set(stats) == {"concurrency", "user_directory", "elided_updates"}
+
+        monkeypatch.setattr(main, "session_credentials", lambda: (None, None))
+        assert await main.toggl_server_stats() == main.client_not_initialized()
+
+    async def test_prometheus_listener(self):
+        """The standalone listener serves the text format at /metrics"""
+        metrics.observe_tool("toggl_get_user", 0.01)
+        server = await serve_prometheus("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with httpx.AsyncClient() as http:
+            response = await http.get(f"http://127.0.0.1:{port}/metrics")
+            missing = await http.get(f"http://127.0.0.1:{port}/other")
+        server.close()
+        await server.wait_closed()
+        assert response.status_code == 200
+        assert 'toggl_tool_duration_seconds_count{tool="toggl_get_user"} 1' in response.text
+        assert missing.status_code == 404
@@ -0,0 +1,99 @@
+"""Unit tests for on-demand tool profiling"""
+
+import os
+import pstats
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.profiling import Profiler, profiler
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+@pytest.fixture
+def tool_profiler(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "directory", str(tmp_path))
+    monkeypatch.setattr(profiler, "_armed", {})
+    monkeypatch.setattr(profiler, "_written", [])
+    return profiler
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = TogglStub()
+    stub.seed_time_entries(50)
+    monkeypatch.setattr(main, "toggl_client", stub.client())
+    monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+    return stub
+
+
+def _busy_loop(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+class TestProfiler:
+    """Test arming and disarming"""
+
+    def test_configure(self, tmp_path):
+        p = Profiler(str(tmp_path))
+        p.configure("toggl_get_user, toggl_list_tags:3:sample")
+        assert p.status()["armed"] == {
+            "toggl_get_user": {"mode": "cprofile", "remaining_calls": 1},
+            "toggl_list_tags": {"mode": "sample", "remaining_calls": 3},
+        }
+        p.arm("toggl_list_tags", 0)
+        assert list(p.status()["armed"]) == ["toggl_get_user"]
+        with pytest.raises(ValueError):
+            p.configure("toggl_get_user:1:perf")
+
+    def test_unarmed_tools_are_not_profiled(self, tmp_path):
+        p = Profiler(str(tmp_path))
+        p.arm("toggl_get_user")
+        with p.profile("toggl_list_tags"):
+            _busy_loop(1000)
+        assert not os.listdir(tmp_path)
+
+    def test_sampler_writes_collapsed_stacks(self, tmp_path):
+        p = Profiler(str(tmp_path))
+        p.arm("toggl_get_user", mode="sample")
+        with p.profile("toggl_get_user", "abc"):
+            _busy_loop(3_000_000)
+        [written] = p.status()["profiles"]
+        lines = open(written["path"]).read().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("_busy_loop" in line for line in lines)
+
+
+@pytest.mark.asyncio
+class TestToolProfiling:
+    """Test profiling tool calls through the tool wrapper"""
+
+    async def test_profiles_next_calls_only(self, tool_profiler, stub, tmp_path):
+        status = await main.toggl_profile_tool("toggl_list_time_entries", calls=2)
+        assert status["armed"]["toggl_list_time_entries"]["remaining_calls"] == 2
+
+        for _ in range(3):
+            await main.toggl_list_time_entries("2024-01-01T00:00:00Z", "2030-01-01T00:00:00Z")
+        await main.toggl_get_user()
+
+        status = await main.toggl_profile_tool()
+        assert status["armed"] == {}
+        assert [p["tool"] for p in status["profiles"]] == ["toggl_list_time_entries"] * 2
+        stats = pstats.Stats(status["profiles"][0]["path"])
+        assert any(name == "get_time_entries" for _, _, name in stats.stats)
+
+    async def test_tracemalloc_report(self, tool_profiler, stub, tmp_path):
+        await main.toggl_profile_tool("toggl_list_time_entries", mode="tracemalloc")
+        await main.toggl_list_time_entries("2024-01-01T00:00:00Z", "2030-01-01T00:00:00Z")
+
+        [written] = profiler.status()["profiles"]
+        report = open(written["path"]).read()
+        assert report.startswith("Allocations during toggl_list_time_entries")
+        assert os.path.exists(written["path"][:-len(".txt")] + ".tracemalloc")
+
+    async def test_invalid_requests(self, tool_profiler):
+        assert "error" in await main.toggl_profile_tool("toggl_nonexistent")
+        assert "error" in await main.toggl_profile_tool("toggl_get_user", mode="perf")
+        assert profiler.status()["armed"] == {}
@@ -0,0 +1,82 @@
+"""Unit tests for recent entry combinations and toggl_continue_entry"""
+
+import time
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.recent import RecentEntries
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+def entry(entry_id, description, start, **fields):
+    return {"id": entry_id, "description": description, "start": start, "workspace_id": WORKSPACE_ID, **fields}
+
+
+class TestRecentEntries:
+    """Test combination tracking"""
+
+    def test_distinct_combinations_most_recent_first(self):
+        recent = RecentEntries()
+        recent.add([
+            entry(1, "Code review", "2024-03-01T09:00:00Z", project_id=5, tags=["dev"]),
+            entry(2, "Code review", "2024-03-04T09:00:00Z", project_id=5, tags=["dev"]),
+            entry(3, "Code review", "2024-03-02T09:00:00Z", project_id=6),
+            entry(4, "Standup", "2024-03-03T09:00:00Z", billable=True),
+        ])
+        assert len(recent) == 3
+        assert [(c["last_entry_id"], c["project_id"]) for c in recent.recent()] == [(2, 5), (4, None), (3, 6)]
+        # An older copy of a known combination does not move it back
+        recent.add([entry(1, "Code review", "2024-03-01T09:00:00Z", project_id=5, tags=["dev"])])
+        assert recent.recent(limit=1)[0]["last_entry_id"] == 2
+
+    def test_query_matches_description_and_tags(self):
+        recent = RecentEntries()
+        recent.add([
+            entry(1, "Invoice migration", "2024-03-01T09:00:00Z", tags=["Billing"]),
+            entry(2, "Standup", "2024-03-02T09:00:00Z"),
+        ])
+        assert [c["last_entry_id"] for c in recent.recent("MIGRATION billing")] == [1]
+        assert recent.recent("retro") == []
+
+    def test_least_recent_dropped(self):
+        recent = RecentEntries(max_size=2)
+        recent.add([entry(i, f"Task {i}", f"2024-03-0{i}T09:00:00Z") for i in range(1, 5)])
+        assert [c["description"] for c in recent.recent()] == ["Task 4", "Task 3"]
+
+
+@pytest.mark.asyncio
+class TestContinueEntry:
+    """Test toggl_continue_entry against the stub"""
+
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub(projects=0)
+        yesterday = time.strftime("%Y-%m-%dT09:00:00Z", time.gmtime(time.time() - 86400))
+        stub._add(stub.time_entries, {**entry(0, "Invoice migration", yesterday, project_id=42, task_id=7,
+                                              tags=["billing"], billable=True), "duration": 3600})
+        stub._add(stub.time_entries, {**entry(0, "Standup", yesterday, tag_ids=[3]), "duration": 900})
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        return stub
+
+    async def test_continue_from_listed_entries_in_one_call(self, stub):
+        await main.toggl_list_time_entries()
+        stub.calls.clear()
+        result = await main.toggl_continue_entry("invoice")
+        assert (result["description"], result["project_id"], result["task_id"]) == ("Invoice migration", 42, 7)
+        assert result["tags"] == ["billing"] and result["billable"] is True and result["duration"] == -1
+        assert sum(stub.calls.values()) == 1
+
+    async def test_cold_start_fetches_recent_entries_once(self, stub):
+        result = await main.toggl_continue_entry()
+        assert result["description"] in ("Invoice migration", "Standup")
+        assert await main.toggl_continue_entry("standup")
+        assert "error" in await main.toggl_continue_entry("retrospective")
+        assert stub.calls[("GET", "/me/time_entries")] == 1
+
+    async def test_continue_by_entry_id(self, stub):
+        standup = next(e for e in stub.time_entries.values() if e["description"] == "Standup")
+        result = await main.toggl_continue_entry(time_entry_id=str(standup["id"]))
+        assert result["tag_ids"] == [3] and result["continued_from"] == standup["id"]
+        assert "not found" in (await main.toggl_continue_entry(time_entry_id=1))["error"]
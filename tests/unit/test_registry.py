@@ -0,0 +1,177 @@
+"""Unit tests for multi-tenant client registry and session credentials"""
+
+import asyncio
+import time
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from mcp.server.lowlevel.server import request_ctx
+
+from toggl_mcp import main
+from toggl_mcp.registry import ClientRegistry
+from toggl_mcp.limits import RateBudget
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+def _fake_request_context(headers=None, experimental=None):
+    """Minimal stand-in for the MCP request context of one session"""
+    capabilities = SimpleNamespace(experimental=experimental)
+    session = SimpleNamespace(client_params=SimpleNamespace(capabilities=capabilities))
+    request = SimpleNamespace(headers=headers) if headers is not None else None
+    return SimpleNamespace(session=session, request=request)
+
+
+def _tenant(registry, token):
+    """Client for token, as it is once the API has accepted the token"""
+    client = registry.get(token)
+    client.authenticated = True
+    return registry.get(token)
+
+
+class TestClientRegistry:
+    """Test LRU and idle eviction of tenant clients"""
+
+    def test_same_token_same_client(self):
+        """A token maps to one client, and all tenants share the HTTP pool"""
+        registry = ClientRegistry()
+        a = registry.get("token-a")
+        assert registry.get("token-a") is a
+        b = registry.get("token-b")
+        assert b is not a
+        assert a.client is b.client is registry.http_client
+        assert a._cache is not b._cache
+
+    def test_lru_eviction(self):
+        """The least recently used tenant is evicted at capacity"""
+        registry = ClientRegistry(max_clients=2)
+        a = _tenant(registry, "a")
+        _tenant(registry, "b")
+        registry.get("a")
+        _tenant(registry, "c")
+        assert len(registry) == 2
+        assert registry.get("a") is a
+        assert registry._key("b") not in registry._clients
+
+    def test_unverified_tokens_do_not_evict_tenants(self):
+        """Tokens the API has not accepted only compete for probation slots"""
+        registry = ClientRegistry(max_clients=2, max_unverified=3)
+        a = _tenant(registry, "a")
+        for i in range(50):
+            registry.get(f"made-up-{i}")
+        assert registry.get("a") is a
+        assert len(registry._clients) == 1 and len(registry._unverified) == 3
+
+    async def test_evicted_clients_are_closed(self):
+        """Clients evicted at capacity or when idle are closed, as are the rest on close"""
+        registry = ClientRegistry(max_clients=1, idle_timeout=10)
+        a = _tenant(registry, "a")
+        with patch.object(a, "close", wraps=a.close) as close_a:
+            b = _tenant(registry, "b")
+            await asyncio.gather(*registry._closing)
+            close_a.assert_awaited_once()
+        with patch.object(b, "close", wraps=b.close) as close_b:
+            assert registry.evict_idle(time.monotonic() + 11) == 1
+            await asyncio.gather(*registry._closing)
+            close_b.assert_awaited_once()
+        c = _tenant(registry, "c")
+        with patch.object(c, "close", wraps=c.close) as close_c:
+            await registry.close()
+            close_c.assert_awaited_once()
+        assert len(registry) == 0 and registry.http_client.is_closed
+
+    def test_idle_eviction(self):
+        """Clients unused for longer than the idle timeout are evicted"""
+        registry = ClientRegistry(idle_timeout=10)
+        registry.get("a")
+        registry.get("b")
+        now = time.monotonic()
+        assert registry.evict_idle(now + 5) == 0
+        assert registry.evict_idle(now + 11) == 2
+        assert len(registry) == 0
+
+    def test_rate_budget_per_tenant(self):
+        """Each tenant gets its own rate budget"""
+        registry = ClientRegistry(rate_limit=2)
+        a, b = registry.get("a"), registry.get("b")
+        assert isinstance(a.rate_budget, RateBudget)
+        assert a.rate_budget is not b.rate_budget
+
+    def test_memory_per_idle_tenant(self):
+        """Hundreds of idle tenants stay cheap"""
+        tenants = 500
+        registry = ClientRegistry(rate_limit=1)
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            for i in range(tenants):
+                _tenant(registry, f"token-{i:04d}")
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        per_tenant = (after - before) / tenants
+        assert len(registry) == tenants
+        assert per_tenant < 8 * 1024, f"{per_tenant:.0f} bytes per idle tenant"
+
+
+@pytest.mark.asyncio
+class TestRateBudget:
+    """Test the token bucket"""
+
+    async def test_burst_then_throttle(self):
+        """Requests beyond the burst wait for refill"""
+        budget = RateBudget(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await budget.acquire()
+        # Two immediate, then two more at 50/s
+        assert time.monotonic() - started >= 0.035
+
+
+@pytest.mark.asyncio
+class TestMultiTenantTools:
+    """Tools resolve the client and workspace from the session"""
+
+    async def test_header_credentials(self):
+        """Sessions with different tokens use isolated clients"""
+        stub = TogglStub()
+        registry = ClientRegistry(http_client=stub.client().client)
+        with patch.object(main, "client_registry", registry), patch.object(main, "toggl_client", None):
+            for token in ("alice", "bob"):
+                ctx = _fake_request_context({"x-toggl-api-token": token, "x-toggl-workspace-id": str(WORKSPACE_ID)})
+                reset = request_ctx.set(ctx)
+                try:
+                    projects = await main.toggl_list_projects()
+                    assert main.get_client() is registry.get(token)
+                finally:
+                    request_ctx.reset(reset)
+                assert len(projects) == 3
+        # Caches are per tenant, so each token fetched once
+        assert stub.calls[("GET", "/workspaces/{id}/projects")] == 2
+        assert len(registry) == 2
+
+    async def test_bearer_and_init_credentials(self):
+        """Bearer tokens and initialization capabilities are accepted"""
+        with patch.object(main, "client_registry", ClientRegistry()):
+            reset = request_ctx.set(_fake_request_context({"authorization": "Bearer abc"}))
+            try:
+                assert main.session_credentials() == ("abc", None)
+            finally:
+                request_ctx.reset(reset)
+
+            reset = request_ctx.set(_fake_request_context(
+                experimental={"toggl": {"api_token": "xyz", "workspace_id": "42"}}
+            ))
+            try:
+                assert main.session_credentials() == ("xyz", 42)
+                assert main.get_workspace_id() == 42
+            finally:
+                request_ctx.reset(reset)
+
+    async def test_missing_credentials(self):
+        """Tools report an error when the session sent no token"""
+        with patch.object(main, "client_registry", ClientRegistry()), patch.object(main, "toggl_client", None):
+            result = await main.toggl_get_user()
+        assert "X-Toggl-Api-Token" in result["error"]
@@ -0,0 +1,143 @@
+"""Unit tests for the time entry search index"""
+
+import time
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.search import TimeEntryIndex, tokenize
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+ENTRIES = [
+    {"id": 1, "description": "Invoice migration: schema", "start": "2024-03-01T09:00:00Z", "project_id": 10},
+    {"id": 2, "description": "Invoices review", "start": "2024-03-05T09:00:00Z", "tags": ["Billing"]},
+    {"id": 3, "description": "Café planning", "start": "2024-03-03T09:00:00Z", "project_id": 11},
+    {"id": 4, "description": "Migration dry run", "start": "2024-03-04T09:00:00Z", "project_id": 10},
+]
+
+
+def ids(result):
+    entries, _ = result
+    return [entry["id"] for entry in entries]
+
+
+class TestTimeEntryIndex:
+    """Test indexing and queries"""
+
+    def setup_method(self):
+        self.index = TimeEntryIndex()
+        self.index.add(ENTRIES)
+
+    def test_tokenize(self):
+        assert tokenize("Invoice-Migration, CAFÉ 2") == ["invoice", "migration", "café", "2"]
+
+    @pytest.mark.parametrize("query, expected", [
+        ("invoice", [2, 1]),  # Prefix match, most recent first
+        ("INVOICE MIGR", [1]),
+        ("billing", [2]),
+        ("café", [3]),
+        ("migration invoices", []),
+        ("", []),
+    ])
+    def test_search(self, query, expected):
+        assert ids(self.index.search(query)) == expected
+
+    def test_project_names_and_dates(self):
+        names = {10: "Billing platform", 11: "Offsite"}
+        assert ids(self.index.search("billing", project_names=names)) == [2, 4, 1]
+        start, end = 1709251200 + 2 * 86400, 1709251200 + 5 * 86400  # 2024-03-03 to 2024-03-06
+        entries, total = self.index.search("billing", start, end, names, limit=1)
+        assert [e["id"] for e in entries] == [2] and total == 2
+
+    def test_incremental_updates(self):
+        self.index.add([{**ENTRIES[0], "description": "Quarterly report"}])
+        assert ids(self.index.search("invoice")) == [2]
+        assert ids(self.index.search("quarter")) == [1]
+        self.index.remove([2])
+        assert ids(self.index.search("invoice")) == []
+        assert len(self.index) == 3
+
+    def test_oldest_entries_dropped_beyond_limit(self):
+        index = TimeEntryIndex(max_entries=2)
+        assert not index.add(ENTRIES)
+        assert sorted(index.entries) == [2, 4]
+        # The older entries of the batch were never tokenized
+        assert sorted(index._postings) == ["billing", "dry", "invoices", "migration", "review", "run"]
+        assert index.add([ENTRIES[3]])
+        assert not index.add([{**ENTRIES[0], "id": 5}])  # Evicted straight away
+
+    def test_eviction_keeps_latest_starts(self):
+        index = TimeEntryIndex(max_entries=3)
+        index.add(ENTRIES)
+        index.add([{**ENTRIES[0], "start": "2024-03-09T09:00:00Z"}])  # Moves entry 1 from oldest to newest
+        assert sorted(index.entries) == [1, 2, 4]
+        for i in range(2000):
+            index.add([{**ENTRIES[3], "id": 100 + i, "start": "2024-03-10T09:00:00Z"}])
+        assert len(index) == 3 and len(index._by_start) <= 2 * 3 + 1024
+
+    def test_entries_age_out(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("toggl_mcp.search.time.monotonic", lambda: now[0])
+        index = TimeEntryIndex(max_age=60)
+        index.add(ENTRIES[:2])
+        now[0] += 30
+        index.add(ENTRIES[2:])
+        index.mark_covered(0, 100)
+        now[0] += 45
+        assert ids(index.search("invoice")) == []
+        assert sorted(index.entries) == [3, 4]
+        assert not index.covers(0, 100, max_age=3600)
+
+    def test_coverage(self):
+        self.index.mark_covered(0, 100)
+        self.index.mark_covered(50, 200)
+        assert self.index.covers(10, 180, max_age=60)
+        assert not self.index.covers(10, 250, max_age=60)
+        assert not self.index.covers(10, 180, max_age=0)
+
+
+@pytest.mark.asyncio
+class TestSearchTool:
+    """Test toggl_search_time_entries against the stub"""
+
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub(projects=0)
+        project = stub._add(stub.projects, {"name": "Invoice platform", "workspace_id": WORKSPACE_ID})
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - 86400))
+        for i, description in enumerate(["Schema migration", "Standup", "Migration dry run"]):
+            stub._add(stub.time_entries, {"description": description, "start": now, "duration": 600 + i,
+                                          "workspace_id": WORKSPACE_ID,
+                                          "project_id": project["id"] if i != 1 else None})
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        return stub
+
+    async def test_repeated_searches_use_index(self, stub):
+        result = await main.toggl_search_time_entries("invoice migr")
+        assert result["total"] == 2 and result["fetched"]
+        assert {e["project_name"] for e in result["entries"]} == {"Invoice platform"}
+
+        await main.toggl_start_timer(description="Migration cutover")
+        result = await main.toggl_search_time_entries("migration", limit="10")
+        assert not result["fetched"]
+        assert result["entries"][0]["description"] == "Migration cutover"
+        assert result["total"] == 3
+        assert stub.calls[("GET", "/me/time_entries")] == 1
+
+    async def test_listing_larger_than_index_is_not_covered(self, stub, monkeypatch):
+        monkeypatch.setattr(main.toggl_client.entry_index, "max_entries", 2)
+        await main.toggl_search_time_entries("migration")
+        result = await main.toggl_search_time_entries("migration")
+        assert result["fetched"] and len(main.toggl_client.entry_index) == 2
+        assert stub.calls[("GET", "/me/time_entries")] == 2
+
+    async def test_explicit_range_and_invalid_date(self, stub):
+        result = await main.toggl_search_time_entries("standup", "2020-01-01", "2020-02-01")
+        assert result["total"] == 0
+        assert "error" in await main.toggl_search_time_entries("x", start_date="last week")
+
+    async def test_limit_zero_counts_only(self, stub):
+        result = await main.toggl_search_time_entries("migration", limit=0)
+        assert result["total"] == 2 and result["entries"] == []
+        assert "error" in await main.toggl_search_time_entries("migration", limit="-1")
@@ -0,0 +1,191 @@
+"""Unit tests for incremental JSON parsing and streamed time entries"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import httpx
+import pytest
+
+from toggl_mcp.accounting import current_usage, ledger
+from toggl_mcp.json_stream import iter_json_array
+from toggl_mcp.search import TimeEntryIndex
+from toggl_mcp.toggl_client import TogglClient
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _collect(chunks):
+    return [item async for item in iter_json_array(chunks)]
+
+
+class SyntheticEntries(httpx.AsyncByteStream):
+    """Response body producing a JSON array of time entries lazily"""
+
+    def __init__(self, count: int):
+        self.count = count
+
+    async def __aiter__(self):
+        yield b"["
+        batch = []
+        for i in range(self.count):
+            entry = {
+                "id": i,
+                "workspace_id": 1234567,
+                "project_id": 1000 + i % 50,
+                "description": f"Synthetic entry {i} é",
+                "start": "2024-01-01T10:00:00Z",
+                "stop": "2024-01-01T11:00:00Z",
+                "duration": 3600,
+                "tags": ["bench", "synthetic"],
+            }
+            batch.append(json.dumps(entry))
+            if len(batch) == 500:
+                yield (("," if i >= 500 else "") + ",".join(batch)).encode()
+                batch = []
+        if batch:
+            yield (("," if self.count > len(batch) else "") + ",".join(batch)).encode()
+        yield b"]"
+
+
+class TestIterJsonArray:
+    """Test the incremental JSON array parser"""
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 4096])
+    async def test_matches_json_loads(self, size):
+        """Elements match a full parse regardless of chunk boundaries"""
+        payload = [{"id": 1, "d": "café ☃"}, 12345, -1.5e3, "x,]", None, True, [1, [2]], {}]
+        data = json.dumps(payload).encode()
+        assert await _collect(_chunks(data, size)) == payload
+
+    async def test_empty_inputs(self):
+        """Empty body, null and empty array yield nothing"""
+        assert await _collect(_chunks(b"", 1)) == []
+        assert await _collect(_chunks(b" null ", 2)) == []
+        assert await _collect(_chunks(b"[ ]", 1)) == []
+
+    @pytest.mark.parametrize("body", [b'{"a": 1}', b"[1, 2", b"[1 2]", b"[1] x"])
+    async def test_malformed(self, body):
+        """Non-arrays and malformed arrays raise ValueError"""
+        with pytest.raises(ValueError):
+            await _collect(_chunks(body, 3))
+
+
+class TestStreamTimeEntries:
+    """Test TogglClient.stream_time_entries"""
+
+    async def test_stream_passes_params(self):
+        """Date filters are sent and entries are passed on one by one"""
+        seen = {}
+
+        def handler(request):
+            seen.update(request.url.params)
+            return httpx.Response(200, json=[{"id": 1}, {"id": 2}])
+
+        client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        entries = []
+        assert await client.stream_time_entries(entries.append, "2024-01-01", "2024-02-01") == 2
+        assert entries == [{"id": 1}, {"id": 2}]
+        assert seen == {"start_date": "2024-01-01", "end_date": "2024-02-01"}
+        await client.close()
+
+    async def test_streamed_entries_are_indexed(self):
+        """The newest streamed entries reach the search index and recent combinations"""
+        entries = [
+            {"id": i, "workspace_id": 1, "description": f"Review {i}", "start": f"2024-01-0{i}T09:00:00Z"}
+            for i in range(1, 5)
+        ]
+        client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json=entries)
+        )))
+        await client.stream_time_entries(lambda entry: None, "2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z")
+        assert sorted(client.entry_index.entries) == [1, 2, 3, 4]
+        assert client.entry_index.covers(1704067200, 1706745600, max_age=60)
+        assert client.recent_entries.recent(limit=1)[0]["description"] == "Review 4"
+
+        client.entry_index = TimeEntryIndex(max_entries=2)
+        await client.stream_time_entries(lambda entry: None, "2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z")
+        assert sorted(client.entry_index.entries) == [3, 4]
+        assert not client.entry_index.covers(1704067200, 1706745600, max_age=60)
+        await client.close()
+
+    async def test_stream_http_error(self):
+        """HTTP errors are raised before any entry is yielded"""
+        client = TogglClient("token", httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(403, text="Forbidden"))
+        ))
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.stream_time_entries(lambda entry: None)
+        await client.close()
+
+    async def test_stream_holds_admission_slot(self):
+        """A streamed request counts against capacity until its body is read"""
+        client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json=[{"id": 1}, {"id": 2}])
+        )))
+        seen = []
+        await client.stream_time_entries(lambda entry: seen.append((entry["id"], client.admission.in_flight)))
+        assert seen == [(1, 1), (2, 1)]
+        assert client.admission.in_flight == 0
+        assert client.limiter.baseline is not None  # Latency fed to the limiter
+        await client.close()
+
+    async def test_stream_retries_throttled_response(self, monkeypatch):
+        """A streamed 429 or 5xx is retried like a buffered request, and charged"""
+        statuses = [429, 503, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0), json=[{"id": 1}])
+
+        client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        monkeypatch.setattr(client, "RETRY_BACKOFF", 0)
+        backoffs = client.limiter.backoffs
+        usage = ledger.start_call("stream", "test")
+        token = current_usage.set(usage)
+        try:
+            entries = []
+            await client.stream_time_entries(entries.append)
+            assert entries == [{"id": 1}]
+        finally:
+            current_usage.reset(token)
+        assert statuses == []
+        assert client.limiter.backoffs == backoffs + 2
+        assert usage.requests == 3
+        await client.close()
+
+    @pytest.mark.slow
+    def test_stream_200k_entries_peak_rss(self):
+        """Peak RSS growth for a 200k-entry response stays bounded while streaming"""
+        script = textwrap.dedent("""
+            import asyncio, resource
+            import httpx
+            from tests.unit.test_streaming import SyntheticEntries
+            from toggl_mcp.toggl_client import TogglClient
+
+            async def main():
+                client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(
+                    lambda request: httpx.Response(200, stream=SyntheticEntries(200_000))
+                )))
+                before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                seen = await client.stream_time_entries(lambda entry: None)
+                after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                await client.close()
+                print(seen, after - before)
+
+            asyncio.run(main())
+        """)
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+        ).stdout.split()
+        seen, growth_kib = int(output[0]), int(output[1])
+
+        assert seen == 200_000
+        # The body alone is ~45 MB and the parsed list several times that;
+        # streaming should only ever hold a few chunks and one entry.
+        assert growth_kib < 32 * 1024, f"peak RSS grew by {growth_kib / 1024:.1f} MiB"
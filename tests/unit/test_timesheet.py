@@ -0,0 +1,137 @@
+"""Unit tests for timesheet checks"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.timesheet import WorkingHours, check_timesheet, gaps, sweep
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+BERLIN = ZoneInfo("Europe/Berlin")
+# Monday 2024-03-04 to the end of Tuesday, Berlin time (UTC+1)
+MONDAY = datetime(2024, 3, 4, tzinfo=BERLIN)
+WEEK_AFTER = MONDAY + timedelta(days=7)
+
+
+def entry(entry_id, start, hours, tz=BERLIN):
+    start = datetime.fromisoformat(start).replace(tzinfo=tz)
+    return {"id": entry_id, "start": start.astimezone(timezone.utc).isoformat(), "duration": int(hours * 3600)}
+
+
+def test_sweep_reports_each_overlapping_entry():
+    spans = [(0, 100, "a"), (10, 20, "b"), (50, 150, "c"), (200, 210, "d")]
+    overlaps, merged = sweep(spans)
+    assert overlaps == [("b", "a", 10, 20), ("c", "a", 50, 100)]
+    assert merged == [[0, 150], [200, 210]]
+
+
+def test_gaps_within_windows():
+    merged = [[5, 20], [22, 40], [95, 130]]
+    windows = [(0, 50), (100, 150)]
+    assert gaps(merged, windows, min_gap=3) == [(0, 5), (40, 50), (130, 150)]
+
+
+def test_working_hours_parse():
+    hours = WorkingHours.parse("08:30", "16:00", ["Monday", "wed"])
+    assert (hours.start.hour, hours.start.minute, hours.days) == (8, 30, frozenset({0, 2}))
+    with pytest.raises(ValueError, match="weekday"):
+        WorkingHours.parse(days=["someday"])
+    with pytest.raises(ValueError, match="end after"):
+        WorkingHours.parse("17:00", "09:00")
+
+
+def test_check_timesheet():
+    entries = [
+        entry(1, "2024-03-04T09:00:00", 2),
+        entry(2, "2024-03-04T10:30:00", 1),  # Overlaps 1 by 30 minutes
+        entry(3, "2024-03-04T11:30:00", 3.5),  # 15:00-17:00 untracked
+        entry(4, "2024-03-05T09:10:00", 8),  # Missing the first 10 minutes, under the threshold
+        entry(5, "2024-03-05T22:00:00", 3),  # Crosses midnight into Wednesday
+    ]
+    end = datetime(2024, 3, 6, tzinfo=BERLIN)
+    result = check_timesheet(entries, MONDAY, end, BERLIN, WorkingHours(), min_gap=900, now=WEEK_AFTER.timestamp())
+    assert result["entries"] == 5
+    assert [(o["entry_id"], o["other_entry_id"], o["minutes"]) for o in result["overlaps"]] == [(2, 1, 30.0)]
+    assert result["gaps"] == [
+        {"start": "2024-03-04T15:00:00+01:00", "end": "2024-03-04T17:00:00+01:00", "minutes": 120.0}
+    ]
+    assert [c["entry_id"] for c in result["crossing_midnight"]] == [5]
+    assert result["tracked_hours"] == 17.0
+
+
+def test_running_entry_and_future_are_not_gaps():
+    now = datetime(2024, 3, 4, 12, 0, tzinfo=BERLIN)
+    entries = [entry(1, "2024-03-04T09:00:00", 1), {"id": 2, "start": "2024-03-04T09:00:00+00:00", "duration": -1}]
+    result = check_timesheet(entries, MONDAY, WEEK_AFTER, BERLIN, now=now.timestamp())
+    # 10:00-12:00 is covered by the running entry; nothing after now is a gap
+    assert result["gaps"] == []
+    assert result["tracked_hours"] == 3.0
+
+
+def test_limit_keeps_counts():
+    entries = [entry(i, "2024-03-04T09:00:00", 1) for i in range(10)]
+    result = check_timesheet(entries, MONDAY, MONDAY + timedelta(days=1), BERLIN, limit=3,
+                             now=WEEK_AFTER.timestamp())
+    assert result["overlap_count"] == 9
+    assert len(result["overlaps"]) == 3
+
+
+@pytest.fixture(scope="module")
+def shuffled_100k():
+    """100k half-hourly entries with random jitter, some overlapping, in random order"""
+    rng = random.Random(7)
+    base = datetime(2023, 1, 2, tzinfo=timezone.utc).timestamp()
+    entries = []
+    for i in range(100_000):
+        start = base + i * 1800 + rng.randint(-600, 600)
+        entries.append({
+            "id": i,
+            "start": datetime.fromtimestamp(start, timezone.utc).isoformat(),
+            "duration": rng.randint(600, 2400),
+        })
+    rng.shuffle(entries)
+    range_start = datetime.fromtimestamp(base, timezone.utc)
+    return entries, range_start, range_start + timedelta(seconds=100_000 * 1800)
+
+
+def test_100k_entries(shuffled_100k):
+    entries, range_start, range_end = shuffled_100k
+    result = check_timesheet(entries, range_start, range_end, BERLIN, now=range_end.timestamp())
+    assert result["entries"] == 100_000
+    assert result["overlap_count"] > 0 and result["crossing_midnight_count"] > 0
+
+
+@pytest.mark.slow
+def test_100k_entries_under_a_second(shuffled_100k):
+    entries, range_start, range_end = shuffled_100k
+    started = time.perf_counter()
+    check_timesheet(entries, range_start, range_end, BERLIN, now=range_end.timestamp())
+    elapsed = time.perf_counter() - started
+    assert elapsed < 1.0, f"100k entries took {elapsed:.2f}s"
+
+
+@pytest.mark.asyncio
+async def test_check_timesheet_tool(monkeypatch):
+    stub = TogglStub(projects=0)
+    for item in (entry(1, "2024-03-04T09:00:00", 4), entry(2, "2024-03-04T12:00:00", 5)):
+        stub._add(stub.time_entries, {**item, "workspace_id": WORKSPACE_ID})
+    monkeypatch.setattr(main, "toggl_client", stub.client())
+    result = await main.toggl_check_timesheet(
+        "2024-03-04T00:00:00", "2024-03-05T00:00:00", user_timezone="Europe/Berlin", min_gap_minutes="30"
+    )
+    assert result["overlap_count"] == 1
+    assert result["gap_count"] == 0
+    assert result["overlaps"][0]["minutes"] == 60.0
+    assert "error" in await main.toggl_check_timesheet(user_timezone="Mars/Olympus_Mons")
+    assert "error" in await main.toggl_check_timesheet(work_start="25:00")
+    assert "error" in await main.toggl_check_timesheet(min_gap_minutes=-5)
+
+    result = await main.toggl_check_timesheet(
+        "2024-03-04T00:00:00", "2024-03-05T00:00:00", user_timezone="Europe/Berlin", min_gap_minutes=0, limit=0
+    )
+    assert result["overlap_count"] == 1 and result["overlaps"] == []
+    assert result["gap_count"] == 0  # Touching entries leave no zero-length gaps
@@ -0,0 +1,192 @@
+"""Unit tests for TogglClient request handling"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+@pytest.mark.asyncio
+class TestReferenceCache:
+    """Test the reference data cache"""
+
+    async def test_repeated_reads_hit_cache(self):
+        """Reference data is fetched once within the TTL"""
+        stub = TogglStub()
+        client = stub.client()
+        first = await client.get_projects(WORKSPACE_ID)
+        second = await client.get_projects(WORKSPACE_ID)
+        assert first == second
+        assert stub.calls[("GET", "/workspaces/{id}/projects")] == 1
+        await client.close()
+
+    async def test_concurrent_misses_coalesce(self):
+        """Concurrent misses for one endpoint share a single upstream request"""
+        stub = TogglStub(latency=0.01)
+        client = stub.client()
+        results = await asyncio.gather(*(client.get_tags(WORKSPACE_ID) for _ in range(20)))
+        assert all(r == [] for r in results)
+        assert stub.calls[("GET", "/workspaces/{id}/tags")] == 1
+        await client.close()
+
+    async def test_writes_invalidate_collection(self):
+        """Creating or updating a record refreshes its collection"""
+        stub = TogglStub()
+        client = stub.client()
+        await client.get_tags(WORKSPACE_ID)
+        tag = await client.create_tag(WORKSPACE_ID, "new")
+        assert [t["name"] for t in await client.get_tags(WORKSPACE_ID)] == ["new"]
+        await client.update_tag(WORKSPACE_ID, tag["id"], "renamed")
+        assert [t["name"] for t in await client.get_tags(WORKSPACE_ID)] == ["renamed"]
+        assert stub.calls[("GET", "/workspaces/{id}/tags")] == 3
+        await client.close()
+
+    async def test_unrelated_writes_keep_cache(self):
+        """Time entry writes do not evict workspaces or projects"""
+        stub = TogglStub()
+        client = stub.client()
+        await client.get_workspaces()
+        await client.get_projects(WORKSPACE_ID)
+        await client.create_time_entry(WORKSPACE_ID, "Timer", duration=-1)
+        await client.get_workspaces()
+        await client.get_projects(WORKSPACE_ID)
+        assert stub.calls[("GET", "/workspaces")] == 1
+        assert stub.calls[("GET", "/workspaces/{id}/projects")] == 1
+        await client.close()
+
+    async def test_cache_disabled(self):
+        """A TTL of zero disables caching"""
+        stub = TogglStub()
+        client = stub.client(cache_ttl=0)
+        await client.get_me()
+        await client.get_me()
+        assert stub.calls[("GET", "/me")] == 2
+        await client.close()
+
+
+@pytest.mark.asyncio
+class TestWorkspaceTasks:
+    """Test the workspace task catalog"""
+
+    async def test_workspace_endpoint_pages(self):
+        """Tasks come from the workspace endpoint, one request per page"""
+        stub = TogglStub(projects=2)
+        client = stub.client()
+        client.TASK_PAGE_SIZE = 3
+        project_ids = list(stub.projects)
+        for i in range(5):
+            await client.create_project_task(WORKSPACE_ID, project_ids[i % 2], f"Task {i}")
+        tasks = await client.get_workspace_tasks(WORKSPACE_ID)
+        assert sorted(t["name"] for t in tasks) == [f"Task {i}" for i in range(5)]
+        assert stub.calls[("GET", "/workspaces/{id}/tasks")] == 2
+        assert stub.calls[("GET", "/workspaces/{id}/projects/{id}/tasks")] == 0
+        await client.close()
+
+    async def test_fallback_fans_out_and_caches_missing_tasks(self):
+        """Without the workspace endpoint, projects are asked once each, task-less ones included"""
+        stub = TogglStub(latency=0.01, projects=6, workspace_tasks=False)
+        client = stub.client()
+        await client.create_project_task(WORKSPACE_ID, next(iter(stub.projects)), "Only task")
+        first = await client.get_workspace_tasks(WORKSPACE_ID)
+        assert [t["name"] for t in first] == ["Only task"]
+        assert stub.calls[("GET", "/workspaces/{id}/projects/{id}/tasks")] == 6
+        assert stub.max_in_flight > 1
+
+        # Task-less projects' 404s were cached too
+        for project_id in stub.projects:
+            await client.get_project_tasks(WORKSPACE_ID, project_id)
+        assert stub.calls[("GET", "/workspaces/{id}/projects/{id}/tasks")] == 6
+        await client.close()
+
+    async def test_created_task_refreshes_catalog(self):
+        stub = TogglStub()
+        client = stub.client()
+        assert await client.get_workspace_tasks(WORKSPACE_ID) == []
+        await client.create_project_task(WORKSPACE_ID, next(iter(stub.projects)), "New")
+        assert [t["name"] for t in await client.get_workspace_tasks(WORKSPACE_ID)] == ["New"]
+        await client.close()
+
+
+@pytest.mark.asyncio
+class TestBulkRequests:
+    """Test chunking of bulk time entry operations"""
+
+    async def test_bulk_update_chunks_and_merges(self):
+        """Large bulk updates are split into 100-ID requests and merged"""
+        stub = TogglStub()
+        ids = [e["id"] for e in stub.seed_time_entries(250)]
+        client = stub.client()
+        result = await client.bulk_update_time_entries(WORKSPACE_ID, ids + [1], {"billable": True})
+        assert sorted(result["success"]) == sorted(ids)
+        assert result["failure"] == [1]
+        assert stub.calls[("PATCH", "/workspaces/{id}/time_entries/{id}")] == 3
+        assert all(e["billable"] for e in stub.time_entries.values())
+        await client.close()
+
+    async def test_small_bulk_delete_single_request(self):
+        """Bulk operations within one chunk are sent as is"""
+        stub = TogglStub()
+        ids = [e["id"] for e in stub.seed_time_entries(3)]
+        client = stub.client()
+        await client.bulk_delete_time_entries(WORKSPACE_ID, ids)
+        assert stub.time_entries == {}
+        assert stub.calls[("DELETE", "/workspaces/{id}/time_entries/{id}")] == 1
+        await client.close()
+
+
+@pytest.mark.asyncio
+class TestEnsureNamed:
+    """Test get-or-create of named records"""
+
+    async def test_resolves_existing_and_creates_missing(self):
+        stub = TogglStub()
+        stub._add(stub.tags, {"name": "Billing", "workspace_id": WORKSPACE_ID})
+        client = stub.client()
+        results = await client.ensure_tags(WORKSPACE_ID, ["billing ", "Ops", "ops", "", "Review"])
+        assert [(r["name"], r["created"]) for r in results] == [("Billing", False), ("Ops", True), ("Review", True)]
+        assert stub.calls[("GET", "/workspaces/{id}/tags")] == 1
+        assert stub.calls[("POST", "/workspaces/{id}/tags")] == 2
+
+        results = await client.ensure_tags(WORKSPACE_ID, ["OPS"])
+        assert results == [{"name": "Ops", "id": results[0]["id"], "created": False}]
+        assert stub.calls[("POST", "/workspaces/{id}/tags")] == 2
+        assert client._name_locks == {}
+        await client.close()
+
+    async def test_concurrent_callers_create_once(self):
+        stub = TogglStub(latency=0.01, unique_names=True)
+        client = stub.client()
+        results = await asyncio.gather(*(client.ensure_clients(WORKSPACE_ID, ["Acme", "Globex"]) for _ in range(5)))
+        assert stub.calls[("POST", "/workspaces/{id}/clients")] == 2
+        assert len(stub.clients) == 2
+        assert sum(r["created"] for batch in results for r in batch) == 2
+        assert {r["id"] for batch in results for r in batch} == set(stub.clients)
+        await client.close()
+
+    async def test_name_taken_elsewhere_resolves(self):
+        stub = TogglStub(projects=0, unique_names=True)
+        client = stub.client()
+        assert await client.get_projects(WORKSPACE_ID) == []
+        # Created by another process after our listing was cached
+        taken = stub._add(stub.projects, {"name": "Website", "workspace_id": WORKSPACE_ID})
+        results = await client.ensure_projects(WORKSPACE_ID, ["Website"], color="#06aaf5")
+        assert results == [{"name": "Website", "id": taken["id"], "created": False}]
+        await client.close()
+
+    async def test_failures_reported_per_name(self):
+        stub = TogglStub()
+        client = stub.client()
+        create_tag = client.create_tag
+
+        async def failing_create(workspace_id, name):
+            if name == "Broken":
+                raise RuntimeError("upstream unavailable")
+            return await create_tag(workspace_id, name)
+
+        client.create_tag = failing_create
+        results = await client.ensure_tags(WORKSPACE_ID, ["Broken", "Fine"])
+        assert results[0] == {"name": "Broken", "error": "upstream unavailable"}
+        assert results[1]["created"]
+        assert client._name_locks == {}
+        await client.close()
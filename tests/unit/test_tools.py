@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 import sys
 import os
 
+import httpx
+
 # Import the main module and functions
 from toggl_mcp import main
 from toggl_mcp.main import (
@@ -25,8 +27,11 @@ from toggl_mcp.main import (
     toggl_list_clients,
     toggl_create_client,
     toggl_list_project_tasks,
-    toggl_create_project_task
+    toggl_create_project_task,
+    toggl_list_workspace_tasks
 )
+from toggl_mcp.toggl_client import TogglClient
+from benchmarks.stub import TogglStub
 
 
 class TestWorkspaceHelper:
@@ -308,6 +313,103 @@ class TestProjectTaskTools:
         result = await toggl_create_project_task(project_id=1, name="New Task")
         assert result["name"] == "Test Task"
         mock_toggl_client.create_project_task.assert_called_once_with(default_workspace_id, 1, "New Task")
+    
+    async def test_toggl_list_workspace_tasks(self, monkeypatch):
+        """Tasks across projects are listed with their project names"""
+        stub = TogglStub(projects=2)
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", 1234567)
+        first, second = stub.projects
+        await toggl_create_project_task(project_id=first, name="Design")
+        await toggl_create_project_task(project_id=str(second), name="Build")
+        result = await toggl_list_workspace_tasks()
+        assert sorted((t["name"], t["project_name"]) for t in result) == [("Build", "Project 1"), ("Design", "Project 0")]
+        assert [t["name"] for t in await toggl_list_workspace_tasks(project_id=str(second))] == ["Build"]
+
+
+@pytest.mark.asyncio
+class TestEnsureTools:
+    """Test the get-or-create tools against the stub"""
+    
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub(projects=1, unique_names=True)
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", 1234567)
+        return stub
+    
+    async def test_ensure_tags_and_clients(self, stub):
+        result = await main.toggl_ensure_tags(["Billing", "Ops"])
+        assert result["created"] == 2 and result["failed"] == 0
+        result = await main.toggl_ensure_tags(["ops", "Docs"])
+        assert [(t["name"], t["created"]) for t in result["tags"]] == [("Ops", False), ("Docs", True)]
+        client = (await main.toggl_ensure_clients(["Acme"]))["clients"][0]
+        assert stub.clients[client["id"]]["name"] == "Acme"
+    
+    async def test_ensure_projects_and_tasks(self, stub):
+        client_id = (await main.toggl_create_client("Acme"))["id"]
+        result = await main.toggl_ensure_projects(["Project 0", "Website"], client_id=str(client_id))
+        existing, created = result["projects"]
+        assert not existing["created"] and created["created"]
+        assert stub.projects[created["id"]]["client_id"] == client_id
+        result = await main.toggl_ensure_project_tasks(str(created["id"]), ["Design", "Build"])
+        assert result["created"] == 2
+        assert {t["project_id"] for t in stub.tasks.values()} == {created["id"]}
+    
+    async def test_name_limits(self, stub):
+        assert "error" in await main.toggl_ensure_tags([])
+        assert "error" in await main.toggl_ensure_tags([f"tag-{i}" for i in range(main.MAX_ENSURE_NAMES + 1)])
+        assert not stub.calls
+
+
+@pytest.mark.asyncio
+class TestAllWorkspaces:
+    """Test listing tools in all_workspaces mode"""
+    
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub(latency=0.02, projects=0)
+        stub.workspaces = [{"id": 100 + i, "name": f"Client {i}"} for i in range(6)]
+        for i in range(6):
+            stub._add(stub.projects, {"name": f"Project {i}", "workspace_id": 100 + i})
+            stub._add(stub.tags, {"name": f"tag-{i}", "workspace_id": 100 + i})
+        
+        async def handle(request):
+            if "/workspaces/105/" in request.url.path:
+                return httpx.Response(403, json="Admin rights required")
+            return await stub.handle(request)
+        
+        client = TogglClient("token", httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+        monkeypatch.setattr(main, "toggl_client", client)
+        monkeypatch.setattr(main, "default_workspace_id", None)
+        return stub
+    
+    async def test_merges_workspaces_concurrently(self, stub):
+        """Each workspace's projects are tagged with it; fetches overlap up to the limit"""
+        result = await toggl_list_projects(all_workspaces=True)
+        assert result["workspaces"] == 6
+        assert sorted((p["name"], p["workspace_name"]) for p in result["projects"]) == [
+            (f"Project {i}", f"Client {i}") for i in range(5)
+        ]
+        assert stub.max_in_flight == main.WORKSPACE_CONCURRENCY
+    
+    async def test_failed_workspace_reported(self, stub):
+        """A workspace that cannot be listed does not fail the others"""
+        result = await toggl_list_tags(all_workspaces="true")
+        assert len(result["tags"]) == 5
+        assert result["errors"] == [
+            {"workspace_id": 105, "workspace_name": "Client 5", "error": 'HTTP 403: "Admin rights required"'}
+        ]
+    
+    async def test_every_workspace_failing_is_an_error(self, stub):
+        stub.workspaces = [{"id": 105, "name": "Client 5"}]
+        result = await toggl_list_clients(all_workspaces=True)
+        assert "HTTP 403" in result["error"]
+    
+    async def test_cached_items_are_not_modified(self, stub):
+        await toggl_list_projects(all_workspaces=True)
+        projects = await toggl_list_projects(workspace_id=100)
+        assert "workspace_name" not in projects[0]
 
 
 @pytest.mark.asyncio
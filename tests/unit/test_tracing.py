@@ -0,0 +1,192 @@
+"""Unit tests for tool call and request tracing"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.exporters import JsonlExporter, OtlpExporter
+from toggl_mcp.tracing import current_call_id, tracer
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+class ListExporter:
+    """Collects spans in memory"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, record):
+        self.spans.append(record)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def spans():
+    exporter = ListExporter()
+    tracer.configure(exporter)
+    yield exporter.spans
+    tracer.configure(None)
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    stub = TogglStub()
+    monkeypatch.setattr(main, "toggl_client", stub.client())
+    monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+    return stub
+
+
+class TestDisabled:
+    """Test tracing with no exporter"""
+
+    def test_noop_span(self):
+        with tracer.span("anything", key="value") as span:
+            span.set("more", 1)
+            assert current_call_id() is None
+
+    @pytest.mark.slow
+    def test_overhead(self):
+        """A disabled span costs almost nothing"""
+        n = 50_000
+        started = time.perf_counter()
+        for _ in range(n):
+            with tracer.span("toggl.request"):
+                pass
+        assert (time.perf_counter() - started) / n < 5e-6
+
+
+@pytest.mark.asyncio
+class TestToolSpans:
+    """Test spans recorded for tool calls"""
+
+    async def test_span_tree(self, spans, stub_client):
+        """Local processing and each upstream request nest under the tool span"""
+        await main.toggl_create_time_entry("Work", "2024-01-01 09:00", "2024-01-01 10:00", user_timezone="Europe/Berlin")
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span["name"], []).append(span)
+
+        root = by_name["tool toggl_create_time_entry"][0]
+        assert root["parent_id"] is None
+        assert root["attributes"]["call_class"] == "interactive"
+        assert {s["trace_id"] for s in spans} == {root["trace_id"]}
+        assert len(by_name["to_utc_string"]) == 2
+        assert all(s["parent_id"] == root["span_id"] for s in by_name["to_utc_string"])
+        assert by_name["tool.validate"][0]["parent_id"] == root["span_id"]
+
+        request = by_name["toggl.request"][0]
+        assert request["parent_id"] == root["span_id"]
+        assert request["attributes"] == {
+            "method": "POST", "endpoint": "/workspaces/{wid}/time_entries", "attempts": 1
+        }
+        assert by_name["toggl.queue"][0]["parent_id"] == request["span_id"]
+        assert by_name["toggl.http"][0]["attributes"]["status"] == 200
+        assert root["self_ms"] <= root["duration_ms"]
+
+    async def test_calls_get_separate_ids(self, spans, stub_client):
+        """Concurrent tool calls are separate traces"""
+        await asyncio.gather(main.toggl_list_tags(), main.toggl_list_projects())
+        roots = [s for s in spans if s["parent_id"] is None]
+        assert len(roots) == 2
+        assert len({s["trace_id"] for s in roots}) == 2
+        for root in roots:
+            children = [s for s in spans if s["trace_id"] == root["trace_id"] and s is not root]
+            assert children and all(s["name"].startswith(("toggl.", "tool.")) for s in children)
+
+    async def test_stream_consumer_spans_nest_under_caller(self, spans, stub_client):
+        """Spans opened while consuming a stream are not children of the request"""
+        stub_client.seed_time_entries(3)
+
+        def consume(entry):
+            with tracer.span("consume"):
+                pass
+
+        with tracer.span("caller", root=True):
+            assert await main.toggl_client.stream_time_entries(consume) == 3
+        caller = next(s for s in spans if s["name"] == "caller")
+        consumed = [s for s in spans if s["name"] == "consume"]
+        assert len(consumed) == 3
+        assert all(s["parent_id"] == caller["span_id"] for s in consumed)
+
+    async def test_error_result_marks_span(self, spans, monkeypatch):
+        monkeypatch.setattr(main, "toggl_client", None)
+        await main.toggl_get_user()
+        root = next(s for s in spans if s["parent_id"] is None)
+        assert "not initialized" in root["error"]
+
+
+    async def test_invalid_arguments_fail_validate_span(self, spans, stub_client):
+        await main.toggl_update_time_entry(time_entry_id="latest")
+        validate = next(s for s in spans if s["name"] == "tool.validate")
+        root = next(s for s in spans if s["parent_id"] is None)
+        assert validate["error"].startswith("ValidationError: Invalid time_entry_id")
+        assert root["error"].startswith("Invalid time_entry_id")
+
+
+@pytest.mark.asyncio
+class TestExporters:
+    """Test span export formats"""
+
+    async def test_jsonl(self, tmp_path, stub_client):
+        path = tmp_path / "spans.jsonl"
+        tracer.configure(JsonlExporter(str(path)))
+        try:
+            await main.toggl_list_tags()
+        finally:
+            await tracer.close()
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["name"] for r in records][-1] == "tool toggl_list_tags"
+        assert len({r["trace_id"] for r in records}) == 1
+
+    async def test_jsonl_writes_off_loop_in_batches(self, tmp_path, monkeypatch):
+        path = tmp_path / "spans.jsonl"
+        exporter = JsonlExporter(str(path), batch_size=3)
+        writes = []
+        write = exporter._write
+        monkeypatch.setattr(exporter, "_write", lambda records: writes.append(len(records)) or write(records))
+        for i in range(4):
+            exporter.export({"name": f"span {i}"})
+        assert path.read_text() == ""  # Nothing written on the event loop
+        await exporter.close()
+        assert writes == [3, 1]
+        assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == [
+            "span 0", "span 1", "span 2", "span 3"
+        ]
+
+    async def test_otlp_batches(self, stub_client):
+        payloads = []
+
+        def collector(request):
+            assert request.url.path == "/v1/traces"
+            payloads.append(json.loads(request.content))
+            return httpx.Response(200, json={})
+
+        exporter = OtlpExporter(
+            "http://collector:4318", batch_size=3,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(collector))
+        )
+        tracer.configure(exporter)
+        try:
+            await main.toggl_list_tags()
+            await main.toggl_list_clients()
+        finally:
+            await tracer.close()
+
+        spans = [
+            span
+            for payload in payloads
+            for scope in payload["resourceSpans"][0]["scopeSpans"]
+            for span in scope["spans"]
+        ]
+        assert len(payloads) >= 2
+        assert len(spans) == 10
+        root = next(s for s in spans if s["name"] == "tool toggl_list_tags")
+        assert "parentSpanId" not in root
+        assert {"key": "tool", "value": {"stringValue": "toggl_list_tags"}} in root["attributes"]
+        assert root["status"] == {"code": 1}
@@ -0,0 +1,104 @@
+"""Unit tests for tool argument validation"""
+
+import time
+from typing import List, Optional, Union
+
+import pytest
+
+from toggl_mcp import main
+from toggl_mcp.validation import ValidationError, compile_validator, endpoint_fields, parse_bool
+from benchmarks.stub import TogglStub, WORKSPACE_ID
+
+
+async def update_entry(
+    time_entry_id: Union[int, str],
+    workspace_id: Optional[Union[int, str]] = None,
+    description: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_ids: Optional[List[int]] = None,
+    billable: Optional[Union[bool, str, int]] = None,
+    tag_action: Optional[str] = None
+):
+    pass
+
+
+class TestCompileValidator:
+    """Test validators compiled from tool signatures and API_ENDPOINTS"""
+
+    def setup_method(self):
+        self.validate = compile_validator(update_entry, "time_entries.update")
+
+    def test_coerces_ids_bools_and_lists(self):
+        arguments = self.validate(("42",), {"workspace_id": "7", "billable": "yes", "tag_ids": ["1", 2]})
+        assert arguments == {"time_entry_id": 42, "workspace_id": 7, "billable": True, "tag_ids": [1, 2]}
+
+    def test_values_left_alone(self):
+        arguments = self.validate((), {"time_entry_id": 1, "description": "Review", "billable": None})
+        assert arguments == {"time_entry_id": 1, "description": "Review", "billable": None}
+
+    def test_invalid_values(self):
+        with pytest.raises(ValidationError, match="Invalid time_entry_id"):
+            self.validate(("abc",), {})
+        with pytest.raises(ValidationError, match="Invalid billable"):
+            self.validate((1,), {"billable": "maybe"})
+        with pytest.raises(ValidationError, match="Invalid tag_ids: expected a list"):
+            self.validate((1,), {"tag_ids": "1,2"})
+        with pytest.raises(ValidationError, match="Invalid tag_action: must be one of add, replace"):
+            self.validate((1,), {"tag_action": "remove"})
+
+    def test_missing_required_but_not_workspace_id(self):
+        with pytest.raises(ValidationError, match="Missing required argument: time_entry_id"):
+            self.validate((), {"description": "Review"})
+        assert self.validate((1,), {}) == {"time_entry_id": 1}
+
+    def test_endpoint_fields(self):
+        required, types = endpoint_fields("tasks.create")
+        assert required == ["name", "project_id", "workspace_id"]
+        assert types["project_id"] is int
+        with pytest.raises(KeyError):
+            endpoint_fields("tasks.archive")
+
+    def test_parse_bool(self):
+        assert parse_bool(" On ") is True
+        assert parse_bool("0") is False
+        assert parse_bool(2) is True
+        with pytest.raises(ValueError):
+            parse_bool("perhaps")
+
+    @pytest.mark.slow
+    def test_overhead(self):
+        calls = 10_000
+        started = time.perf_counter()
+        for _ in range(calls):
+            self.validate(("42",), {"workspace_id": "7", "billable": "false", "tags": ["a", "b"]})
+        assert (time.perf_counter() - started) / calls < 50e-6
+
+
+@pytest.mark.asyncio
+class TestToolValidation:
+    """Test that tools reject invalid arguments before any request"""
+
+    @pytest.fixture
+    def stub(self, monkeypatch):
+        stub = TogglStub()
+        monkeypatch.setattr(main, "toggl_client", stub.client())
+        monkeypatch.setattr(main, "default_workspace_id", WORKSPACE_ID)
+        return stub
+
+    async def test_invalid_arguments_send_nothing(self, stub):
+        result = await main.toggl_update_time_entry(time_entry_id="latest", description="Review")
+        assert result == {"error": "Invalid time_entry_id: invalid literal for int() with base 10: 'latest'"}
+        result = await main.toggl_bulk_update_time_entries(["1", "2"], tags=["x"], tag_action="drop")
+        assert "Invalid tag_action" in result["error"]
+        result = await main.toggl_create_project_task(None, "Design")
+        assert result == {"error": "Missing required argument: project_id"}
+        assert not stub.calls
+
+    async def test_string_arguments_are_coerced(self, stub):
+        entry = await main.toggl_create_time_entry(
+            "Planning", "2024-01-01T09:00:00Z", "2024-01-01T10:00:00Z",
+            workspace_id=str(WORKSPACE_ID), billable="true"
+        )
+        assert entry["billable"] is True and entry["workspace_id"] == WORKSPACE_ID
+        stopped = await main.toggl_stop_timer(str(entry["id"]))
+        assert stopped["id"] == entry["id"]
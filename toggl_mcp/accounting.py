@@ -0,0 +1,251 @@
+"""
+Attribution of upstream Toggl API usage to tool calls and sessions
+
+Every request TogglClient sends is charged to the tool call running in the
+current task (see current_usage), so agent workflows that fan out into many
+upstream requests, such as an N+1 loop over projects, show up by tool,
+invocation and session.
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CallUsage:
+    """Upstream usage of one tool invocation"""
+
+    __slots__ = (
+        "seq", "tool", "session", "call_id", "started", "duration",
+        "requests", "bytes_out", "bytes_in", "quota_units"
+    )
+
+    def __init__(self, seq: int, tool: str, session: str, call_id: Optional[str] = None):
+        self.seq = seq
+        self.tool = tool
+        self.session = session
+        self.call_id = call_id
+        self.started = time.monotonic()
+        self.duration = 0.0
+        self.requests = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.quota_units = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tool": self.tool,
+            "session": self.session,
+            "call_id": self.call_id,
+            "duration_ms": round(self.duration * 1000, 1),
+            "requests": self.requests,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "quota_units": self.quota_units,
+        }
+
+
+class _Totals:
+    """Accumulated usage of a tool or session"""
+
+    __slots__ = ("calls", "requests", "bytes_out", "bytes_in", "quota_units", "max_requests")
+
+    def __init__(self):
+        self.calls = 0
+        self.requests = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.quota_units = 0
+        self.max_requests = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "requests": self.requests,
+            "requests_per_call": round(self.requests / self.calls, 2) if self.calls else None,
+            "max_requests_per_call": self.max_requests,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "quota_units": self.quota_units,
+        }
+
+
+class _SessionUsage(_Totals):
+    __slots__ = ("tools", "tool_totals", "window_start", "window_requests", "warned")
+
+    def __init__(self):
+        super().__init__()
+        self.tools: Counter = Counter()
+        # The session's own usage by tool, reported instead of the process-wide
+        # totals when stats are limited to the session
+        self.tool_totals: Dict[str, _Totals] = {}
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+        self.warned = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "top_tools": dict(self.tools.most_common(5))}
+
+
+# Usage record of the tool call running in the current task
+current_usage: ContextVar[Optional[CallUsage]] = ContextVar("toggl_call_usage", default=None)
+
+
+class UsageLedger:
+    """Upstream usage totals by tool and session, plus the heaviest invocations
+
+    Args:
+        warn_rate: Log a warning when one session sends more than this many
+                   upstream requests within rate_window seconds (None disables)
+        rate_window: Length of the window warn_rate applies to, in seconds
+        max_sessions: Sessions remembered; the least recently active are dropped
+        top_calls: Number of heaviest invocations kept
+    """
+
+    def __init__(
+        self,
+        warn_rate: Optional[int] = None,
+        rate_window: float = 60.0,
+        max_sessions: int = 1000,
+        top_calls: int = 20
+    ):
+        self.warn_rate = warn_rate
+        self.rate_window = rate_window
+        self.max_sessions = max_sessions
+        self.top_calls = top_calls
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded usage"""
+        self.tools: Dict[str, _Totals] = {}
+        self.sessions: "OrderedDict[str, _SessionUsage]" = OrderedDict()
+        self._heaviest: List[Any] = []  # Min-heap of (requests, seq, CallUsage)
+        self._seq = itertools.count()
+
+    def _session(self, session: str) -> _SessionUsage:
+        usage = self.sessions.get(session)
+        if usage is None:
+            usage = self.sessions[session] = _SessionUsage()
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        else:
+            self.sessions.move_to_end(session)
+        return usage
+
+    def start_call(self, tool: str, session: str, call_id: Optional[str] = None) -> CallUsage:
+        """Open the usage record of a tool invocation"""
+        self._session(session).tools[tool] += 1
+        return CallUsage(next(self._seq), tool, session, call_id)
+
+    def record_request(self, usage: CallUsage, bytes_out: int, bytes_in: int, counted: bool):
+        """Charge one upstream request to a call and its session
+
+        Args:
+            usage: The call's usage record
+            bytes_out: Request body size
+            bytes_in: Response body size
+            counted: Whether Toggl counts the request against the quota
+        """
+        units = 1 if counted else 0
+        usage.requests += 1
+        usage.bytes_out += bytes_out
+        usage.bytes_in += bytes_in
+        usage.quota_units += units
+
+        session = self._session(usage.session)
+        session.requests += 1
+        session.bytes_out += bytes_out
+        session.bytes_in += bytes_in
+        session.quota_units += units
+
+        if self.warn_rate is None:
+            return
+        now = time.monotonic()
+        if now - session.window_start >= self.rate_window:
+            session.window_start = now
+            session.window_requests = 0
+            session.warned = False
+        session.window_requests += 1
+        if session.window_requests > self.warn_rate and not session.warned:
+            session.warned = True
+            top = ", ".join(f"{tool} x{count}" for tool, count in session.tools.most_common(3))
+            logger.warning(
+                f"Session {usage.session} sent more than {self.warn_rate} Toggl API requests "
+                f"in {self.rate_window:.0f}s (current tool: {usage.tool}; most called: {top})"
+            )
+
+    def finish_call(self, usage: CallUsage):
+        """Close a call's usage record and add it to the totals"""
+        usage.duration = time.monotonic() - usage.started
+        session = self._session(usage.session)
+        tools = (self.tools.setdefault(usage.tool, _Totals()), session.tool_totals.setdefault(usage.tool, _Totals()))
+        for totals in (*tools, session):
+            totals.calls += 1
+            totals.max_requests = max(totals.max_requests, usage.requests)
+        for tool in tools:
+            tool.requests += usage.requests
+            tool.bytes_out += usage.bytes_out
+            tool.bytes_in += usage.bytes_in
+            tool.quota_units += usage.quota_units
+
+        if usage.requests:
+            entry = (usage.requests, usage.seq, usage)
+            if len(self._heaviest) < self.top_calls:
+                heapq.heappush(self._heaviest, entry)
+            elif entry > self._heaviest[0]:
+                heapq.heapreplace(self._heaviest, entry)
+
+    def stats(self, limit: int = 10, session: Optional[str] = None) -> Dict[str, Any]:
+        """Worst offenders by upstream requests
+
+        Args:
+            limit: Entries per list
+            session: Only report this session's own usage: its tools,
+                     invocations and session totals
+        """
+        by_tool = self.tools
+        sessions = self.sessions.items()
+        calls = [usage for _, _, usage in self._heaviest]
+        if session is not None:
+            own = self.sessions.get(session)
+            by_tool = own.tool_totals if own is not None else {}
+            sessions = [(key, value) for key, value in sessions if key == session]
+            calls = [usage for usage in calls if usage.session == session]
+
+        tools = sorted(by_tool.items(), key=lambda item: item[1].requests, reverse=True)
+        return {
+            "tools": {name: totals.to_dict() for name, totals in tools[:limit]},
+            "fan_out": {
+                name: totals.to_dict()["requests_per_call"]
+                for name, totals in sorted(
+                    by_tool.items(),
+                    key=lambda item: item[1].requests / item[1].calls if item[1].calls else 0,
+                    reverse=True
+                )[:limit]
+            },
+            "heaviest_calls": [
+                usage.to_dict()
+                for usage in sorted(calls, key=lambda u: (u.requests, u.seq), reverse=True)[:limit]
+            ],
+            "sessions": {
+                key: value.to_dict()
+                for key, value in sorted(sessions, key=lambda item: item[1].requests, reverse=True)[:limit]
+            },
+        }
+
+
+# Process-wide ledger shared by every client and tool
+ledger = UsageLedger()
+
+
+def charge(bytes_out: int, bytes_in: int, counted: bool = True):
+    """Charge an upstream request to the tool call running in the current task"""
+    usage = current_usage.get()
+    if usage is not None:
+        ledger.record_request(usage, bytes_out, bytes_in, counted)
@@ -0,0 +1,142 @@
+"""
+Priority-based admission control for upstream Toggl requests
+
+Tool calls are classified (interactive timer operations, reads, bulk writes,
+background sync) and every request a call makes to the Toggl API waits for a
+slot in the AdmissionController. Free slots go to the highest priority class
+first and each class has its own concurrency limit, so a long bulk operation
+can never occupy every slot in front of an interactive timer call.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from .limits import AdaptiveLimiter
+
+INTERACTIVE = "interactive"
+READ = "read"
+BULK = "bulk"
+BACKGROUND = "background"
+
+# Highest priority first
+CALL_CLASSES = (INTERACTIVE, READ, BULK, BACKGROUND)
+
+# Class of the tool call running in the current task
+current_call_class: ContextVar[str] = ContextVar("toggl_call_class", default=READ)
+
+# Share of the total capacity each class may use. Bulk writes and background
+# work leave slots free for interactive calls and reads.
+CLASS_SHARES = {INTERACTIVE: 1.0, READ: 1.0, BULK: 0.5, BACKGROUND: 0.25}
+
+
+class AdmissionController:
+    """Grants request slots by call class priority
+
+    Args:
+        capacity: Total number of requests allowed in flight, used when no
+                  limiter is given
+        limits: Fixed per-class limits on requests in flight. Classes without
+                one get their CLASS_SHARES fraction of the capacity.
+        limiter: Adaptive limiter providing the total capacity
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10,
+        limits: Optional[Dict[str, int]] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ):
+        self._capacity = capacity
+        self.limiter = limiter
+        self.limits = dict(limits or {})
+        self.active: Dict[str, int] = {cls: 0 for cls in CALL_CLASSES}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {cls: deque() for cls in CALL_CLASSES}
+
+    @property
+    def capacity(self) -> int:
+        """Total requests allowed in flight"""
+        return self.limiter.limit if self.limiter else self._capacity
+
+    def limit_for(self, call_class: str) -> int:
+        """Requests of call_class allowed in flight"""
+        if call_class in self.limits:
+            return self.limits[call_class]
+        return max(1, int(self.capacity * CLASS_SHARES[call_class]))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot"""
+        return sum(self.active.values())
+
+    def _has_room(self, call_class: str) -> bool:
+        return self.in_flight < self.capacity and self.active[call_class] < self.limit_for(call_class)
+
+    def _grant(self, call_class: str):
+        self.active[call_class] += 1
+
+    def _dispatch(self):
+        """Hand free slots to waiters, highest priority class first"""
+        for call_class in CALL_CLASSES:
+            waiters = self._waiters[call_class]
+            while waiters and self._has_room(call_class):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self._grant(call_class)
+                future.set_result(None)
+            if self.in_flight >= self.capacity:
+                return
+
+    async def acquire(self, call_class: Optional[str] = None) -> str:
+        """Wait for a slot, returning the class it was granted under"""
+        call_class = call_class or current_call_class.get()
+        if call_class not in self.active:
+            raise ValueError(f"Unknown call class '{call_class}'")
+
+        if not self._waiters[call_class] and self._has_room(call_class):
+            self._grant(call_class)
+            return call_class
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[call_class].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: give the slot back
+                self.release(call_class)
+            raise
+        return call_class
+
+    def release(self, call_class: str):
+        """Return a slot and wake the next waiters"""
+        self.active[call_class] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, call_class: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the block"""
+        granted = await self.acquire(call_class)
+        try:
+            yield
+        finally:
+            self.release(granted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current capacity, limits, and active/queued requests per class"""
+        return {
+            "capacity": self.capacity,
+            "limiter": self.limiter.stats() if self.limiter else None,
+            "in_flight": self.in_flight,
+            "classes": {
+                cls: {
+                    "limit": self.limit_for(cls),
+                    "active": self.active[cls],
+                    "queued": sum(1 for f in self._waiters[cls] if not f.done()),
+                }
+                for cls in CALL_CLASSES
+            },
+        }
@@ -0,0 +1,161 @@
+"""
+Batch execution of tool calls with dependency ordering
+
+A batch is a list of operations, each naming a tool and its arguments. An
+argument may reference an earlier operation's result with {"$ref": "<id>.<path>"},
+e.g. {"$ref": "tag.name"} or {"$ref": "entries.0.id"}. Operations run as
+soon as the operations they reference have finished, so independent ones
+run concurrently and dependent ones in order. An operation whose dependency
+failed is skipped.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+REF_KEY = "$ref"
+
+
+class BatchError(ValueError):
+    """An invalid batch, rejected before any operation runs"""
+
+
+@dataclass
+class Operation:
+    id: str
+    tool: str
+    arguments: Dict[str, Any]
+    depends: Set[str] = field(default_factory=set)
+
+
+def _refs(value: Any) -> Set[str]:
+    """IDs of the operations referenced anywhere in value"""
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            return {str(value[REF_KEY]).split(".", 1)[0]}
+        return set().union(*(_refs(v) for v in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(_refs(v) for v in value)) if value else set()
+    return set()
+
+
+def parse_operations(operations: List[Dict[str, Any]], tools: Set[str], max_operations: int) -> List[Operation]:
+    """Validate operations and work out their dependencies
+
+    Args:
+        operations: [{"tool": name, "arguments": {...}, "id": optional name}];
+                    IDs default to the operation's position ("0", "1", ...)
+        tools: Tool names operations may call
+        max_operations: Largest accepted batch
+
+    Raises:
+        BatchError: If the batch is malformed, calls an unknown tool or
+                    references an operation that does not come earlier
+    """
+    if not operations:
+        raise BatchError("No operations provided")
+    if len(operations) > max_operations:
+        raise BatchError(f"Too many operations ({len(operations)}), at most {max_operations} per batch")
+
+    parsed: List[Operation] = []
+    seen: Set[str] = set()
+    for index, item in enumerate(operations):
+        if not isinstance(item, dict) or "tool" not in item:
+            raise BatchError(f"Operation {index} must be an object with a 'tool' name")
+        op_id = str(item.get("id", index))
+        if op_id in seen:
+            raise BatchError(f"Duplicate operation id '{op_id}'")
+        if "." in op_id:
+            raise BatchError(f"Operation id '{op_id}' must not contain '.'")
+        tool = item["tool"]
+        if tool not in tools:
+            raise BatchError(f"Operation '{op_id}': unknown tool '{tool}'")
+        arguments = item.get("arguments") or {}
+        if not isinstance(arguments, dict):
+            raise BatchError(f"Operation '{op_id}': arguments must be an object")
+        depends = _refs(arguments)
+        unknown = depends - seen
+        if unknown:
+            raise BatchError(
+                f"Operation '{op_id}' references {', '.join(sorted(unknown))}, "
+                f"which must be the id of an earlier operation"
+            )
+        parsed.append(Operation(op_id, tool, arguments, depends))
+        seen.add(op_id)
+    return parsed
+
+
+def _lookup(result: Any, path: List[str], ref: str) -> Any:
+    for part in path:
+        if isinstance(result, dict) and part in result:
+            result = result[part]
+        elif isinstance(result, list) and part.lstrip("-").isdigit() and -len(result) <= int(part) < len(result):
+            result = result[int(part)]
+        else:
+            raise LookupError(f"Reference '{ref}' not found in the result of operation '{ref.split('.', 1)[0]}'")
+    return result
+
+
+def resolve(value: Any, results: Dict[str, Any]) -> Any:
+    """Replace {"$ref": ...} objects in value with the referenced results"""
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            ref = str(value[REF_KEY])
+            op_id, *path = ref.split(".")
+            return _lookup(results[op_id], path, ref)
+        return {k: resolve(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve(v, results) for v in value]
+    return value
+
+
+async def run_batch(
+    operations: List[Operation],
+    call: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+    concurrency: int
+) -> List[Dict[str, Any]]:
+    """Run operations, each once its dependencies have succeeded
+
+    Args:
+        operations: Parsed operations
+        call: Coroutine function running one tool with its arguments
+        concurrency: Operations running at once
+
+    Returns:
+        One entry per operation, in order, with its status ("ok", "error" or
+        "skipped") and its result or error
+    """
+    done: Dict[str, asyncio.Event] = {op.id: asyncio.Event() for op in operations}
+    results: Dict[str, Any] = {}
+    failed: Set[str] = set()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(op: Operation) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {"id": op.id, "tool": op.tool}
+        try:
+            for dependency in op.depends:
+                await done[dependency].wait()
+            blocked = sorted(op.depends & failed)
+            if blocked:
+                failed.add(op.id)
+                entry.update(status="skipped", error=f"Skipped: operation '{blocked[0]}' did not succeed")
+                return entry
+            try:
+                arguments = resolve(op.arguments, results)
+                async with semaphore:
+                    result = await call(op.tool, arguments)
+            except Exception as e:
+                failed.add(op.id)
+                entry.update(status="error", error=str(e) or type(e).__name__)
+                return entry
+            if isinstance(result, dict) and "error" in result:
+                failed.add(op.id)
+                entry.update(status="error", error=result["error"])
+            else:
+                results[op.id] = result
+                entry.update(status="ok", result=result)
+            return entry
+        finally:
+            done[op.id].set()
+
+    return list(await asyncio.gather(*(run(op) for op in operations)))
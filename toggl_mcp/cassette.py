@@ -0,0 +1,285 @@
+"""
+Record/replay ("cassette") HTTP transports for TogglClient
+
+RecordingTransport wraps a real transport and appends every request/response
+pair to a JSON Lines cassette, with credentials redacted. ReplayTransport
+answers requests from a cassette offline, optionally sleeping for the
+recorded (or scaled) upstream latency, so benchmarks and regression tests can
+run against identical traffic. Cassettes ending in .gz are compressed.
+
+Requests are matched exactly first. Tools default some values to the current
+time, such as the start of a timer or the end of a listed range, so a request
+without an exact match is matched again with every date-time value in its
+query and JSON body ignored.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import re
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+REDACTED = "REDACTED"
+
+# Request headers never written to a cassette
+SECRET_HEADERS = ("authorization", "x-toggl-api-token", "cookie")
+# Response headers stored redacted: cookies and anything naming a session,
+# token or credential (the response itself still carries them)
+SECRET_RESPONSE_HEADERS = ("set-cookie", "set-cookie2", "authorization", "proxy-authorization")
+SECRET_HEADER_WORDS = ("token", "session", "auth", "secret", "csrf")
+# Response headers describing the body as sent, not as stored
+_ENCODING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+# JSON keys holding credentials in response bodies (e.g. GET /me)
+SECRET_KEYS = ("api_token",)
+# Query and body values ignored by the fallback match: dates with a time of day
+_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+_ANY_TIME = "<datetime>"
+
+
+def _secret_response_header(name: str) -> bool:
+    name = name.lower()
+    return name in SECRET_RESPONSE_HEADERS or (
+        name != "www-authenticate" and any(word in name for word in SECRET_HEADER_WORDS)
+    )
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _redact_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: REDACTED if k in SECRET_KEYS else _redact_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact_json(v) for v in value]
+    return value
+
+
+def _encode_body(content: bytes) -> Dict[str, Any]:
+    """Store a body as JSON when possible, else text or base64"""
+    if not content:
+        return {}
+    try:
+        return {"json": _redact_json(json.loads(content))}
+    except ValueError:
+        pass
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode()}
+
+
+def _decode_body(stored: Dict[str, Any]) -> bytes:
+    if "json" in stored:
+        return json.dumps(stored["json"], separators=(",", ":")).encode()
+    if "text" in stored:
+        return stored["text"].encode("utf-8")
+    if "base64" in stored:
+        return base64.b64decode(stored["base64"])
+    return b""
+
+
+def _ignore_times(value: Any) -> Any:
+    """value with every date-time string replaced by the same placeholder"""
+    if isinstance(value, str):
+        return _ANY_TIME if _DATETIME.match(value) else value
+    if isinstance(value, dict):
+        return {k: _ignore_times(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_ignore_times(v) for v in value]
+    return value
+
+
+def _body_key(content: bytes, ignore_times: bool = False) -> str:
+    """Canonical form of a request body for matching"""
+    if not content:
+        return ""
+    try:
+        value = json.loads(content)
+    except ValueError:
+        return content.decode("utf-8", "replace")
+    if ignore_times:
+        value = _ignore_times(value)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+def request_key(method: str, url: httpx.URL, content: bytes, ignore_times: bool = False) -> Tuple[str, str, str, str]:
+    """Key identifying equivalent requests: method, path, sorted query and body
+
+    With ignore_times, date-time values in the query and JSON body are
+    ignored, so requests differing only in them share a key.
+    """
+    params = url.params.multi_items()
+    if ignore_times:
+        params = [(k, _ignore_times(v)) for k, v in params]
+    query = "&".join(f"{k}={v}" for k, v in sorted(params))
+    return method, url.path, query, _body_key(content, ignore_times)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests through to another transport and record them
+
+    Args:
+        path: Cassette file to write (appended to if it exists)
+        transport: Transport performing the real requests
+    """
+
+    def __init__(self, path: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = path
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.recorded = 0
+        self._started = time.monotonic()
+        self._file = _open(path, "a")
+        self._write({
+            "cassette": CASSETTE_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if not self.path.endswith(".gz"):
+            # Keep the cassette usable if the process is killed; compressed
+            # cassettes are only complete once closed
+            self._file.flush()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        offset = time.monotonic() - self._started
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.monotonic() - started
+
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in _ENCODING_HEADERS]
+        self._write({
+            "offset": round(offset, 6),
+            "elapsed": round(elapsed, 6),
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "headers": [
+                    (k, REDACTED if k.lower() in SECRET_HEADERS else v)
+                    for k, v in request.headers.multi_items()
+                ],
+                "body": _encode_body(content),
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": [(k, REDACTED if _secret_response_header(k) else v) for k, v in headers],
+                "body": _encode_body(body),
+            },
+        })
+        self.recorded += 1
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        self._file.close()
+        await self.transport.aclose()
+
+
+class CassetteMiss(httpx.RequestError):
+    """A request with no matching interaction left in the cassette
+
+    Not a TransportError, so TogglClient fails fast instead of retrying.
+    """
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answer requests from a recorded cassette
+
+    Requests are matched on method, path, query and body, and failing that
+    with date-time values ignored. Matching requests are answered in recorded
+    order; once they are used up the last answer is repeated if repeat is
+    set, otherwise CassetteMiss is raised.
+
+    Args:
+        path: Cassette file to read
+        time_scale: Multiplier for the recorded latency of each response
+                    (1.0 replays original timing, 0 answers immediately)
+        repeat: Keep answering with the last matching response when a request
+                is made more often than it was recorded
+    """
+
+    def __init__(self, path: str, time_scale: float = 1.0, repeat: bool = True):
+        self.path = path
+        self.time_scale = time_scale
+        self.repeat = repeat
+        self.replayed = 0
+        self.misses: List[Tuple[str, str, str, str]] = []
+        # The same records by exact key and by key ignoring date-times; a
+        # record replayed through one is marked used and skipped in the other
+        self._interactions: Dict[Tuple[str, str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_loose_key: Dict[Tuple[str, str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+        count = 0
+        with _open(path, "r") as f:
+            for line in f:
+                record = json.loads(line)
+                if "cassette" in record:
+                    if record["cassette"] > CASSETTE_VERSION:
+                        raise ValueError(f"Unsupported cassette version {record['cassette']}")
+                    continue
+                stored = record["request"]
+                url, content = httpx.URL(stored["url"]), _decode_body(stored["body"])
+                # Keep only the serialized body: large list responses are far
+                # smaller as bytes than as parsed JSON
+                response = record["response"]
+                response["content"] = _decode_body(response.pop("body"))
+                record["used"] = False
+                self._interactions[request_key(stored["method"], url, content)].append(record)
+                self._by_loose_key[request_key(stored["method"], url, content, ignore_times=True)].append(record)
+                count += 1
+        logger.info(f"Loaded {count} interactions from cassette {path}")
+
+    @staticmethod
+    def _next(queue: Optional[Deque[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Take the first record of queue not replayed yet"""
+        while queue:
+            record = queue.popleft()
+            if not record["used"]:
+                record["used"] = True
+                return record
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        content = await request.aread()
+        key = request_key(request.method, request.url, content)
+        loose_key = request_key(request.method, request.url, content, ignore_times=True)
+        record = self._next(self._interactions.get(key)) or self._next(self._by_loose_key.get(loose_key))
+        if record is not None:
+            self._last[key] = self._last[loose_key] = record
+        elif self.repeat and (key in self._last or loose_key in self._last):
+            record = self._last.get(key) or self._last[loose_key]
+        else:
+            self.misses.append(key)
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}", request=request)
+
+        if self.time_scale:
+            await asyncio.sleep(record["elapsed"] * self.time_scale)
+        self.replayed += 1
+        stored = record["response"]
+        return httpx.Response(
+            stored["status"],
+            headers=stored["headers"],
+            content=stored["content"],
+            request=request,
+        )
+
+    def remaining(self) -> int:
+        """Recorded interactions not replayed yet"""
+        return sum(not record["used"] for queue in self._interactions.values() for record in queue)
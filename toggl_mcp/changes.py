@@ -0,0 +1,189 @@
+"""
+What a time entry update actually changes
+
+Agents often re-apply values entries already have, e.g. setting the project
+of hundreds of entries right after setting it. changed_fields compares an
+update with the known state of an entry and keeps only the fields that
+differ, and plan_bulk_update splits a bulk update into the entries it
+leaves unchanged and groups of entries sharing the same change set, so
+unchanged fields and entries cost no quota.
+
+The only state trusted for this is what this process itself wrote in the
+last few seconds (WrittenState): fetched state may already be outdated by
+an edit made elsewhere, and skipping a write on outdated state would lose
+that write silently.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .search import to_timestamp
+
+TAG_FIELDS = ("tags", "tag_ids")
+
+
+def unchanged(entry: Dict[str, Any], field: str, value: Any, tag_action: Optional[str] = None) -> bool:
+    """Whether entry already has value for field; fields the entry lacks count as changed
+
+    Tags are compared as sets; with tag_action "add" they are unchanged when
+    the entry already has all of them. Start and stop compare as instants,
+    so "...T09:00:00Z" equals "...T09:00:00+00:00".
+    """
+    if field not in entry:
+        return False
+    current = entry[field]
+    if field in TAG_FIELDS:
+        wanted, present = set(value or []), set(current or [])
+        return wanted <= present if tag_action == "add" else wanted == present
+    if field in ("start", "stop") and current and value:
+        try:
+            return to_timestamp(current) == to_timestamp(value)
+        except ValueError:
+            return False
+    if field == "description":
+        return (current or "") == (value or "")
+    return current == value
+
+
+def changed_fields(entry: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of updates (a time entry PUT body) whose values entry does not have yet"""
+    return {field: value for field, value in updates.items() if not unchanged(entry, field, value)}
+
+
+def plan_bulk_update(
+    entry_ids: Iterable[int],
+    updates: Dict[str, Any],
+    known: Dict[int, Dict[str, Any]],
+    chunk_size: int
+) -> Tuple[List[int], List[Tuple[Dict[str, Any], List[int]]]]:
+    """Split a bulk update into unchanged entries and groups with identical changes
+
+    Entries without known state get every field. When sending each group
+    its own changes would take more requests (of chunk_size entries) than
+    sending every changed field to all changed entries at once, the groups
+    are merged into one.
+
+    Args:
+        entry_ids: Entries to update
+        updates: Bulk PATCH body, optionally with tag_action
+        known: Current state of entries by ID, where known
+        chunk_size: Most entries per request
+
+    Returns:
+        (IDs of entries already as requested, [(changes, IDs), ...])
+    """
+    tag_action = updates.get("tag_action")
+    fields = {field: value for field, value in updates.items() if field != "tag_action"}
+    skipped: List[int] = []
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    order: List[int] = []
+    for entry_id in entry_ids:
+        entry = known.get(entry_id)
+        changed = tuple(
+            field for field, value in fields.items()
+            if entry is None or not unchanged(entry, field, value, tag_action)
+        )
+        if changed:
+            groups.setdefault(changed, []).append(entry_id)
+            order.append(entry_id)
+        else:
+            skipped.append(entry_id)
+
+    def requests(count: int) -> int:
+        return -(-count // chunk_size)
+
+    if len(groups) > 1 and requests(len(order)) < sum(requests(len(ids)) for ids in groups.values()):
+        merged = tuple(field for field in fields if any(field in changed for changed in groups))
+        groups = {merged: order}
+
+    def changes(changed: Tuple[str, ...]) -> Dict[str, Any]:
+        result = {field: fields[field] for field in changed}
+        if tag_action is not None and any(field in TAG_FIELDS for field in changed):
+            result["tag_action"] = tag_action
+        return result
+
+    return skipped, [(changes(changed), ids) for changed, ids in groups.items()]
+
+
+class WrittenState:
+    """Field values this process wrote to time entries, kept for ttl seconds
+
+    Args:
+        ttl: Seconds written values are trusted; 0 disables eliding updates
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # entry ID -> (written at, fields), oldest write first
+        self._written: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        # Writes in flight per entry, and entries written concurrently, whose
+        # resulting state depends on the order the API applied the writes in
+        self._pending: Dict[int, int] = {}
+        self._contended: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._written)
+
+    def _prune(self, now: float):
+        cutoff = now - self.ttl
+        while self._written:
+            entry_id = next(iter(self._written))
+            if self._written[entry_id][0] >= cutoff:
+                break
+            del self._written[entry_id]
+
+    def record(self, entry_id: int, fields: Dict[str, Any], tag_action: Optional[str] = None):
+        """Remember fields as just written to an entry, on top of its still current writes
+
+        With tag_action "add" the tags written are merged into the tags
+        last written, and dropped when those are not known.
+        """
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        self._prune(now)
+        known = self._written.pop(entry_id, None)
+        state = dict(known[1]) if known else {}
+        for field, value in fields.items():
+            if field == "tag_action":
+                continue
+            if field in TAG_FIELDS and tag_action == "add":
+                if field in state:
+                    state[field] = sorted(set(state[field] or []) | set(value or []), key=str)
+                continue
+            state[field] = value
+        self._written[entry_id] = (now, state)
+
+    def begin(self, entry_ids: Iterable[int]):
+        """Note that writes to entries were sent; what they wrote before is no longer trusted"""
+        for entry_id in entry_ids:
+            self._written.pop(entry_id, None)
+            if self._pending.get(entry_id):
+                self._contended.add(entry_id)
+            self._pending[entry_id] = self._pending.get(entry_id, 0) + 1
+
+    def finish(self, entry_id: int, fields: Optional[Dict[str, Any]] = None, tag_action: Optional[str] = None):
+        """Note that a write begun with begin is done, recording fields if it succeeded
+
+        Nothing is recorded while the entry was written concurrently by
+        another call, since either write may have been applied last.
+        """
+        pending = self._pending.pop(entry_id, 1) - 1
+        if pending:
+            self._pending[entry_id] = pending
+        if fields is not None and entry_id not in self._contended:
+            self.record(entry_id, fields, tag_action)
+        if not pending:
+            self._contended.discard(entry_id)
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """Fields last written to an entry, if written within ttl seconds"""
+        known = self._written.get(entry_id)
+        if known is None or known[0] < time.monotonic() - self.ttl:
+            return None
+        return known[1]
+
+    def forget(self, entry_ids: Iterable[int]):
+        """Stop trusting what was written to entries, e.g. after deleting them"""
+        for entry_id in entry_ids:
+            self._written.pop(entry_id, None)
@@ -0,0 +1,138 @@
+"""
+Cached directory of workspace users
+
+Maps people's names and email addresses to Toggl user IDs without fetching
+the workspace's users on every lookup. Each workspace's users are fetched
+once and indexed; once the index is older than the TTL, lookups keep being
+answered from it while a background task fetches a fresh copy.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .accounting import current_usage
+from .admission import BACKGROUND, current_call_class
+
+logger = logging.getLogger(__name__)
+
+
+def _name(user: Dict[str, Any]) -> str:
+    return (user.get("fullname") or user.get("name") or "").strip()
+
+
+class _Index:
+    """One workspace's users, indexed by lowercased email and name"""
+
+    def __init__(self, users: List[Dict[str, Any]]):
+        self.users = users
+        self.fetched = time.monotonic()
+        self.by_email: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_name: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_word: Dict[str, List[Dict[str, Any]]] = {}
+        for user in users:
+            email, name = (user.get("email") or "").lower(), _name(user).lower()
+            if email:
+                self.by_email.setdefault(email, []).append(user)
+            if name:
+                self.by_name.setdefault(name, []).append(user)
+                for word in set(name.split()):
+                    self.by_word.setdefault(word, []).append(user)
+
+    def find(self, query: str) -> List[Dict[str, Any]]:
+        """Users matching query, best kind of match first
+
+        An exact email or full name wins, then a whole word of the name
+        ("priya" for "Priya Raman"), then any part of the name or email.
+        """
+        query = " ".join(query.lower().split())
+        for index in (self.by_email, self.by_name, self.by_word):
+            if query in index:
+                return list(index[query])
+        return [
+            user for user in self.users
+            if query in _name(user).lower() or query in (user.get("email") or "").lower()
+        ]
+
+
+class UserDirectory:
+    """Per-client cache of workspace users, refreshed in the background
+
+    Args:
+        load: Coroutine function fetching the users of one workspace ID
+        ttl: Seconds after which a workspace's users are refreshed
+    """
+
+    def __init__(self, load: Callable[[int], Awaitable[List[Dict[str, Any]]]], ttl: float = 300.0):
+        self._load = load
+        self.ttl = ttl
+        self._indexes: Dict[int, _Index] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._refreshing: Dict[int, asyncio.Task] = {}
+        self.loads = 0
+        self.refresh_failures = 0
+
+    async def _index(self, workspace_id: int) -> _Index:
+        index = self._indexes.get(workspace_id)
+        if index is None:
+            lock = self._locks.setdefault(workspace_id, asyncio.Lock())
+            async with lock:
+                index = self._indexes.get(workspace_id)
+                if index is None:
+                    # First lookup in this workspace waits for the fetch
+                    index = await self._fetch(workspace_id)
+        elif time.monotonic() - index.fetched > self.ttl and workspace_id not in self._refreshing:
+            task = asyncio.create_task(self._refresh(workspace_id))
+            self._refreshing[workspace_id] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(workspace_id, None))
+        return index
+
+    async def _fetch(self, workspace_id: int) -> _Index:
+        self.loads += 1
+        index = _Index(await self._load(workspace_id) or [])
+        self._indexes[workspace_id] = index
+        return index
+
+    async def _refresh(self, workspace_id: int):
+        # Runs in its own task, so this only changes the refresh requests: they are
+        # background work, not charged to the tool call whose lookup started them
+        current_call_class.set(BACKGROUND)
+        current_usage.set(None)
+        try:
+            await self._fetch(workspace_id)
+        except Exception as e:
+            # Keep serving the stale users; the next lookup tries again
+            self.refresh_failures += 1
+            logger.warning(f"Failed to refresh users of workspace {workspace_id}: {e}")
+
+    async def users(self, workspace_id: int) -> List[Dict[str, Any]]:
+        """All users of a workspace (shared, must not be mutated)"""
+        return (await self._index(workspace_id)).users
+
+    async def find(self, workspace_id: int, query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Users of a workspace matching a name or email, or all users without a query"""
+        index = await self._index(workspace_id)
+        return index.find(query) if query and query.strip() else index.users
+
+    def invalidate(self, workspace_id: Optional[int] = None):
+        """Drop one workspace's users, or every workspace's"""
+        if workspace_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(workspace_id, None)
+
+    def close(self):
+        """Cancel background refreshes"""
+        for task in list(self._refreshing.values()):
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cached workspaces and users, and fetch counts"""
+        return {
+            "workspaces": len(self._indexes),
+            "users": sum(len(index.users) for index in self._indexes.values()),
+            "loads": self.loads,
+            "refreshing": len(self._refreshing),
+            "refresh_failures": self.refresh_failures,
+        }
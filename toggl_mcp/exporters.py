@@ -0,0 +1,173 @@
+"""
+Span exporters for tracing
+
+Imported only when tracing is enabled, keeping the exporters off the
+start-up path. Both buffer finished spans and write them in batches off the
+event loop.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlExporter:
+    """Append finished spans to a JSON Lines file, in batches
+
+    Spans are buffered and written from a worker thread, so file I/O never
+    blocks the event loop; one batch is written at a time, in order.
+
+    Args:
+        path: File to append to
+        batch_size: Spans buffered before a batch is written
+        interval: Seconds after which a partial batch is written with the next span
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._file = open(path, "a", encoding="utf-8")
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._writing: Optional[asyncio.Task] = None
+
+    def export(self, record: Dict[str, Any]):
+        self._buffer.append(record)
+        if self._writing is not None:
+            return  # Picked up by the next batch
+        if len(self._buffer) < self.batch_size and time.monotonic() - self._last_flush < self.interval:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop: written by the next flush
+        self._start(loop)
+
+    def _start(self, loop: asyncio.AbstractEventLoop) -> asyncio.Task:
+        records, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        self._writing = loop.create_task(asyncio.to_thread(self._write, records))
+        self._writing.add_done_callback(self._written)
+        return self._writing
+
+    def _written(self, task: asyncio.Task):
+        self._writing = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Span export failed: {task.exception()!r}")
+
+    def _write(self, records: List[Dict[str, Any]]):
+        self._file.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+        self._file.flush()
+
+    async def flush(self):
+        """Write all buffered spans"""
+        while self._writing is not None:
+            await asyncio.gather(self._writing, return_exceptions=True)
+        if self._buffer:
+            await asyncio.gather(self._start(asyncio.get_running_loop()), return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+        self._file.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpExporter:
+    """Send finished spans to an OTLP/HTTP collector as JSON, in batches
+
+    Args:
+        endpoint: Collector base URL (spans are POSTed to {endpoint}/v1/traces)
+        batch_size: Spans buffered before a batch is sent
+        interval: Seconds after which a partial batch is sent with the next span
+        http_client: HTTP client to send with (created if not given)
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        batch_size: int = 256,
+        interval: float = 5.0,
+        http_client: Optional[httpx.AsyncClient] = None
+    ):
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.client = http_client or httpx.AsyncClient(timeout=10.0)
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._pending: set = set()
+
+    def export(self, record: Dict[str, Any]):
+        self._buffer.append(record)
+        if len(self._buffer) < self.batch_size and time.monotonic() - self._last_flush < self.interval:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop: sent by the next flush
+        records, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        task = loop.create_task(self._send(records))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _payload(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        spans = []
+        for record in records:
+            span = {
+                "traceId": record["trace_id"],
+                "spanId": record["span_id"],
+                "name": record["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(record["start_ns"]),
+                "endTimeUnixNano": str(record["end_ns"]),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in record["attributes"].items()
+                ],
+                "status": {"code": 2, "message": record["error"]} if record["error"] else {"code": 1},
+            }
+            if record["parent_id"]:
+                span["parentSpanId"] = record["parent_id"]
+            spans.append(span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "toggl-mcp"}}]},
+            "scopeSpans": [{"scope": {"name": "toggl_mcp"}, "spans": spans}],
+        }]}
+
+    async def flush(self):
+        """Send all buffered spans"""
+        records, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        if records:
+            await self._send(records)
+
+    async def _send(self, records: List[Dict[str, Any]]):
+        try:
+            response = await self.client.post(self.url, json=self._payload(records))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Dropped {len(records)} spans, OTLP export failed: {e!r}")
+
+    async def close(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.flush()
+        await self.client.aclose()
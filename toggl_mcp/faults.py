@@ -0,0 +1,214 @@
+"""
+Fault injection for the TogglClient HTTP transport
+
+FaultInjectionTransport wraps another transport and, per endpoint, turns
+requests into 429 storms, 5xx bursts, slow bodies, timeouts or connection
+resets. Faults fire probabilistically, from a script (the nth matching
+request gets the nth fault) and/or within a time window, so resilience under
+load can be exercised against the in-memory stub or a recorded cassette.
+
+Rules can also be loaded from JSON, e.g. TOGGL_MCP_FAULTS:
+    [{"endpoint": "GET /workspaces/*", "probability": 0.2,
+      "fault": {"kind": "status", "status": 503}}]
+"""
+
+import asyncio
+import fnmatch
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import httpx
+
+from .metrics import endpoint_template
+
+FAULT_KINDS = ("status", "reset", "timeout", "slow_body", "latency")
+
+
+@dataclass
+class Fault:
+    """One injected failure
+
+    Args:
+        kind: "status" (answer with an error status without reaching upstream),
+              "reset" (connection reset), "timeout" (read timeout after delay),
+              "slow_body" (upstream response trickled out over delay seconds)
+              or "latency" (delay, then pass through)
+        status: Status code for "status" faults
+        retry_after: Retry-After header for "status" faults
+        delay: Seconds of delay for timeout, slow_body and latency faults
+        after_send: For "reset", deliver the request upstream first and lose
+                    the response, like a connection dropped mid-operation
+    """
+
+    kind: str = "status"
+    status: int = 503
+    retry_after: Optional[float] = None
+    delay: float = 0.0
+    after_send: bool = False
+
+    def __post_init__(self):
+        if self.kind not in FAULT_KINDS:
+            raise ValueError(f"Unknown fault kind '{self.kind}', expected one of: {', '.join(FAULT_KINDS)}")
+
+
+@dataclass
+class FaultRule:
+    """Where and when to inject a fault
+
+    Args:
+        fault: Fault to inject
+        endpoint: "METHOD /template" or "/template" glob matched against the
+                  request's endpoint template, e.g. "PATCH /workspaces/{wid}/*"
+                  (every endpoint if None)
+        probability: Chance of injecting the fault into a matching request
+        script: Faults (or None for no fault) for successive matching
+                requests, applied before probability is considered
+        start: Seconds after the transport was created when the rule activates
+        duration: Seconds the rule stays active (forever if None)
+        limit: Maximum number of faults the rule injects
+    """
+
+    fault: Fault = field(default_factory=Fault)
+    endpoint: Optional[str] = None
+    probability: float = 0.0
+    script: Sequence[Optional[Fault]] = ()
+    start: float = 0.0
+    duration: Optional[float] = None
+    limit: Optional[int] = None
+    matched: int = 0
+    injected: int = 0
+
+    def matches(self, method: str, template: str) -> bool:
+        if self.endpoint is None:
+            return True
+        pattern_method, _, pattern_path = self.endpoint.rpartition(" ")
+        if pattern_method and pattern_method.upper() != method:
+            return False
+        return fnmatch.fnmatchcase(template, pattern_path)
+
+    def active(self, elapsed: float) -> bool:
+        if elapsed < self.start:
+            return False
+        return self.duration is None or elapsed < self.start + self.duration
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FaultRule":
+        data = dict(data)
+        data["fault"] = Fault(**data.get("fault", {}))
+        data["script"] = [Fault(**item) if item else None for item in data.get("script", ())]
+        return cls(**data)
+
+
+def load_rules(config: str) -> List[FaultRule]:
+    """Parse fault rules from a JSON list of rule objects"""
+    return [FaultRule.from_dict(item) for item in json.loads(config)]
+
+
+class _SlowStream(httpx.AsyncByteStream):
+    """Response body delivered in pieces spread over delay seconds"""
+
+    def __init__(self, body: bytes, delay: float, pieces: int = 8):
+        self.body = body
+        self.delay = delay
+        self.pieces = pieces
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        size = max(1, -(-len(self.body) // self.pieces))
+        for i in range(0, max(len(self.body), 1), size):
+            await asyncio.sleep(self.delay / self.pieces)
+            yield self.body[i:i + size]
+
+
+class FaultInjectionTransport(httpx.AsyncBaseTransport):
+    """Inject faults into requests on their way to another transport
+
+    Args:
+        transport: Transport answering requests that are not failed outright
+        rules: Fault rules, checked in order; the first one firing wins
+        seed: Random seed for probabilistic faults
+        base_path: API path prefix stripped before matching endpoint templates
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        rules: Sequence[FaultRule] = (),
+        seed: Optional[int] = None,
+        base_path: str = "/api/v9"
+    ):
+        self.transport = transport
+        self.rules = list(rules)
+        self.random = random.Random(seed)
+        self.base_path = base_path
+        self.started = time.monotonic()
+        self.requests = 0
+        self.injected: Counter = Counter()  # (endpoint, kind) -> count
+
+    def _pick(self, method: str, template: str) -> Optional[Fault]:
+        elapsed = time.monotonic() - self.started
+        for rule in self.rules:
+            if not rule.active(elapsed) or not rule.matches(method, template):
+                continue
+            if rule.limit is not None and rule.injected >= rule.limit:
+                continue
+            index = rule.matched
+            rule.matched += 1
+            if index < len(rule.script):
+                fault = rule.script[index]
+            elif rule.probability and self.random.random() < rule.probability:
+                fault = rule.fault
+            else:
+                fault = None
+            if fault is not None:
+                rule.injected += 1
+                return fault
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        path = request.url.path
+        if path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        template = endpoint_template(path)
+        fault = self._pick(request.method, template)
+        if fault is None:
+            return await self.transport.handle_async_request(request)
+        self.injected[(f"{request.method} {template}", fault.kind)] += 1
+
+        if fault.kind == "status":
+            headers = {"Retry-After": str(fault.retry_after)} if fault.retry_after is not None else {}
+            return httpx.Response(fault.status, headers=headers, json={"error": "injected fault"}, request=request)
+        if fault.kind == "reset":
+            if fault.after_send:
+                response = await self.transport.handle_async_request(request)
+                await response.aclose()
+                raise httpx.ReadError("Connection reset by peer (injected)", request=request)
+            raise httpx.ConnectError("Connection reset by peer (injected)", request=request)
+        if fault.kind == "timeout":
+            await asyncio.sleep(fault.delay)
+            raise httpx.ReadTimeout("Timed out (injected)", request=request)
+        if fault.kind == "latency":
+            await asyncio.sleep(fault.delay)
+            return await self.transport.handle_async_request(request)
+
+        # slow_body
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() != "content-length"]
+        return httpx.Response(
+            response.status_code, headers=headers, stream=_SlowStream(body, fault.delay), request=request
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests seen and faults injected per endpoint and kind"""
+        return {
+            "requests": self.requests,
+            "injected": {f"{endpoint} {kind}": count for (endpoint, kind), count in sorted(self.injected.items())},
+        }
+
+    async def aclose(self):
+        await self.transport.aclose()
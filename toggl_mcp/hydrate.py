@@ -0,0 +1,60 @@
+"""
+Time entries joined with their reference data
+
+Time entries only carry IDs (project_id, task_id, tag_ids). hydrate_entries
+resolves them to names with one hash join: each workspace's projects,
+clients, tags and tasks are indexed by ID once, and every entry is then
+resolved with dictionary lookups.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _by_id(records: Optional[Iterable[Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+    return {record["id"]: record for record in records or [] if "id" in record}
+
+
+@dataclass
+class ReferenceIndex:
+    """One workspace's reference records by ID"""
+
+    projects: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    clients: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    tags: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    tasks: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        projects: Optional[Iterable[Dict[str, Any]]] = None,
+        clients: Optional[Iterable[Dict[str, Any]]] = None,
+        tags: Optional[Iterable[Dict[str, Any]]] = None,
+        tasks: Optional[Iterable[Dict[str, Any]]] = None
+    ) -> "ReferenceIndex":
+        return cls(_by_id(projects), _by_id(clients), _by_id(tags), _by_id(tasks))
+
+
+def hydrate_entry(entry: Dict[str, Any], index: ReferenceIndex) -> Dict[str, Any]:
+    """Copy of entry with project_name, client_name, task_name and tags resolved
+
+    Names that cannot be resolved (e.g. an archived project missing from the
+    reference data) are None. Tag names already on the entry are kept.
+    """
+    hydrated = dict(entry)
+    project = index.projects.get(entry.get("project_id"))
+    hydrated["project_name"] = project.get("name") if project else None
+    client_id = (project.get("client_id") or project.get("cid")) if project else None
+    client = index.clients.get(client_id)
+    hydrated["client_name"] = client.get("name") if client else None
+    task = index.tasks.get(entry.get("task_id"))
+    hydrated["task_name"] = task.get("name") if task else None
+    if not entry.get("tags") and entry.get("tag_ids"):
+        hydrated["tags"] = [index.tags[tag_id]["name"] for tag_id in entry["tag_ids"] if tag_id in index.tags]
+    return hydrated
+
+
+def hydrate_entries(entries: Iterable[Dict[str, Any]], indexes: Dict[int, ReferenceIndex]) -> List[Dict[str, Any]]:
+    """Hydrate entries against the reference index of their workspace"""
+    empty = ReferenceIndex()
+    return [hydrate_entry(entry, indexes.get(entry.get("workspace_id"), empty)) for entry in entries]
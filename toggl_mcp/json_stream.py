@@ -0,0 +1,117 @@
+"""
+Incremental JSON array parsing
+
+Decodes a top-level JSON array from an async stream of byte chunks and yields
+its elements one at a time, so large API responses never have to be held in
+memory as raw bytes, decoded text and parsed list all at once.
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+_decoder = json.JSONDecoder()
+
+
+def _skip(buf: str, pos: int, chars: str) -> int:
+    """Advance pos past any of chars"""
+    end = len(buf)
+    while pos < end and buf[pos] in chars:
+        pos += 1
+    return pos
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Yield the elements of a JSON array streamed as byte chunks.
+
+    Args:
+        chunks: Async iterable of raw (UTF-8) response body chunks
+
+    Yields:
+        Each element of the top-level array, in order. An empty body or a
+        JSON ``null`` yields nothing.
+
+    Raises:
+        ValueError: If the body is not a well-formed JSON array
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    started = False
+    finished = False
+    expect_value = True  # False once an element was read and a ',' or ']' must follow
+
+    iterator = chunks.__aiter__()
+    more = True
+
+    async def feed() -> bool:
+        """Append the next chunk to buf, returning False at end of stream"""
+        nonlocal buf
+        while True:
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                buf += text.decode(b"", final=True)
+                return False
+            if chunk:
+                buf += text.decode(chunk)
+                return True
+
+    while True:
+        pos = _skip(buf, 0, _WHITESPACE)
+
+        if not started:
+            if pos == len(buf):
+                if not more:
+                    return
+                more = await feed()
+                continue
+            if buf[pos] != "[":
+                while more:
+                    more = await feed()
+                if buf[pos:].strip() == "null":
+                    return
+                raise ValueError("Expected a JSON array response")
+            started = True
+            pos += 1
+
+        while True:
+            pos = _skip(buf, pos, _WHITESPACE)
+            if pos == len(buf):
+                break
+            char = buf[pos]
+            if char == "]":
+                finished = True
+                pos += 1
+                break
+            if not expect_value:
+                if char != ",":
+                    raise ValueError(f"Malformed JSON array at offset {pos}")
+                expect_value = True
+                pos += 1
+                continue
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not more:
+                    raise ValueError("Truncated or malformed JSON array")
+                break
+            # A number that ends at the buffer edge (or before a character
+            # that cannot follow it) may have been cut short mid-chunk
+            if more and (end == len(buf) or buf[end] not in _DELIMITERS):
+                break
+            expect_value = False
+            pos = end
+            yield item
+
+        buf = buf[pos:]
+        if finished:
+            while more:
+                more = await feed()
+            if buf.strip():
+                raise ValueError("Unexpected data after JSON array")
+            return
+        if not more:
+            raise ValueError("Truncated JSON array")
+        more = await feed()
@@ -0,0 +1,77 @@
+"""
+Deferred tool registration for FastMCP
+
+Registering a tool with FastMCP builds a pydantic model and JSON schema from
+its signature, which for every tool together is a noticeable part of server
+start-up. LazyToolManager only queues registrations; a tool's schema is built
+the first time it is looked up (tools/call) or when all tools are listed
+(tools/list), after the client's initialize handshake has been answered.
+
+FastMCP has no public hook for its tool manager, so install() replaces the
+private FastMCP._tool_manager (present from mcp 1.10 on; the dependency is
+pinned below 2). Should that attribute change, install() leaves FastMCP's
+own manager in place and tools are built eagerly as usual.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mcp.server.fastmcp.tools import Tool, ToolManager  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class LazyToolManager(ToolManager):
+    """ToolManager building each tool on first use"""
+
+    def __init__(self, warn_on_duplicate_tools: bool = True):
+        super().__init__(warn_on_duplicate_tools)
+        self._pending: Dict[str, Tuple[Callable[..., Any], Dict[str, Any]]] = {}
+
+    def add_tool(self, fn: Callable[..., Any], name: Optional[str] = None, **kwargs) -> Optional[Tool]:
+        name = name or fn.__name__
+        if name in self._pending:
+            self._build(name)
+        if name in self._tools:
+            # Same outcome as an eager duplicate: the first registration wins
+            return super().add_tool(fn, name=name, **kwargs)
+        self._pending[name] = (fn, kwargs)
+        return None
+
+    def _build(self, name: str) -> Optional[Tool]:
+        fn, kwargs = self._pending.pop(name)
+        return super().add_tool(fn, name=name, **kwargs)
+
+    def get_tool(self, name: str) -> Optional[Tool]:
+        if name in self._pending:
+            self._build(name)
+        return super().get_tool(name)
+
+    def list_tools(self) -> List[Tool]:
+        for name in list(self._pending):
+            self._build(name)
+        return super().list_tools()
+
+    def remove_tool(self, name: str) -> None:
+        if self._pending.pop(name, None) is None:
+            super().remove_tool(name)
+
+    @property
+    def pending(self) -> int:
+        """Registered tools whose schema has not been built yet"""
+        return len(self._pending)
+
+
+def install(server: Any) -> bool:
+    """Replace server's tool manager with a LazyToolManager before any tool is registered
+
+    Returns:
+        Whether it was replaced; False if FastMCP no longer keeps a plain
+        ToolManager in _tool_manager, or tools are already registered
+    """
+    current = getattr(server, "_tool_manager", None)
+    if type(current) is not ToolManager or current.list_tools():
+        logger.warning("FastMCP tool manager not found where expected, building tool schemas eagerly")
+        return False
+    server._tool_manager = LazyToolManager(current.warn_on_duplicate_tools)
+    return True
@@ -0,0 +1,123 @@
+"""
+Request rate and concurrency limits for the Toggl API client
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """Token bucket limiting how many requests per second a client may start
+
+    Args:
+        rate: Sustained requests per second
+        burst: Requests that may be made back to back (defaults to the rate, at least 1)
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a request may be made and spend one token"""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AdaptiveLimiter:
+    """AIMD limit on requests in flight, driven by observed latency and throttling
+
+    The limit grows additively (about +1 per limit's worth of successful
+    requests) while latency stays near its baseline and the limit is actually
+    being used, and shrinks multiplicatively on 429s, 5xx, timeouts or latency
+    spikes. At most one decrease is applied per baseline round trip so a burst
+    of failures from requests already in flight only backs off once.
+
+    Args:
+        initial: Starting limit
+        min_limit: Lower bound for the limit
+        max_limit: Upper bound for the limit
+        decrease: Factor applied to the limit on back off
+        latency_tolerance: Latency above baseline * tolerance counts as a spike
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease: float = 0.5,
+        latency_tolerance: float = 3.0
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self.baseline: Optional[float] = None  # Smoothed latency of healthy requests, seconds
+        self.backoffs = 0
+        self._last_backoff = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    def on_success(self, latency: float, in_flight: Optional[int] = None):
+        """Record a successful request that took latency seconds
+
+        Args:
+            latency: Time spent waiting on the upstream response
+            in_flight: Requests in flight when it completed; the limit only
+                       grows while it is close to saturated
+        """
+        if self.baseline is None:
+            self.baseline = latency
+        elif latency > self.baseline * self.latency_tolerance:
+            # Drift slowly so a lasting slowdown becomes the new baseline
+            self.baseline += 0.02 * (latency - self.baseline)
+            self.on_backoff("latency")
+            return
+        else:
+            self.baseline += 0.1 * (latency - self.baseline)
+
+        if in_flight is None or in_flight >= self.limit - 1:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def on_backoff(self, reason: str = "throttled"):
+        """Record a 429, timeout or latency spike and shrink the limit"""
+        now = time.monotonic()
+        if now - self._last_backoff < (self.baseline or 0.0):
+            return
+        self._last_backoff = now
+        self.backoffs += 1
+        self._limit = max(float(self.min_limit), self._limit * self.decrease)
+        logger.debug(f"Backing off ({reason}), concurrency limit now {self.limit}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit and how it got there"""
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency_ms": round(self.baseline * 1000, 2) if self.baseline is not None else None,
+            "backoffs": self.backoffs,
+        }
@@ -5,16 +5,33 @@ Toggl MCP Server - A Model Context Protocol server for Toggl API integration
 
 import os
 import sys
-import json
+import asyncio
 import logging
+import functools
+import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any, Union
-from dateutil import parser  # type: ignore
-import pytz  # type: ignore
+from typing import Optional, List, Dict, Any, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import httpx  # type: ignore
 
 from mcp.server.fastmcp import FastMCP  # type: ignore
+from mcp.server.lowlevel.server import request_ctx  # type: ignore
+from mcp.server.transport_security import TransportSecuritySettings  # type: ignore
+from starlette.requests import Request  # type: ignore
+from starlette.responses import PlainTextResponse  # type: ignore
 from .toggl_client import TogglClient
+from .registry import ClientRegistry
+from .accounting import current_usage, ledger
+from .admission import INTERACTIVE, READ, BULK, current_call_class
+from .batch import BatchError, parse_operations, run_batch
+from .hydrate import ReferenceIndex, hydrate_entries
+from . import lazy_tools
+from .metrics import metrics, serve_prometheus
+from .search import to_timestamp
+from .timesheet import WorkingHours, check_intervals, interval
+from .validation import ValidationError, compile_validator, parse_bool
+from .tracing import traced, tracer
 
 # Set up logging
 logging.basicConfig(
@@ -25,45 +42,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Initialize FastMCP server
+# Initialize FastMCP server. Tool schemas are built on first use rather than
+# at import, keeping them off the start-up path.
 mcp = FastMCP("toggl-mcp")
+lazy_tools.install(mcp)
 
 # Global variables
 toggl_client: Optional[TogglClient] = None
 default_workspace_id: Optional[int] = None
+# Set in multi-tenant mode, where each session brings its own API token
+client_registry: Optional[ClientRegistry] = None
+# Tool profiler, loaded the first time profiling is armed (see _profiler)
+profiler = None
 
 
 
-def to_bool(value: Any) -> Optional[bool]:
-    """Convert various types to boolean.
-    
-    Args:
-        value: Can be bool, string, number, or None
-        
-    Returns:
-        Boolean value or None if input is None
-    """
-    if value is None:
-        return None
-    if isinstance(value, bool):
-        return value
-    if isinstance(value, str):
-        lower_val = value.lower()
-        if lower_val in ('true', '1', 'yes', 'y', 'on'):
-            return True
-        elif lower_val in ('false', '0', 'no', 'n', 'off', ''):
-            return False
-        else:
-            # Try to parse as number
-            try:
-                return bool(int(value))
-            except ValueError:
-                raise ValueError(f"Cannot convert '{value}' to boolean")
-    if isinstance(value, (int, float)):
-        return bool(value)
-    return bool(value)
-
-
+@traced("to_utc_string")
 def to_utc_string(dt_str: Optional[str] = None, user_timezone: Optional[str] = None) -> str:
     """Convert a datetime string to UTC format required by Toggl API.
     
@@ -79,6 +73,10 @@ def to_utc_string(dt_str: Optional[str] = None, user_timezone: Optional[str] = N
         # Use current UTC time
         return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
     
+    # Imported here: dateutil and pytz are slow to import and not needed to start
+    from dateutil import parser  # type: ignore
+    import pytz  # type: ignore
+    
     # Parse the datetime string
     dt = parser.parse(dt_str)
     
@@ -99,58 +97,290 @@ def to_utc_string(dt_str: Optional[str] = None, user_timezone: Optional[str] = N
     return dt.isoformat().replace('+00:00', 'Z')
 
 
+def session_credentials() -> Tuple[Optional[str], Optional[int]]:
+    """Get the API token and default workspace supplied by the current MCP session.
+    
+    HTTP sessions send them as X-Toggl-Api-Token (or Authorization: Bearer) and
+    X-Toggl-Workspace-Id headers. Any session may instead pass them at
+    initialization in capabilities.experimental["toggl"] as "api_token" and
+    "workspace_id".
+    
+    Returns:
+        (api_token, workspace_id), either of which may be None
+    """
+    ctx = request_ctx.get(None)
+    if ctx is None:
+        return None, None
+    
+    token = workspace = None
+    headers = getattr(ctx.request, "headers", None)
+    if headers is not None:
+        token = headers.get("x-toggl-api-token")
+        authorization = headers.get("authorization", "")
+        if not token and authorization.lower().startswith("bearer "):
+            token = authorization[7:].strip()
+        workspace = headers.get("x-toggl-workspace-id")
+    
+    client_params = getattr(ctx.session, "client_params", None)
+    experimental = getattr(getattr(client_params, "capabilities", None), "experimental", None) or {}
+    init_credentials = experimental.get("toggl") or {}
+    token = token or init_credentials.get("api_token")
+    workspace = workspace or init_credentials.get("workspace_id")
+    
+    try:
+        workspace_id = int(workspace) if workspace else None
+    except ValueError:
+        logger.warning(f"Ignoring invalid session workspace ID '{workspace}'")
+        workspace_id = None
+    return token, workspace_id
+
+
+def session_key() -> str:
+    """Identify the current MCP session for usage accounting"""
+    ctx = request_ctx.get(None)
+    if ctx is None:
+        return "local"
+    headers = getattr(ctx.request, "headers", None)
+    session_id = headers.get("mcp-session-id") if headers is not None else None
+    return session_id or f"session-{id(ctx.session):x}"
+
+
+def get_client() -> Optional[TogglClient]:
+    """Get the Toggl client for the current call.
+    
+    In multi-tenant mode this is the client registered for the session's API
+    token; otherwise it is the process-wide client.
+    """
+    if client_registry is not None:
+        token, _ = session_credentials()
+        return client_registry.get(token) if token else None
+    return toggl_client
+
+
+def _profiler():
+    """The tool profiler, imported on first use to keep it off the start-up path"""
+    global profiler
+    if profiler is None:
+        from .profiling import profiler as loaded
+        profiler = loaded
+    return profiler
+
+
+def client_not_initialized() -> Dict[str, str]:
+    """Error returned by tools when no Toggl client is available"""
+    if client_registry is not None:
+        return {"error": "Toggl client not initialized. Please send your Toggl API token "
+                         "in the X-Toggl-Api-Token header."}
+    return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
+
+
 def get_workspace_id(workspace_id: Optional[int] = None) -> int:
     """Helper to get workspace ID from arguments or default"""
     if workspace_id:
         return workspace_id
+    if client_registry is not None:
+        _, session_workspace_id = session_credentials()
+        if session_workspace_id:
+            return session_workspace_id
     if default_workspace_id:
         return default_workspace_id
     raise ValueError("No workspace_id provided and no default workspace set")
 
 
+# Workspaces fetched at once by listing tools in all_workspaces mode
+WORKSPACE_CONCURRENCY = 4
+
+
+async def list_across_workspaces(client: TogglClient, resource: str, fetch) -> Dict[str, Any]:
+    """List a resource in every workspace of the user concurrently.
+    
+    Items are tagged with their workspace_id and workspace_name. A workspace
+    that cannot be listed (e.g. no admin rights) is reported under "errors"
+    instead of failing the whole listing.
+    
+    Args:
+        client: Toggl client
+        resource: Key for the merged items, e.g. "projects"
+        fetch: Coroutine function listing the resource for one workspace ID
+    """
+    workspaces = await client.get_workspaces()
+    semaphore = asyncio.Semaphore(WORKSPACE_CONCURRENCY)
+    
+    async def fetch_workspace(workspace_id: int) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await fetch(workspace_id)
+    
+    results = await asyncio.gather(
+        *(fetch_workspace(ws["id"]) for ws in workspaces), return_exceptions=True
+    )
+    items: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for ws, result in zip(workspaces, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            if isinstance(result, httpx.HTTPStatusError):
+                error = f"HTTP {result.response.status_code}: {result.response.text}"
+            else:
+                error = str(result) or type(result).__name__
+            logger.warning(f"Failed to list {resource} in workspace {ws['id']}: {error}")
+            errors.append({"workspace_id": ws["id"], "workspace_name": ws.get("name"), "error": error})
+            continue
+        # Copy: results may be shared cache entries
+        items.extend({**item, "workspace_id": ws["id"], "workspace_name": ws.get("name")} for item in result or [])
+    if workspaces and len(errors) == len(workspaces):
+        return {"error": f"Failed to list {resource} in every workspace: {errors[0]['error']}"}
+    return {resource: items, "workspaces": len(workspaces), "errors": errors}
+
+
+# Registered tools by name
+TOOLS: Dict[str, Any] = {}
+
+
+def toggl_tool(call_class: str, endpoint: Optional[str] = None):
+    """Register an MCP tool whose Toggl requests are admitted as call_class.
+    
+    Arguments are coerced to the tool's annotated types (IDs sent as strings
+    become ints, "yes"/"false" become bools) before the tool runs, and
+    invalid arguments are answered with an error. Handler latency and
+    failures (exceptions or {"error": ...} results) are recorded in the
+    tool metrics, each call is traced as a root span whose trace ID
+    identifies the call, and the upstream requests the call makes are
+    charged to it and its session in the usage ledger. Calls of tools armed
+    for profiling are profiled.
+    
+    Args:
+        call_class: Admission class (INTERACTIVE, READ, BULK or BACKGROUND)
+                    used to prioritize the tool's upstream requests
+        endpoint: API_ENDPOINTS entry the tool writes to (e.g. "tags.create"),
+                  whose field types and required fields are checked too
+    """
+    def decorator(fn):
+        name = fn.__name__
+        # Compiled on the first call, to keep it off the start-up path
+        validator = None
+        
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            nonlocal validator
+            token = current_call_class.set(call_class)
+            started = time.perf_counter()
+            failed = True
+            try:
+                with tracer.span(f"tool {name}", root=True, tool=name, call_class=call_class) as span:
+                    try:
+                        # Its own span, so coercion cost shows apart from the handler's
+                        with tracer.span("tool.validate"):
+                            if validator is None:
+                                validator = compile_validator(fn, endpoint)
+                            arguments = validator(args, kwargs)
+                    except ValidationError as e:
+                        span.fail(str(e))
+                        return {"error": str(e)}
+                    usage = ledger.start_call(name, session_key(), span.trace_id)
+                    usage_token = current_usage.set(usage)
+                    try:
+                        with profiler.profile(name, span.trace_id) if profiler else nullcontext():
+                            result = await fn(**arguments)
+                    finally:
+                        current_usage.reset(usage_token)
+                        ledger.finish_call(usage)
+                    failed = isinstance(result, dict) and "error" in result
+                    if failed:
+                        span.fail(str(result["error"]))
+                    return result
+            finally:
+                metrics.observe_tool(name, time.perf_counter() - started, failed)
+                current_call_class.reset(token)
+        
+        mcp.tool()(wrapper)
+        TOOLS[name] = wrapper
+        return wrapper
+    return decorator
+
+
 # User & Workspace Tools
-@mcp.tool()
+@toggl_tool(READ)
 async def toggl_get_user() -> Dict[str, Any]:
     """Get current Toggl user information"""
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    return await toggl_client.get_me()
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    return await client.get_me()
 
 
-@mcp.tool()
+@toggl_tool(READ)
 async def toggl_list_workspaces() -> List[Dict[str, Any]]:
     """List all available Toggl workspaces"""
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    return await toggl_client.get_workspaces()
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    return await client.get_workspaces()
 
 
-@mcp.tool()
+@toggl_tool(READ)
 async def toggl_list_organizations() -> List[Dict[str, Any]]:
     """List user's organizations"""
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    return await toggl_client.get_organizations()
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    return await client.get_organizations()
+
+
+@toggl_tool(READ)
+async def toggl_find_users(
+    query: Optional[str] = None,
+    workspace_id: Optional[Union[int, str]] = None,
+    all_workspaces: Optional[Union[bool, str]] = False
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Find workspace users by name or email, e.g. to get the user ID of a colleague
+    
+    Users are served from a cached directory that refreshes itself in the
+    background, so repeated lookups are cheap.
+    
+    Args:
+        query: Email, full name or part of a name (lists every user if not provided)
+        workspace_id: Workspace ID (uses default if not provided)
+        all_workspaces: Search every workspace at once, tagging users with
+                        workspace_id and workspace_name. Returns
+                        {"users": [...], "workspaces": count, "errors": [...]}.
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    if all_workspaces:
+        return await list_across_workspaces(
+            client, "users", lambda wid: client.directory.find(wid, query)
+        )
+    
+    wid = get_workspace_id(workspace_id)
+    return await client.directory.find(wid, query)
 
 
 # Project Tools
-@mcp.tool()
-async def toggl_list_projects(workspace_id: Optional[Union[int, str]] = None) -> List[Dict[str, Any]]:
-    """List all projects in a workspace
+@toggl_tool(READ)
+async def toggl_list_projects(
+    workspace_id: Optional[Union[int, str]] = None,
+    all_workspaces: Optional[Union[bool, str]] = False
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """List all projects in a workspace, or in all of the user's workspaces
     
     Args:
         workspace_id: Workspace ID (uses default if not provided)
+        all_workspaces: List projects of every workspace at once, tagged with
+                        workspace_id and workspace_name. Returns
+                        {"projects": [...], "workspaces": count, "errors": [...]}.
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    if all_workspaces:
+        return await list_across_workspaces(client, "projects", client.get_projects)
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.get_projects(wid)
+    return await client.get_projects(wid)
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="projects.create")
 async def toggl_create_project(
     name: str,
     workspace_id: Optional[Union[int, str]] = None,
@@ -167,17 +397,9 @@ async def toggl_create_project(
         color: Project color in hex format (optional)
         is_private: Whether the project is private (accepts bool, string, or number)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
-    if client_id is not None and isinstance(client_id, str):
-        client_id = int(client_id)
-    
-    # Convert to bool if needed
-    is_private = to_bool(is_private)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
     kwargs = {}
@@ -187,39 +409,105 @@ async def toggl_create_project(
         kwargs["color"] = color
     if is_private is not None:
         kwargs["is_private"] = is_private
-    return await toggl_client.create_project(wid, name, **kwargs)
+    return await client.create_project(wid, name, **kwargs)
 
 
 # Time Entry Tools
-@mcp.tool()
+@toggl_tool(READ)
 async def toggl_list_time_entries(
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
-) -> List[Dict[str, Any]]:
+    end_date: Optional[str] = None,
+    hydrate: Optional[Union[bool, str]] = False
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """List time entries within a date range
     
     Args:
         start_date: Start date (ISO 8601 format, defaults to 7 days ago)
         end_date: End date (ISO 8601 format, defaults to today)
+        hydrate: Add project_name, client_name, task_name and tag names to
+                 each entry, so projects and tags need not be listed separately
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     # Use UTC time for default dates
     end = end_date or datetime.now(timezone.utc).isoformat()
     start = start_date or (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-    return await toggl_client.get_time_entries(start, end)
+    if hydrate:
+        return await list_hydrated_time_entries(client, start, end)
+    return await client.get_time_entries(start, end)
+
+
+async def load_references(client: TogglClient, workspace_id: int) -> ReferenceIndex:
+    """Index a workspace's projects, clients and tags by ID
+    
+    Reference data that cannot be fetched (e.g. clients without admin rights)
+    is left out, so its names are not resolved.
+    """
+    results = await asyncio.gather(
+        client.get_projects(workspace_id), client.get_clients(workspace_id), client.get_tags(workspace_id),
+        return_exceptions=True
+    )
+    errors = []
+    for result in results:
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            errors.append(str(result) or type(result).__name__)
+    if errors:
+        logger.warning(f"Incomplete reference data for workspace {workspace_id}: {'; '.join(errors)}")
+    projects, clients, tags = (None if isinstance(r, Exception) else r for r in results)
+    return ReferenceIndex.build(projects, clients, tags)
 
 
-@mcp.tool()
+async def list_hydrated_time_entries(client: TogglClient, start: str, end: str) -> List[Dict[str, Any]]:
+    """Time entries with their project, client, task and tag names resolved
+    
+    The default workspace's reference data is fetched concurrently with the
+    entries; other workspaces' reference data, and tasks, only when entries
+    need them.
+    """
+    try:
+        default_wid: Optional[int] = get_workspace_id(None)
+    except ValueError:
+        default_wid = None
+    indexes: Dict[int, ReferenceIndex] = {}
+    if default_wid is not None:
+        entries, indexes[default_wid] = await asyncio.gather(
+            client.get_time_entries(start, end), load_references(client, default_wid)
+        )
+    else:
+        entries = await client.get_time_entries(start, end)
+    entries = entries or []
+    
+    missing = sorted({e["workspace_id"] for e in entries if e.get("workspace_id")} - set(indexes))
+    with_tasks = sorted({e["workspace_id"] for e in entries if e.get("task_id") and e.get("workspace_id")})
+    loaded, tasks = await asyncio.gather(
+        asyncio.gather(*(load_references(client, wid) for wid in missing)),
+        asyncio.gather(*(client.get_workspace_tasks(wid) for wid in with_tasks), return_exceptions=True)
+    )
+    indexes.update(zip(missing, loaded))
+    for wid, result in zip(with_tasks, tasks):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            logger.warning(f"Could not fetch tasks of workspace {wid}: {result}")
+            continue
+        indexes[wid].tasks = {task["id"]: task for task in result}
+    return hydrate_entries(entries, indexes)
+
+
+@toggl_tool(INTERACTIVE)
 async def toggl_get_current_timer() -> Dict[str, Any]:
     """Get the currently running time entry"""
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    result = await toggl_client.get_current_time_entry()
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    result = await client.get_current_time_entry()
     return result if result else {"message": "No timer currently running"}
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="time_entries.start_timer")
 async def toggl_start_timer(
     description: str,
     workspace_id: Optional[Union[int, str]] = None,
@@ -244,22 +532,9 @@ async def toggl_start_timer(
         created_with: Source of the time entry (default: "toggl-mcp")
         user_timezone: User's timezone (e.g., 'America/New_York'). If not provided, uses UTC.
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
-    if project_id is not None and isinstance(project_id, str):
-        project_id = int(project_id)
-    if task_id is not None and isinstance(task_id, str):
-        task_id = int(task_id)
-    
-    # Convert to bool if needed
-    if billable is not None:
-        original_billable = billable
-        billable = to_bool(billable)
-        logger.debug(f"toggl_start_timer: Converted billable from {original_billable!r} ({type(original_billable).__name__}) to {billable!r} ({type(billable).__name__})")
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
     kwargs = {
@@ -278,10 +553,77 @@ async def toggl_start_timer(
         kwargs["billable"] = billable
     if created_with is not None:
         kwargs["created_with"] = created_with
-    return await toggl_client.create_time_entry(wid, description, **kwargs)
+    return await client.create_time_entry(wid, description, **kwargs)
+
+
+# Days of entries fetched to find a combination to continue that is not known yet
+CONTINUE_LOOKBACK_DAYS = 14
+
+
+@toggl_tool(INTERACTIVE)
+async def toggl_continue_entry(
+    query: Optional[str] = None,
+    time_entry_id: Optional[Union[int, str]] = None,
+    user_timezone: Optional[str] = None
+) -> Dict[str, Any]:
+    """Start a timer continuing earlier work, with the same description, project, task, tags and billable flag
+    
+    Picks the most recently started entry whose description or tags contain
+    every word of query, or the given entry. Without either, continues the
+    most recent entry. Recent entries are remembered from earlier listings,
+    so this usually needs a single request to Toggl.
+    
+    Args:
+        query: Words from the description or tags of the work to continue (optional)
+        time_entry_id: Time entry to continue (optional, instead of query)
+        user_timezone: User's timezone (e.g., 'America/New_York'). If not provided, uses UTC.
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    
+    if time_entry_id is not None:
+        source = client.entry_index.entries.get(time_entry_id)
+        if source is None:
+            try:
+                source = await client.get_time_entry(time_entry_id)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return {"error": f"Time entry {time_entry_id} not found"}
+                raise
+        source = {**source, "last_entry_id": source.get("id")}
+    else:
+        matches = client.recent_entries.recent(query, limit=1)
+        if not matches:
+            now = datetime.now(timezone.utc)
+            start = now - timedelta(days=CONTINUE_LOOKBACK_DAYS)
+            if not client.entry_index.covers(start.timestamp(), now.timestamp() - client.cache_ttl, client.cache_ttl):
+                await client.get_time_entries(start.isoformat(), now.isoformat())
+                matches = client.recent_entries.recent(query, limit=1)
+        if not matches:
+            about = f" matching '{query}'" if query else ""
+            return {"error": f"No recent time entry{about} found in the last {CONTINUE_LOOKBACK_DAYS} days"}
+        source = matches[0]
+    
+    kwargs: Dict[str, Any] = {
+        "start": to_utc_string(None, user_timezone),
+        "duration": -1,  # Negative duration indicates running
+        "billable": bool(source.get("billable")),
+        "created_with": "toggl-mcp",
+    }
+    for field in ("project_id", "task_id"):
+        if source.get(field) is not None:
+            kwargs[field] = source[field]
+    if source.get("tags"):
+        kwargs["tags"] = list(source["tags"])
+    elif source.get("tag_ids"):
+        kwargs["tag_ids"] = list(source["tag_ids"])
+    wid = source.get("workspace_id") or get_workspace_id(None)
+    entry = await client.create_time_entry(wid, source.get("description") or "", **kwargs)
+    return {**entry, "continued_from": source.get("last_entry_id")}
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="time_entries.stop_timer")
 async def toggl_stop_timer(
     time_entry_id: Union[int, str],
     workspace_id: Optional[Union[int, str]] = None
@@ -292,20 +634,15 @@ async def toggl_stop_timer(
         time_entry_id: Time entry ID to stop
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if time_entry_id is not None and isinstance(time_entry_id, str):
-        time_entry_id = int(time_entry_id)
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.stop_time_entry(wid, time_entry_id)
+    return await client.stop_time_entry(wid, time_entry_id)
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="time_entries.create")
 async def toggl_create_time_entry(
     description: str,
     start: str,
@@ -340,24 +677,10 @@ async def toggl_create_time_entry(
     logger.info(f"Creating time entry: '{description}' from {start} to {stop}")
     logger.debug(f"Parameters: workspace_id={workspace_id}, project_id={project_id}, task_id={task_id}")
     
-    if not toggl_client:
+    client = get_client()
+    if not client:
         logger.error("Toggl client not initialized")
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string IDs to integers
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
-    if project_id is not None and isinstance(project_id, str):
-        project_id = int(project_id)
-    if task_id is not None and isinstance(task_id, str):
-        task_id = int(task_id)
-    
-    # Convert to bool if needed
-    if billable is not None:
-        original_billable = billable
-        billable = to_bool(billable)
-        logger.debug(f"toggl_create_time_entry: Converted billable from {original_billable!r} ({type(original_billable).__name__}) to {billable!r} ({type(billable).__name__})")
-    duronly = to_bool(duronly)
+        return client_not_initialized()
     
     try:
         wid = get_workspace_id(workspace_id)
@@ -373,8 +696,8 @@ async def toggl_create_time_entry(
     kwargs = {"start": start_utc, "stop": stop_utc}
     
     # Calculate duration
-    start_dt = parser.parse(start_utc)
-    stop_dt = parser.parse(stop_utc)
+    start_dt = datetime.fromisoformat(start_utc)
+    stop_dt = datetime.fromisoformat(stop_utc)
     kwargs["duration"] = int((stop_dt - start_dt).total_seconds())
     logger.debug(f"Calculated duration: {kwargs['duration']} seconds")
     
@@ -396,7 +719,7 @@ async def toggl_create_time_entry(
     logger.debug(f"Final kwargs for API call: {kwargs}")
     
     try:
-        result = await toggl_client.create_time_entry(wid, description, **kwargs)
+        result = await client.create_time_entry(wid, description, **kwargs)
         logger.info(f"Successfully created time entry with ID: {result.get('id', 'unknown')}")
         return result
     except Exception as e:
@@ -404,7 +727,7 @@ async def toggl_create_time_entry(
         return {"error": f"Failed to create time entry: {str(e)}"}
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="time_entries.update")
 async def toggl_update_time_entry(
     time_entry_id: Union[int, str],
     workspace_id: Optional[Union[int, str]] = None,
@@ -418,10 +741,18 @@ async def toggl_update_time_entry(
     stop: Optional[str] = None,
     duration: Optional[int] = None,
     duronly: Optional[Union[bool, str, int]] = None,
-    user_timezone: Optional[str] = None
+    user_timezone: Optional[str] = None,
+    force: Optional[Union[bool, str]] = False
 ) -> Dict[str, Any]:
     """Update an existing time entry
     
+    Only an immediate re-write is elided: fields this server itself wrote
+    to the entry in the last 10 seconds are not sent again, and if nothing
+    changes, nothing is sent. Values the entry had when it was listed or
+    fetched are always sent. An elided update returns "elided": true with
+    the fields this server last wrote, which after a bulk update are only
+    the fields that update set, not the full entry.
+    
     Args:
         time_entry_id: Time entry ID to update
         workspace_id: Workspace ID (uses default if not provided)
@@ -436,26 +767,11 @@ async def toggl_update_time_entry(
         duration: Duration in seconds (optional)
         duronly: Whether to save only duration, no start/stop times (accepts bool, string, or number)
         user_timezone: User's timezone (e.g., 'America/New_York'). If not provided, assumes times are in UTC.
+        force: Send every given field even if the entry already has it
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if time_entry_id is not None and isinstance(time_entry_id, str):
-        time_entry_id = int(time_entry_id)
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
-    if project_id is not None and isinstance(project_id, str):
-        project_id = int(project_id)
-    if task_id is not None and isinstance(task_id, str):
-        task_id = int(task_id)
-    
-    # Convert to bool if needed
-    if billable is not None:
-        original_billable = billable
-        billable = to_bool(billable)
-        logger.debug(f"toggl_update_time_entry: Converted billable from {original_billable!r} ({type(original_billable).__name__}) to {billable!r} ({type(billable).__name__})")
-    duronly = to_bool(duronly)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
     
@@ -488,7 +804,7 @@ async def toggl_update_time_entry(
     logger.info(f"Updating time entry {time_entry_id} with: {kwargs}")
     
     try:
-        result = await toggl_client.update_time_entry(wid, time_entry_id, **kwargs)
+        result = await client.update_time_entry(wid, time_entry_id, force=force, **kwargs)
         logger.info(f"Successfully updated time entry {time_entry_id}")
         return result
     except httpx.HTTPStatusError as e:
@@ -500,7 +816,7 @@ async def toggl_update_time_entry(
         return {"error": f"Failed to update time entry: {str(e)}"}
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE)
 async def toggl_delete_time_entry(
     time_entry_id: Union[int, str],
     workspace_id: Optional[Union[int, str]] = None
@@ -511,21 +827,16 @@ async def toggl_delete_time_entry(
         time_entry_id: Time entry ID to delete
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if time_entry_id is not None and isinstance(time_entry_id, str):
-        time_entry_id = int(time_entry_id)
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
     
     logger.info(f"Deleting time entry {time_entry_id}")
     
     try:
-        result = await toggl_client.delete_time_entry(wid, time_entry_id)
+        result = await client.delete_time_entry(wid, time_entry_id)
         logger.info(f"Successfully deleted time entry {time_entry_id}")
         return {"success": True, "message": f"Time entry {time_entry_id} deleted successfully"}
     except Exception as e:
@@ -533,7 +844,7 @@ async def toggl_delete_time_entry(
         return {"error": f"Failed to delete time entry: {str(e)}"}
 
 
-@mcp.tool()
+@toggl_tool(BULK, endpoint="time_entries.update")
 async def toggl_bulk_update_time_entries(
     time_entry_ids: List[Union[int, str]],
     workspace_id: Optional[Union[int, str]] = None,
@@ -543,10 +854,18 @@ async def toggl_bulk_update_time_entries(
     tags: Optional[List[str]] = None,
     tag_ids: Optional[List[int]] = None,
     billable: Optional[Union[bool, str, int]] = None,
-    tag_action: Optional[str] = None
+    tag_action: Optional[str] = None,
+    force: Optional[Union[bool, str]] = False
 ) -> Dict[str, Any]:
     """Update multiple time entries at once
     
+    Only immediate re-writes are elided: entries this server itself wrote
+    as requested in the last 10 seconds are not sent and are listed under
+    "elided" instead of "success", and the others are sent only the fields
+    this server did not just write to them, in as few bulk requests as
+    possible. Values entries had when they were listed or fetched are
+    always sent.
+    
     Args:
         time_entry_ids: List of time entry IDs to update
         workspace_id: Workspace ID (uses default if not provided)
@@ -557,34 +876,15 @@ async def toggl_bulk_update_time_entries(
         tag_ids: List of tag IDs (optional)
         billable: Whether the time entries are billable (optional)
         tag_action: How to handle tags - "add" or "replace" (optional)
+        force: Send every given field to every entry
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     if not time_entry_ids:
         return {"error": "No time entry IDs provided"}
     
-    # Convert string to int if needed
-    converted_ids = []
-    for entry_id in time_entry_ids:
-        if isinstance(entry_id, str):
-            converted_ids.append(int(entry_id))
-        else:
-            converted_ids.append(entry_id)
-    
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
-    if project_id is not None and isinstance(project_id, str):
-        project_id = int(project_id)
-    if task_id is not None and isinstance(task_id, str):
-        task_id = int(task_id)
-    
-    # Convert to bool if needed
-    if billable is not None:
-        original_billable = billable
-        billable = to_bool(billable)
-        logger.debug(f"toggl_bulk_update_time_entries: Converted billable from {original_billable!r} ({type(original_billable).__name__}) to {billable!r} ({type(billable).__name__})")
-    
     wid = get_workspace_id(workspace_id)
     
     # Build update data
@@ -607,11 +907,11 @@ async def toggl_bulk_update_time_entries(
     if not updates:
         return {"error": "No fields to update provided"}
     
-    logger.info(f"Bulk updating {len(converted_ids)} time entries with: {updates}")
+    logger.info(f"Bulk updating {len(time_entry_ids)} time entries with: {updates}")
     
     try:
-        result = await toggl_client.bulk_update_time_entries(wid, converted_ids, updates)
-        logger.info(f"Successfully bulk updated {len(converted_ids)} time entries")
+        result = await client.bulk_update_time_entries(wid, time_entry_ids, updates, force=force)
+        logger.info(f"Successfully bulk updated {len(time_entry_ids)} time entries")
         return result
     except httpx.HTTPStatusError as e:
         error_detail = e.response.text if e.response else str(e)
@@ -622,67 +922,197 @@ async def toggl_bulk_update_time_entries(
         return {"error": f"Failed to bulk update time entries: {str(e)}"}
 
 
-@mcp.tool()
+@toggl_tool(BULK)
 async def toggl_bulk_delete_time_entries(
     time_entry_ids: List[Union[int, str]],
     workspace_id: Optional[Union[int, str]] = None
 ) -> Dict[str, Any]:
     """Delete multiple time entries at once
     
+    If some entries could not be deleted, "success" is false and their IDs
+    are listed under "failed_time_entry_ids"; the others were deleted.
+    
     Args:
         time_entry_ids: List of time entry IDs to delete
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     if not time_entry_ids:
         return {"error": "No time entry IDs provided"}
     
-    # Convert string to int if needed
-    converted_ids = []
-    for entry_id in time_entry_ids:
-        if isinstance(entry_id, str):
-            converted_ids.append(int(entry_id))
-        else:
-            converted_ids.append(entry_id)
-    
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
-    
     wid = get_workspace_id(workspace_id)
     
-    logger.info(f"Bulk deleting {len(converted_ids)} time entries")
+    logger.info(f"Bulk deleting {len(time_entry_ids)} time entries")
     
     try:
-        result = await toggl_client.bulk_delete_time_entries(wid, converted_ids)
-        logger.info(f"Successfully bulk deleted {len(converted_ids)} time entries")
-        return {"success": True, "message": f"Successfully deleted {len(converted_ids)} time entries", "details": result}
+        result = await client.bulk_delete_time_entries(wid, time_entry_ids)
+        failed = (result.get("failure") or []) if isinstance(result, dict) else []
+        if failed:
+            deleted = len(time_entry_ids) - len(failed)
+            logger.warning(f"Bulk deleted {deleted} of {len(time_entry_ids)} time entries, {len(failed)} failed")
+            return {
+                "success": False,
+                "message": f"Deleted {deleted} of {len(time_entry_ids)} time entries; {len(failed)} were not deleted",
+                "failed_time_entry_ids": failed,
+                "details": result,
+            }
+        logger.info(f"Successfully bulk deleted {len(time_entry_ids)} time entries")
+        return {"success": True, "message": f"Successfully deleted {len(time_entry_ids)} time entries", "details": result}
     except Exception as e:
         logger.error(f"Failed to bulk delete time entries: {e}")
         return {"error": f"Failed to bulk delete time entries: {str(e)}"}
 
 
+@toggl_tool(READ)
+async def toggl_search_time_entries(
+    query: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[Union[int, str]] = 20
+) -> Dict[str, Any]:
+    """Search time entries by words of their description, tags or project name, most recent first
+    
+    Each word matches words starting with it, and every word must match, e.g.
+    "invoice migr" finds "Invoice migration". Entries are searched in a local
+    index, so a range fetched recently is searched without calling Toggl again.
+    
+    Args:
+        query: Words to search for
+        start_date: Start date (ISO 8601 format, defaults to 90 days ago)
+        end_date: End date (ISO 8601 format, defaults to now)
+        limit: Most entries returned (default 20)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    
+    limit = 20 if limit is None else limit
+    if limit < 0:
+        return {"error": "Invalid limit: must not be negative"}
+    now = datetime.now(timezone.utc)
+    end = end_date or now.isoformat()
+    start = start_date or (now - timedelta(days=90)).isoformat()
+    try:
+        start_ts, end_ts = to_timestamp(start), to_timestamp(end)
+    except ValueError as e:
+        return {"error": f"Invalid date: {e}"}
+    
+    index = client.entry_index
+    # Entries started since the last fetch without going through this server
+    # are as stale as the reference cache allows
+    covered_end = end_ts if end_date else now.timestamp() - client.cache_ttl
+    fetched = not index.covers(start_ts, covered_end, client.cache_ttl)
+    if fetched:
+        await client.get_time_entries(start, end)
+    
+    project_names: Dict[int, str] = {}
+    projects = await asyncio.gather(
+        *(client.get_projects(wid) for wid in sorted(index.workspace_ids)), return_exceptions=True
+    )
+    for result in projects:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+        if isinstance(result, list):
+            project_names.update((p["id"], p.get("name") or "") for p in result)
+    
+    entries, total = index.search(query, start_ts, end_ts, project_names, limit)
+    return {
+        "total": total,
+        "entries": [{**entry, "project_name": project_names.get(entry.get("project_id"))} for entry in entries],
+        "fetched": fetched,
+        "indexed": len(index),
+    }
+
+
+@toggl_tool(READ)
+async def toggl_check_timesheet(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    user_timezone: Optional[str] = None,
+    work_start: Optional[str] = "09:00",
+    work_end: Optional[str] = "17:00",
+    working_days: Optional[List[str]] = None,
+    min_gap_minutes: Optional[Union[int, str]] = 15,
+    limit: Optional[Union[int, str]] = 50
+) -> Dict[str, Any]:
+    """Audit a timesheet for overlapping entries, untracked gaps in working hours and entries crossing midnight
+    
+    Args:
+        start_date: Start date (ISO 8601 format, defaults to 7 days ago)
+        end_date: End date (ISO 8601 format, defaults to now)
+        user_timezone: User's timezone (e.g., 'America/New_York') for working
+                       hours, midnight and dates without an offset. If not provided, uses UTC.
+        work_start: Start of the working day, "HH:MM" (default "09:00")
+        work_end: End of the working day, "HH:MM" (default "17:00")
+        working_days: Weekdays checked for gaps, e.g. ["mon", "tue"] (default Monday to Friday)
+        min_gap_minutes: Shortest untracked stretch reported as a gap (default 15)
+        limit: Most overlaps, gaps and midnight crossings listed; counts cover all of them (default 50)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    
+    min_gap_minutes = 15 if min_gap_minutes is None else min_gap_minutes
+    limit = 50 if limit is None else limit
+    if min_gap_minutes < 0 or limit < 0:
+        return {"error": "Invalid timesheet parameters: min_gap_minutes and limit must not be negative"}
+    try:
+        tz = ZoneInfo(user_timezone) if user_timezone else timezone.utc
+        hours = WorkingHours.parse(work_start or "09:00", work_end or "17:00", working_days)
+        now = datetime.now(timezone.utc)
+        end = datetime.fromisoformat(end_date) if end_date else now
+        start = datetime.fromisoformat(start_date) if start_date else now - timedelta(days=7)
+    except (ValueError, ZoneInfoNotFoundError) as e:
+        return {"error": f"Invalid timesheet parameters: {e}"}
+    # Dates without an offset are in the user's timezone
+    start, end = (dt if dt.tzinfo else dt.replace(tzinfo=tz) for dt in (start, end))
+    
+    # Entries are streamed and reduced to intervals as they arrive, so long
+    # ranges never hold the response body or the parsed entries at once
+    spans = []
+    
+    def collect(entry: Dict[str, Any]):
+        span = interval(entry, now.timestamp())
+        if span is not None:
+            spans.append(span)
+    
+    await client.stream_time_entries(
+        collect, start.astimezone(timezone.utc).isoformat(), end.astimezone(timezone.utc).isoformat()
+    )
+    spans.sort()
+    return check_intervals(
+        spans, start, end, tz, hours, min_gap=min_gap_minutes * 60, limit=limit, now=now.timestamp()
+    )
+
+
 # Tag Tools
-@mcp.tool()
-async def toggl_list_tags(workspace_id: Optional[Union[int, str]] = None) -> List[Dict[str, Any]]:
-    """List all tags in a workspace
+@toggl_tool(READ)
+async def toggl_list_tags(
+    workspace_id: Optional[Union[int, str]] = None,
+    all_workspaces: Optional[Union[bool, str]] = False
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """List all tags in a workspace, or in all of the user's workspaces
     
     Args:
         workspace_id: Workspace ID (uses default if not provided)
+        all_workspaces: List tags of every workspace at once, tagged with
+                        workspace_id and workspace_name. Returns
+                        {"tags": [...], "workspaces": count, "errors": [...]}.
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    if all_workspaces:
+        return await list_across_workspaces(client, "tags", client.get_tags)
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.get_tags(wid)
+    return await client.get_tags(wid)
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="tags.create")
 async def toggl_create_tag(
     name: str,
     workspace_id: Optional[Union[int, str]] = None
@@ -693,37 +1123,39 @@ async def toggl_create_tag(
         name: Tag name
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.create_tag(wid, name)
+    return await client.create_tag(wid, name)
 
 
 # Client Tools
-@mcp.tool()
-async def toggl_list_clients(workspace_id: Optional[Union[int, str]] = None) -> List[Dict[str, Any]]:
-    """List all clients in a workspace
+@toggl_tool(READ)
+async def toggl_list_clients(
+    workspace_id: Optional[Union[int, str]] = None,
+    all_workspaces: Optional[Union[bool, str]] = False
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """List all clients in a workspace, or in all of the user's workspaces
     
     Args:
         workspace_id: Workspace ID (uses default if not provided)
+        all_workspaces: List clients of every workspace at once, tagged with
+                        workspace_id and workspace_name. Returns
+                        {"clients": [...], "workspaces": count, "errors": [...]}.
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    if all_workspaces:
+        return await list_across_workspaces(client, "clients", client.get_clients)
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.get_clients(wid)
+    return await client.get_clients(wid)
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="clients.create")
 async def toggl_create_client(
     name: str,
     workspace_id: Optional[Union[int, str]] = None
@@ -734,19 +1166,16 @@ async def toggl_create_client(
         name: Client name
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.create_client(wid, name)
+    return await client.create_client(wid, name)
 
 
 # Project Task Tools
-@mcp.tool()
+@toggl_tool(READ)
 async def toggl_list_project_tasks(
     project_id: Union[int, str],
     workspace_id: Optional[Union[int, str]] = None
@@ -757,20 +1186,15 @@ async def toggl_list_project_tasks(
         project_id: Project ID
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
-    
-    # Convert string to int if needed
-    if project_id is not None and isinstance(project_id, str):
-        project_id = int(project_id)
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.get_project_tasks(wid, project_id)
+    return await client.get_project_tasks(wid, project_id)
 
 
-@mcp.tool()
+@toggl_tool(INTERACTIVE, endpoint="tasks.create")
 async def toggl_create_project_task(
     project_id: Union[int, str],
     name: str,
@@ -783,38 +1207,417 @@ async def toggl_create_project_task(
         name: Task name
         workspace_id: Workspace ID (uses default if not provided)
     """
-    if not toggl_client:
-        return {"error": "Toggl client not initialized. Please set TOGGL_API_TOKEN environment variable."}
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
-    # Convert string to int if needed
-    if project_id is not None and isinstance(project_id, str):
-        project_id = int(project_id)
-    if workspace_id is not None and isinstance(workspace_id, str):
-        workspace_id = int(workspace_id)
+    wid = get_workspace_id(workspace_id)
+    return await client.create_project_task(wid, project_id, name)
+
+
+@toggl_tool(READ)
+async def toggl_list_workspace_tasks(
+    workspace_id: Optional[Union[int, str]] = None,
+    project_id: Optional[Union[int, str]] = None
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """List the tasks of every project in a workspace in one call
+    
+    Each task includes its project's name. Use this rather than calling
+    toggl_list_project_tasks for each project.
+    
+    Args:
+        workspace_id: Workspace ID (uses default if not provided)
+        project_id: Only list this project's tasks (optional)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
     
     wid = get_workspace_id(workspace_id)
-    return await toggl_client.create_project_task(wid, project_id, name)
+    tasks, projects = await asyncio.gather(client.get_workspace_tasks(wid), client.get_projects(wid))
+    names = {p["id"]: p.get("name") for p in projects or []}
+    return [
+        {**task, "project_name": names.get(task.get("project_id"))}
+        for task in tasks
+        if project_id is None or task.get("project_id") == project_id
+    ]
+
+
+# Get-or-create Tools
+
+# Most names resolved by one ensure call
+MAX_ENSURE_NAMES = 100
 
 
-async def setup_and_run():
-    """Setup and run the server"""
-    global toggl_client, default_workspace_id
+async def ensure_named(kind: str, names: List[str], workspace_id: int, ensure) -> Dict[str, Any]:
+    """Run a TogglClient.ensure_* call and summarize its results"""
+    if not names:
+        return {"error": "names must not be empty"}
+    if len(names) > MAX_ENSURE_NAMES:
+        return {"error": f"At most {MAX_ENSURE_NAMES} names per call, got {len(names)}"}
+    
+    results = await ensure(workspace_id, names)
+    created = sum(1 for result in results if result.get("created"))
+    logger.info(f"Ensured {len(results)} {kind} in workspace {workspace_id}, created {created}")
+    return {
+        "workspace_id": workspace_id,
+        kind: results,
+        "created": created,
+        "failed": sum(1 for result in results if "error" in result),
+    }
+
+
+@toggl_tool(INTERACTIVE, endpoint="tags.create")
+async def toggl_ensure_tags(
+    names: List[str],
+    workspace_id: Optional[Union[int, str]] = None
+) -> Dict[str, Any]:
+    """Get the IDs of tags by name, creating the ones that do not exist
     
-    logger.info("Starting Toggl MCP server...")
+    Use this instead of listing tags and then creating missing ones. Names
+    match existing tags ignoring case, and concurrent calls never create
+    the same tag twice. Returns {"tags": [{"name", "id", "created"}, ...]}
+    in the order given; names that could not be created have an "error".
     
-    # Get API token from environment
-    api_token = os.getenv("TOGGL_API_TOKEN")
-    if not api_token:
-        logger.error("TOGGL_API_TOKEN environment variable not set")
-        print("Error: TOGGL_API_TOKEN environment variable not set", file=sys.stderr)
-        print("Please set your Toggl API token:", file=sys.stderr)
-        print("  export TOGGL_API_TOKEN=your_api_token_here", file=sys.stderr)
-        sys.exit(1)
+    Args:
+        names: Tag names (at most 100)
+        workspace_id: Workspace ID (uses default if not provided)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    return await ensure_named("tags", names, get_workspace_id(workspace_id), client.ensure_tags)
+
+
+@toggl_tool(INTERACTIVE, endpoint="clients.create")
+async def toggl_ensure_clients(
+    names: List[str],
+    workspace_id: Optional[Union[int, str]] = None
+) -> Dict[str, Any]:
+    """Get the IDs of clients by name, creating the ones that do not exist
     
-    logger.info("API token found, initializing Toggl client")
+    Works like toggl_ensure_tags; returns {"clients": [...]}.
     
-    # Initialize Toggl client
-    toggl_client = TogglClient(api_token)
+    Args:
+        names: Client names (at most 100)
+        workspace_id: Workspace ID (uses default if not provided)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    return await ensure_named("clients", names, get_workspace_id(workspace_id), client.ensure_clients)
+
+
+@toggl_tool(INTERACTIVE, endpoint="projects.create")
+async def toggl_ensure_projects(
+    names: List[str],
+    workspace_id: Optional[Union[int, str]] = None,
+    client_id: Optional[Union[int, str]] = None,
+    color: Optional[str] = None,
+    is_private: Optional[Union[bool, str, int]] = None
+) -> Dict[str, Any]:
+    """Get the IDs of projects by name, creating the ones that do not exist
+    
+    Works like toggl_ensure_tags; returns {"projects": [...]}. Existing
+    projects are returned as they are, whatever their client or settings.
+    
+    Args:
+        names: Project names (at most 100)
+        workspace_id: Workspace ID (uses default if not provided)
+        client_id: Client of created projects (optional)
+        color: Color of created projects in hex format (optional)
+        is_private: Whether created projects are private (optional)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    
+    kwargs = {}
+    if client_id is not None:
+        kwargs["client_id"] = client_id
+    if color is not None:
+        kwargs["color"] = color
+    if is_private is not None:
+        kwargs["is_private"] = is_private
+    
+    async def ensure(wid: int, project_names: List[str]) -> List[Dict[str, Any]]:
+        return await client.ensure_projects(wid, project_names, **kwargs)
+    
+    return await ensure_named("projects", names, get_workspace_id(workspace_id), ensure)
+
+
+@toggl_tool(INTERACTIVE, endpoint="tasks.create")
+async def toggl_ensure_project_tasks(
+    project_id: Union[int, str],
+    names: List[str],
+    workspace_id: Optional[Union[int, str]] = None
+) -> Dict[str, Any]:
+    """Get the IDs of a project's tasks by name, creating the ones that do not exist
+    
+    Works like toggl_ensure_tags; returns {"tasks": [...]}. The project
+    must have tasks enabled for tasks to be created.
+    
+    Args:
+        project_id: Project ID
+        names: Task names (at most 100)
+        workspace_id: Workspace ID (uses default if not provided)
+    """
+    client = get_client()
+    if not client:
+        return client_not_initialized()
+    
+    async def ensure(wid: int, task_names: List[str]) -> List[Dict[str, Any]]:
+        return await client.ensure_project_tasks(wid, project_id, task_names)
+    
+    return await ensure_named("tasks", names, get_workspace_id(workspace_id), ensure)
+
+
+# Server Tools
+@toggl_tool(READ)
+async def toggl_server_stats() -> Dict[str, Any]:
+    """Get server performance statistics
+    
+    Returns per-endpoint Toggl API latency percentiles, status counts, bytes
+    sent and received and retries, per-tool handler latency, reference cache
+    hit rates, and the current concurrency limit and admission queues. In
+    multi-tenant mode only the calling tenant's own client is reported
+    (concurrency, user directory and elided updates); the process-wide
+    metrics cover every tenant and are left to the /metrics endpoint.
+    """
+    client = get_client()
+    if client_registry is not None and client is None:
+        return client_not_initialized()
+    stats = metrics.snapshot() if client_registry is None else {}
+    if isinstance(client, TogglClient):
+        stats["concurrency"] = client.limiter_stats()
+        stats["user_directory"] = client.directory.stats()
+        stats["elided_updates"] = dict(client.elided)
+    return stats
+
+
+@toggl_tool(READ)
+async def toggl_usage_stats(limit: Optional[Union[int, str]] = 10) -> Dict[str, Any]:
+    """Get the heaviest consumers of Toggl API requests
+    
+    Reports upstream requests, bytes and quota units by tool (with the average
+    fan-out per call), the individual tool calls that made the most requests,
+    and usage per session. In multi-tenant mode every list only covers the
+    calling session.
+    
+    Args:
+        limit: Maximum entries per list (default 10)
+    """
+    limit = 10 if limit is None else limit
+    if limit < 0:
+        return {"error": "Invalid limit: must not be negative"}
+    session = session_key() if client_registry is not None else None
+    return ledger.stats(limit, session=session)
+
+
+# Largest batch, and how many of its operations run at once
+MAX_BATCH_OPERATIONS = 50
+BATCH_CONCURRENCY = 8
+
+
+@toggl_tool(INTERACTIVE)
+async def toggl_batch(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Run several tool calls in one request
+    
+    Each operation is {"tool": "<tool name>", "arguments": {...}} with an
+    optional "id". An argument can use an earlier operation's result via
+    {"$ref": "<id>.<field>"}, e.g. start a timer with the tag and project
+    created by earlier operations:
+    
+        [{"id": "tag", "tool": "toggl_create_tag", "arguments": {"name": "urgent"}},
+         {"id": "project", "tool": "toggl_create_project", "arguments": {"name": "Launch"}},
+         {"tool": "toggl_start_timer", "arguments": {"description": "Kickoff",
+          "project_id": {"$ref": "project.id"}, "tags": [{"$ref": "tag.name"}]}}]
+    
+    Operations without IDs are referenced by position ("0", "1", ...).
+    Independent operations run concurrently; an operation waits for those it
+    references and is skipped if one of them failed.
+    
+    Args:
+        operations: Operations to run (at most 50)
+    """
+    try:
+        parsed = parse_operations(operations, set(TOOLS) - {"toggl_batch"}, MAX_BATCH_OPERATIONS)
+    except BatchError as e:
+        return {"error": str(e)}
+    
+    async def call(tool: str, arguments: Dict[str, Any]) -> Any:
+        return await TOOLS[tool](**arguments)
+    
+    results = await run_batch(parsed, call, BATCH_CONCURRENCY)
+    statuses = [entry["status"] for entry in results]
+    return {
+        "results": results,
+        "succeeded": statuses.count("ok"),
+        "failed": statuses.count("error"),
+        "skipped": statuses.count("skipped"),
+    }
+
+
+@toggl_tool(READ)
+async def toggl_profile_tool(
+    tool_name: Optional[str] = None,
+    calls: Optional[Union[int, str]] = 1,
+    mode: str = "cprofile"
+) -> Dict[str, Any]:
+    """Profile the next calls of a tool, or show profiling status
+    
+    Profiles are written on the server (TOGGL_MCP_PROFILE_DIR): cProfile
+    .pstats files, collapsed stacks from a stack sampler for flame graphs, or
+    tracemalloc reports of allocation hotspots. Returns the armed tools and
+    the most recently written profiles.
+    
+    Args:
+        tool_name: Tool to profile, e.g. "toggl_list_time_entries" (omit to
+                   only report status)
+        calls: Number of upcoming calls to profile (0 disarms, default 1)
+        mode: "cprofile" (default), "sample" or "tracemalloc"
+    """
+    if client_registry is not None:
+        return {"error": "Profiling is not available to sessions in multi-tenant mode; "
+                         "use TOGGL_MCP_PROFILE on the server instead"}
+    if tool_name is not None:
+        if tool_name not in TOOLS:
+            return {"error": f"Unknown tool '{tool_name}'"}
+        from .profiling import PROFILE_MODES
+        if mode not in PROFILE_MODES:
+            return {"error": f"Unknown profile mode '{mode}', expected one of: {', '.join(PROFILE_MODES)}"}
+        _profiler().arm(tool_name, 1 if calls is None else calls, mode)
+    return _profiler().status()
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint, served alongside the HTTP transports"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+WILDCARD_HOSTS = ("0.0.0.0", "::", "")
+
+
+def _env_list(name: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def transport_security(host: str) -> TransportSecuritySettings:
+    """DNS rebinding protection for HTTP transports bound to host
+    
+    Host and Origin headers may name a loopback address or the bind address,
+    on any port, or be listed in TOGGL_MCP_ALLOWED_HOSTS and
+    TOGGL_MCP_ALLOWED_ORIGINS (comma-separated; "name:*" allows any port).
+    Behind a wildcard bind address (0.0.0.0, ::) or a proxy, list the names
+    clients use to reach the server there.
+    """
+    names = ["127.0.0.1", "localhost", "[::1]"]
+    if host not in LOOPBACK_HOSTS and host not in WILDCARD_HOSTS:
+        names.append(f"[{host}]" if ":" in host else host)
+    allowed_hosts = [host_name for name in names for host_name in (name, f"{name}:*")]
+    allowed_origins = [
+        origin for name in names for scheme in ("http", "https")
+        for origin in (f"{scheme}://{name}", f"{scheme}://{name}:*")
+    ]
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=allowed_hosts + _env_list("TOGGL_MCP_ALLOWED_HOSTS"),
+        allowed_origins=allowed_origins + _env_list("TOGGL_MCP_ALLOWED_ORIGINS"),
+    )
+
+
+async def setup_and_run(
+    transport: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    multi_tenant: Optional[bool] = None,
+    metrics_port: Optional[int] = None
+):
+    """Setup and run the server
+    
+    Args:
+        transport: "stdio" (default), "sse" or "streamable-http". Falls back to
+                   the TOGGL_MCP_TRANSPORT environment variable.
+        host: Bind address for HTTP transports (TOGGL_MCP_HOST, default 127.0.0.1)
+        port: Port for HTTP transports (TOGGL_MCP_PORT, default 8000)
+        multi_tenant: Serve each session with its own API token instead of
+                      TOGGL_API_TOKEN (TOGGL_MCP_MULTI_TENANT)
+        metrics_port: Also serve Prometheus metrics on this port, for any
+                      transport (TOGGL_MCP_METRICS_PORT). HTTP transports
+                      always serve them at /metrics.
+    
+    Tracing is enabled by TOGGL_MCP_TRACE_FILE (spans appended as JSON Lines)
+    or TOGGL_MCP_OTLP_ENDPOINT (spans sent to an OTLP/HTTP collector).
+    TOGGL_MCP_PROFILE ("tool:calls:mode,...") profiles the first calls of
+    tools, writing to TOGGL_MCP_PROFILE_DIR.
+    """
+    global toggl_client, default_workspace_id, client_registry
+    
+    logger.info("Starting Toggl MCP server...")
+    
+    if multi_tenant is None:
+        multi_tenant_env = os.getenv("TOGGL_MCP_MULTI_TENANT")
+        multi_tenant = parse_bool(multi_tenant_env) if multi_tenant_env else False
+    
+    # Alternative API root, e.g. a local stub for offline load testing
+    base_url = os.getenv("TOGGL_API_BASE_URL")
+    if base_url:
+        logger.info(f"Using Toggl API at {base_url}")
+    
+    # Record upstream traffic to a cassette, or serve it from one offline
+    upstream = None
+    record_path = os.getenv("TOGGL_MCP_RECORD")
+    replay_path = os.getenv("TOGGL_MCP_REPLAY")
+    if replay_path:
+        from .cassette import ReplayTransport
+        upstream = ReplayTransport(replay_path, time_scale=float(os.getenv("TOGGL_MCP_REPLAY_TIME_SCALE", "1.0")))
+        logger.info(f"Replaying Toggl API responses from {replay_path}")
+    elif record_path:
+        from .cassette import RecordingTransport
+        upstream = RecordingTransport(record_path)
+        logger.info(f"Recording Toggl API traffic to {record_path}")
+    
+    # Inject upstream faults for resilience testing
+    faults = os.getenv("TOGGL_MCP_FAULTS")
+    if faults:
+        from .faults import FaultInjectionTransport, load_rules
+        rules = load_rules(faults)
+        seed = os.getenv("TOGGL_MCP_FAULTS_SEED")
+        upstream = FaultInjectionTransport(
+            upstream or httpx.AsyncHTTPTransport(), rules, seed=int(seed) if seed else None
+        )
+        logger.warning(f"Injecting Toggl API faults ({len(rules)} rules)")
+    http_client = httpx.AsyncClient(transport=upstream) if upstream else None
+    # The single-token client, closed on shutdown like the registry's clients
+    single_client: Optional[TogglClient] = None
+    
+    if multi_tenant:
+        rate_limit = os.getenv("TOGGL_MCP_TENANT_RATE_LIMIT")
+        client_registry = ClientRegistry(
+            max_clients=int(os.getenv("TOGGL_MCP_MAX_TENANTS", "1000")),
+            idle_timeout=float(os.getenv("TOGGL_MCP_TENANT_IDLE_TIMEOUT", "900")),
+            http_client=http_client,
+            rate_limit=float(rate_limit) if rate_limit else None,
+            base_url=base_url
+        )
+        logger.info("Multi-tenant mode: sessions must provide their own Toggl API token")
+    else:
+        # Get API token from environment
+        api_token = os.getenv("TOGGL_API_TOKEN")
+        if not api_token:
+            logger.error("TOGGL_API_TOKEN environment variable not set")
+            print("Error: TOGGL_API_TOKEN environment variable not set", file=sys.stderr)
+            print("Please set your Toggl API token:", file=sys.stderr)
+            print("  export TOGGL_API_TOKEN=your_api_token_here", file=sys.stderr)
+            sys.exit(1)
+        
+        logger.info("API token found, initializing Toggl client")
+        
+        # Initialize Toggl client
+        toggl_client = single_client = TogglClient(api_token, http_client=http_client, base_url=base_url)
     
     # Get default workspace if specified
     workspace_id_str = os.getenv("TOGGL_WORKSPACE_ID")
@@ -828,16 +1631,104 @@ async def setup_and_run():
     else:
         logger.info("No default workspace ID set")
     
-    # Run the server
-    logger.info("Starting MCP server on stdio transport")
-    await mcp.run_stdio_async()
+    transport = transport or os.getenv("TOGGL_MCP_TRANSPORT", "stdio")
+    if transport not in TRANSPORTS:
+        logger.error(f"Unknown transport '{transport}'")
+        print(f"Error: Unknown transport '{transport}', expected one of: {', '.join(TRANSPORTS)}", file=sys.stderr)
+        sys.exit(1)
+    
+    trace_file = os.getenv("TOGGL_MCP_TRACE_FILE")
+    otlp_endpoint = os.getenv("TOGGL_MCP_OTLP_ENDPOINT")
+    if trace_file:
+        from .exporters import JsonlExporter
+        tracer.configure(JsonlExporter(trace_file))
+        logger.info(f"Writing trace spans to {trace_file}")
+    elif otlp_endpoint:
+        from .exporters import OtlpExporter
+        tracer.configure(OtlpExporter(otlp_endpoint))
+        logger.info(f"Sending trace spans to {otlp_endpoint}")
+    
+    profile_dir = os.getenv("TOGGL_MCP_PROFILE_DIR")
+    if profile_dir:
+        _profiler().directory = profile_dir
+    profile_spec = os.getenv("TOGGL_MCP_PROFILE")
+    if profile_spec:
+        try:
+            _profiler().configure(profile_spec)
+        except ValueError as e:
+            logger.error(f"Invalid TOGGL_MCP_PROFILE: {e}")
+            print(f"Error: Invalid TOGGL_MCP_PROFILE: {e}", file=sys.stderr)
+            sys.exit(1)
+        for tool_name in _profiler().status()["armed"]:
+            if tool_name not in TOOLS:
+                logger.warning(f"TOGGL_MCP_PROFILE names unknown tool '{tool_name}'")
+    
+    session_rate_warning = os.getenv("TOGGL_MCP_SESSION_RATE_WARNING")
+    if session_rate_warning:
+        # Upstream requests per minute a single session may send before a warning is logged
+        ledger.warn_rate = int(session_rate_warning)
+    
+    metrics_port = metrics_port or int(os.getenv("TOGGL_MCP_METRICS_PORT", "0"))
+    metrics_server = None
+    if metrics_port:
+        metrics_server = await serve_prometheus(os.getenv("TOGGL_MCP_METRICS_HOST", "127.0.0.1"), metrics_port)
+    
+    try:
+        if transport == "stdio":
+            # Run the server
+            logger.info("Starting MCP server on stdio transport")
+            await mcp.run_stdio_async()
+            return
+        
+        # HTTP transports serve many sessions from this one process, all sharing
+        # the Toggl client's connection pool and reference data cache
+        mcp.settings.host = host or os.getenv("TOGGL_MCP_HOST", mcp.settings.host)
+        mcp.settings.port = port or int(os.getenv("TOGGL_MCP_PORT", mcp.settings.port))
+        mcp.settings.transport_security = transport_security(mcp.settings.host)
+        
+        logger.info(f"Starting MCP server on {transport} transport at {mcp.settings.host}:{mcp.settings.port}")
+        if transport == "sse":
+            await mcp.run_sse_async()
+        else:
+            await mcp.run_streamable_http_async()
+    finally:
+        # Flush spans still buffered for export and complete the cassette
+        await tracer.close()
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        if client_registry is not None:
+            await client_registry.close()
+        if single_client is not None:
+            await single_client.close()
+        if http_client is not None:
+            await http_client.aclose()
 
 
 def run():
     """Entry point for the package"""
+    import argparse
     import asyncio
-    asyncio.run(setup_and_run())
+    
+    arg_parser = argparse.ArgumentParser(prog="toggl-mcp", description="MCP server for Toggl Track")
+    arg_parser.add_argument(
+        "--transport", choices=TRANSPORTS,
+        help="Transport to serve MCP on (default: $TOGGL_MCP_TRANSPORT or stdio)"
+    )
+    arg_parser.add_argument("--host", help="Bind address for HTTP transports (default: 127.0.0.1)")
+    arg_parser.add_argument("--port", type=int, help="Port for HTTP transports (default: 8000)")
+    arg_parser.add_argument(
+        "--multi-tenant", action="store_true", default=None,
+        help="Require each session to supply its own Toggl API token"
+    )
+    arg_parser.add_argument(
+        "--metrics-port", type=int,
+        help="Serve Prometheus metrics on this port (HTTP transports also serve /metrics)"
+    )
+    args = arg_parser.parse_args()
+    
+    asyncio.run(setup_and_run(args.transport, args.host, args.port, args.multi_tenant, args.metrics_port))
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
@@ -0,0 +1,236 @@
+"""
+In-process metrics for Toggl API requests and MCP tool calls
+
+Recording is a handful of dict lookups and integer increments per event;
+summaries and the Prometheus text format are only built when someone asks
+for them (the toggl_server_stats tool or a scrape of /metrics).
+"""
+
+import asyncio
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_SEGMENT = re.compile(r"/(\d+(?:,\d+)*)(?=/|$)")
+
+
+@lru_cache(maxsize=2048)
+def endpoint_template(endpoint: str) -> str:
+    """Replace IDs in an API path with placeholders.
+
+    /workspaces/123/time_entries/456 -> /workspaces/{wid}/time_entries/{id}
+    and comma separated bulk IDs become {ids}.
+    """
+    def placeholder(match: re.Match) -> str:
+        if "," in match.group(1):
+            return "/{ids}"
+        if endpoint[:match.start()].endswith("/workspaces"):
+            return "/{wid}"
+        return "/{id}"
+    return _ID_SEGMENT.sub(placeholder, endpoint)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile (upper bound of the bucket it falls in), in seconds"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+        return float("inf")
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 1)
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+class Metrics:
+    """Counters and histograms for upstream requests and tool calls"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded metrics"""
+        self.started = time.time()
+        self.request_latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.request_status: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.bytes_out: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.bytes_in: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.retries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.cache: Dict[str, int] = defaultdict(int)
+        self.tool_latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.tool_errors: Dict[str, int] = defaultdict(int)
+
+    def observe_request(
+        self,
+        method: str,
+        endpoint: str,
+        status: Any,
+        seconds: float,
+        bytes_out: int = 0,
+        bytes_in: int = 0
+    ):
+        """Record one upstream request; status is the HTTP code or an error name"""
+        key = (method, endpoint_template(endpoint))
+        self.request_latency[key].observe(seconds)
+        self.request_status[key + (str(status),)] += 1
+        self.bytes_out[key] += bytes_out
+        self.bytes_in[key] += bytes_in
+
+    def count_retry(self, method: str, endpoint: str):
+        self.retries[(method, endpoint_template(endpoint))] += 1
+
+    def count_cache(self, hit: bool):
+        self.cache["hit" if hit else "miss"] += 1
+
+    def observe_tool(self, name: str, seconds: float, error: bool = False):
+        self.tool_latency[name].observe(seconds)
+        if error:
+            self.tool_errors[name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize everything recorded so far"""
+        endpoints: Dict[str, Dict[str, Any]] = {}
+        for (method, template), histogram in sorted(self.request_latency.items()):
+            key = (method, template)
+            endpoints[f"{method} {template}"] = {
+                **histogram.summary(),
+                "status": {
+                    status: count for (m, t, status), count in self.request_status.items()
+                    if (m, t) == key
+                },
+                "bytes_out": self.bytes_out[key],
+                "bytes_in": self.bytes_in[key],
+                "retries": self.retries.get(key, 0),
+            }
+        tools = {
+            name: {**histogram.summary(), "errors": self.tool_errors.get(name, 0)}
+            for name, histogram in sorted(self.tool_latency.items())
+        }
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "endpoints": endpoints,
+            "tools": tools,
+            "retries": sum(self.retries.values()),
+            "cache": {"hits": self.cache["hit"], "misses": self.cache["miss"]},
+        }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def histogram_lines(name: str, labels: str, histogram: Histogram):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        lines.append("# HELP toggl_request_duration_seconds Toggl API request latency")
+        lines.append("# TYPE toggl_request_duration_seconds histogram")
+        for (method, template), histogram in sorted(self.request_latency.items()):
+            histogram_lines("toggl_request_duration_seconds", f'method="{method}",endpoint="{template}"', histogram)
+
+        lines.append("# HELP toggl_requests_total Toggl API responses by status")
+        lines.append("# TYPE toggl_requests_total counter")
+        for (method, template, status), count in sorted(self.request_status.items()):
+            lines.append(f'toggl_requests_total{{method="{method}",endpoint="{template}",status="{status}"}} {count}')
+
+        for metric, values, help_text in (
+            ("toggl_request_bytes_total", self.bytes_out, "Bytes sent to the Toggl API"),
+            ("toggl_response_bytes_total", self.bytes_in, "Bytes received from the Toggl API"),
+            ("toggl_retries_total", self.retries, "Retried Toggl API requests"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (method, template), count in sorted(values.items()):
+                lines.append(f'{metric}{{method="{method}",endpoint="{template}"}} {count}')
+
+        lines.append("# HELP toggl_cache_requests_total Reference data cache lookups")
+        lines.append("# TYPE toggl_cache_requests_total counter")
+        for result in ("hit", "miss"):
+            lines.append(f'toggl_cache_requests_total{{result="{result}"}} {self.cache[result]}')
+
+        lines.append("# HELP toggl_tool_duration_seconds MCP tool handler latency")
+        lines.append("# TYPE toggl_tool_duration_seconds histogram")
+        for name, histogram in sorted(self.tool_latency.items()):
+            histogram_lines("toggl_tool_duration_seconds", f'tool="{name}"', histogram)
+
+        lines.append("# HELP toggl_tool_errors_total MCP tool calls that failed")
+        lines.append("# TYPE toggl_tool_errors_total counter")
+        for name, count in sorted(self.tool_errors.items()):
+            lines.append(f'toggl_tool_errors_total{{tool="{name}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide metrics shared by every client and tool
+metrics = Metrics()
+
+
+async def serve_prometheus(host: str, port: int) -> asyncio.AbstractServer:
+    """Serve /metrics in the Prometheus text format on a separate port.
+
+    Useful with the stdio transport, which has no HTTP server of its own.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.split()[1] if len(request_line.split()) > 1 else b""
+            if path == b"/metrics":
+                body = metrics.render_prometheus().encode()
+                status = b"200 OK"
+            else:
+                body, status = b"Not Found\n", b"404 Not Found"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving Prometheus metrics on http://{host}:{port}/metrics")
+    return server
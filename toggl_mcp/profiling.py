@@ -0,0 +1,251 @@
+"""
+On-demand profiling of tool handlers
+
+A tool can be armed for its next N calls with one of three profilers:
+
+- "cprofile": deterministic cProfile, written as a .pstats file
+- "sample": a thread sampling the event loop's stack every few milliseconds,
+  written as collapsed stacks (.collapsed) for flame graph tools
+- "tracemalloc": allocations made during the call, written as a .txt report
+  of the top allocation sites plus a .tracemalloc snapshot
+
+Arm through TOGGL_MCP_PROFILE ("tool:calls:mode,...") at startup or the
+toggl_profile_tool tool at runtime. Profiles go to TOGGL_MCP_PROFILE_DIR.
+cProfile and the sampler observe the whole event loop thread, so calls
+running concurrently with the armed one show up in its profile too. Only
+one profile of each kind runs at a time; armed calls arriving meanwhile run
+unprofiled without using up the armed count.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample", "tracemalloc")
+TRACEMALLOC_TOP = 50  # Allocation sites listed in tracemalloc reports
+
+
+@dataclass
+class _Arming:
+    mode: str
+    remaining: int
+    interval: float
+
+
+class _Sampler:
+    """Sample one thread's Python stack on a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="toggl-mcp-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class _ProfileSession:
+    """Profile one tool call, used as a context manager"""
+
+    def __init__(self, profiler: "Profiler", tool: str, mode: str, interval: float, call_id: Optional[str]):
+        self.profiler = profiler
+        self.tool = tool
+        self.mode = mode
+        self.interval = interval
+        self.call_id = call_id
+        self._state: Any = None
+        self._started_tracing = False
+
+    def __enter__(self) -> "_ProfileSession":
+        # cProfile and tracemalloc (which pulls in pickle) are imported on
+        # first use to keep them off the server start-up path
+        if self.mode == "cprofile":
+            import cProfile
+            self._state = cProfile.Profile()
+            try:
+                self._state.enable()
+            except ValueError as e:
+                # Another profiler (or a coverage tool) owns the hooks
+                logger.warning(f"Cannot profile {self.tool}: {e}")
+                self._state = None
+        elif self.mode == "sample":
+            self._state = _Sampler(threading.get_ident(), self.interval)
+            self._state.start()
+        else:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._state = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        if self._state is None:
+            self.profiler.release(self.mode)
+            return False
+        try:
+            base = self.profiler.output_path(self.tool, self.call_id)
+            if self.mode == "cprofile":
+                self._state.disable()
+                path = base + ".pstats"
+                self._state.dump_stats(path)
+            elif self.mode == "sample":
+                self._state.stop()
+                path = base + ".collapsed"
+                with open(path, "w") as f:
+                    f.write(self._state.collapsed())
+            else:
+                import tracemalloc
+                snapshot = tracemalloc.take_snapshot()
+                if self._started_tracing:
+                    tracemalloc.stop()
+                path = base + ".txt"
+                snapshot.dump(base + ".tracemalloc")
+                _write_allocation_report(path, self.tool, snapshot.compare_to(self._state, "lineno"))
+            self.profiler.record(self.tool, self.mode, path, elapsed)
+        except OSError as e:
+            logger.error(f"Failed to write {self.mode} profile for {self.tool}: {e}")
+        finally:
+            self.profiler.release(self.mode)
+        return False
+
+
+def _write_allocation_report(path: str, tool: str, stats: List[Any]):
+    growth = sorted((s for s in stats if s.size_diff > 0), key=lambda s: s.size_diff, reverse=True)
+    with open(path, "w") as f:
+        f.write(f"Allocations during {tool}: {sum(s.size_diff for s in growth) / 1024:.1f} KiB net\n\n")
+        for stat in growth[:TRACEMALLOC_TOP]:
+            frame = stat.traceback[0]
+            f.write(
+                f"{stat.size_diff / 1024:10.1f} KiB {stat.count_diff:+8d} blocks  {frame.filename}:{frame.lineno}\n"
+            )
+
+
+class _NoopSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SESSION = _NoopSession()
+
+
+class Profiler:
+    """Profiles the next N calls of armed tools
+
+    Args:
+        directory: Where profile files are written (created on demand;
+                   toggl-mcp-profiles in the temp directory by default)
+        history: Number of written profiles remembered for status()
+    """
+
+    def __init__(self, directory: Optional[str] = None, history: int = 50):
+        self.directory = directory
+        self.history = history
+        self._armed: Dict[str, _Arming] = {}
+        self._busy: set = set()
+        self._written: List[Dict[str, Any]] = []
+        self._sequence = 0
+
+    def arm(self, tool: str, calls: int = 1, mode: str = "cprofile", interval: float = 0.005):
+        """Profile the next calls of tool with mode (calls <= 0 disarms)"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}', expected one of: {', '.join(PROFILE_MODES)}")
+        if calls <= 0:
+            self._armed.pop(tool, None)
+            return
+        self._armed[tool] = _Arming(mode, calls, interval)
+        logger.info(f"Profiling the next {calls} calls of {tool} with {mode}")
+
+    def configure(self, spec: str):
+        """Arm tools from a "tool:calls:mode,..." specification
+
+        calls defaults to 1 and mode to cprofile, e.g.
+        "toggl_list_time_entries:5:sample,toggl_get_user".
+        """
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            tool, _, rest = item.partition(":")
+            calls, _, mode = rest.partition(":")
+            self.arm(tool, int(calls) if calls else 1, mode or "cprofile")
+
+    def profile(self, tool: str, call_id: Optional[str] = None):
+        """Context manager profiling this call of tool if it is armed"""
+        if not self._armed:
+            return _NOOP_SESSION
+        arming = self._armed.get(tool)
+        if arming is None or arming.mode in self._busy:
+            return _NOOP_SESSION
+        self._busy.add(arming.mode)
+        arming.remaining -= 1
+        if arming.remaining <= 0:
+            del self._armed[tool]
+        return _ProfileSession(self, tool, arming.mode, arming.interval, call_id)
+
+    def release(self, mode: str):
+        self._busy.discard(mode)
+
+    def output_path(self, tool: str, call_id: Optional[str]) -> str:
+        """Path (without extension) for the next profile of tool"""
+        directory = self.output_directory()
+        os.makedirs(directory, exist_ok=True)
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = call_id[:16] if call_id else f"{os.getpid()}-{self._sequence}"
+        return os.path.join(directory, f"{tool}-{stamp}-{suffix}")
+
+    def output_directory(self) -> str:
+        # Resolved lazily: finding the temp directory probes the file system
+        return self.directory or os.path.join(tempfile.gettempdir(), "toggl-mcp-profiles")
+
+    def record(self, tool: str, mode: str, path: str, seconds: float):
+        logger.info(f"Wrote {mode} profile of {tool} ({seconds * 1000:.1f} ms) to {path}")
+        self._written.append({"tool": tool, "mode": mode, "path": path, "duration_ms": round(seconds * 1000, 3)})
+        del self._written[:-self.history]
+
+    def status(self) -> Dict[str, Any]:
+        """Armed tools and the most recently written profiles"""
+        return {
+            "directory": self.output_directory(),
+            "armed": {
+                tool: {"mode": arming.mode, "remaining_calls": arming.remaining}
+                for tool, arming in self._armed.items()
+            },
+            "profiles": list(self._written),
+        }
+
+
+profiler = Profiler()
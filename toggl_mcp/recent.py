@@ -0,0 +1,85 @@
+"""
+Most recently used time entry combinations
+
+Agents restarting earlier work need the description, project, task, tags
+and billable flag of an earlier entry. RecentEntries keeps each distinct
+combination of these seen in fetched or written entries, with the time it
+was last started, so "continue what I did yesterday" is a lookup instead of
+a listing.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .search import to_timestamp
+
+Combination = Tuple[Any, ...]
+
+
+def combination(entry: Dict[str, Any]) -> Combination:
+    """Key identifying what an entry was about, independent of when it ran"""
+    return (
+        entry.get("workspace_id"),
+        (entry.get("description") or "").strip(),
+        entry.get("project_id"),
+        entry.get("task_id"),
+        tuple(sorted(entry.get("tags") or [])),
+        tuple(sorted(entry.get("tag_ids") or [])) if not entry.get("tags") else (),
+        bool(entry.get("billable")),
+    )
+
+
+class RecentEntries:
+    """Distinct entry combinations by when they were last started
+
+    Args:
+        max_size: Combinations kept; the least recently started are dropped beyond it
+    """
+
+    def __init__(self, max_size: int = 500):
+        self.max_size = max_size
+        self._combinations: Dict[Combination, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._combinations)
+
+    def add(self, entries: Iterable[Dict[str, Any]]):
+        """Record entries' combinations, keeping the latest start of each"""
+        for entry in entries:
+            if not entry.get("start"):
+                continue
+            started = to_timestamp(entry["start"])
+            key = combination(entry)
+            known = self._combinations.get(key)
+            if known is None or started >= known["last_started_ts"]:
+                self._combinations[key] = {
+                    "workspace_id": key[0],
+                    "description": key[1],
+                    "project_id": key[2],
+                    "task_id": key[3],
+                    "tags": list(entry.get("tags") or []),
+                    "tag_ids": list(entry.get("tag_ids") or []),
+                    "billable": key[6],
+                    "last_started": entry["start"],
+                    "last_started_ts": started,
+                    "last_entry_id": entry.get("id"),
+                }
+        if len(self._combinations) > self.max_size:
+            ranked = sorted(self._combinations.items(), key=lambda item: item[1]["last_started_ts"], reverse=True)
+            self._combinations = dict(ranked[:self.max_size])
+
+    def recent(self, query: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Combinations started most recently first, optionally only those matching query
+
+        A combination matches when every word of query appears in its
+        description or tags, ignoring case.
+        """
+        words = query.casefold().split() if query else []
+        matches = [
+            combo for combo in self._combinations.values()
+            if all(
+                word in combo["description"].casefold() or any(word in tag.casefold() for tag in combo["tags"])
+                for word in words
+            )
+        ]
+        matches.sort(key=lambda combo: combo["last_started_ts"], reverse=True)
+        return matches[:limit]
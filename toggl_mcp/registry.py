@@ -0,0 +1,153 @@
+"""
+Per-tenant Toggl client registry for multi-tenant deployments
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from .toggl_client import TogglClient
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """LRU registry mapping API tokens to TogglClient instances
+
+    Every client shares one HTTP connection pool, while caches and rate budgets
+    stay per tenant because they live on each TogglClient. Clients idle for
+    longer than idle_timeout are evicted, and the least recently used client is
+    evicted once max_clients is reached. Evicted clients are closed.
+
+    A new token first gets one of max_unverified probation slots, and only
+    takes a regular slot once the API has accepted it, so a flood of made-up
+    tokens evicts other unverified tokens rather than active tenants.
+
+    Args:
+        max_clients: Maximum number of tenant clients kept alive
+        max_unverified: Maximum number of clients kept for tokens the API has not accepted yet
+        idle_timeout: Seconds after which an unused client is evicted
+        http_client: Shared HTTP client (created if not provided)
+        cache_ttl: Reference data cache TTL for each tenant client
+        rate_limit: Requests per second allowed for each tenant
+        base_url: API root for every tenant client (TogglClient.BASE_URL if None)
+    """
+
+    def __init__(
+        self,
+        max_clients: int = 1000,
+        max_unverified: int = 100,
+        idle_timeout: float = 900.0,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache_ttl: Optional[float] = None,
+        rate_limit: Optional[float] = None,
+        base_url: Optional[str] = None
+    ):
+        self.max_clients = max_clients
+        self.max_unverified = max_unverified
+        self.idle_timeout = idle_timeout
+        self.http_client = http_client or httpx.AsyncClient()
+        self.cache_ttl = cache_ttl
+        self.rate_limit = rate_limit
+        self.base_url = base_url
+        self._clients: "OrderedDict[str, Tuple[TogglClient, float]]" = OrderedDict()
+        self._unverified: "OrderedDict[str, Tuple[TogglClient, float]]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+        # Tasks closing evicted clients, referenced until they finish
+        self._closing: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(api_token: str) -> str:
+        return hashlib.sha256(api_token.encode()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._clients) + len(self._unverified)
+
+    def get(self, api_token: str) -> TogglClient:
+        """Return the client for api_token, creating it if needed"""
+        now = time.monotonic()
+        if now - self._last_sweep > min(self.idle_timeout, 60.0):
+            self.evict_idle(now)
+
+        key = self._key(api_token)
+        entry = self._clients.get(key) or self._unverified.pop(key, None)
+        if entry:
+            client = entry[0]
+            self._clients.pop(key, None)
+        else:
+            client = TogglClient(
+                api_token,
+                http_client=self.http_client,
+                cache_ttl=self.cache_ttl,
+                rate_limit=self.rate_limit,
+                base_url=self.base_url
+            )
+            logger.debug(f"Created client for tenant {key[:8]}")
+        # Re-inserted as most recently used; an unverified client moves to a
+        # regular slot once a response has shown its token to be valid
+        clients, limit = (
+            (self._clients, self.max_clients) if client.authenticated else (self._unverified, self.max_unverified)
+        )
+        evicted = []
+        while len(clients) >= limit:
+            evicted_key, (evicted_client, _) = clients.popitem(last=False)
+            evicted.append(evicted_client)
+            logger.debug(f"Evicted least recently used tenant {evicted_key[:8]}")
+        clients[key] = (client, now)
+        self._close_later(evicted)
+        return client
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Evict clients idle for longer than idle_timeout, returning how many were dropped"""
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        evicted: List[TogglClient] = []
+        for clients in (self._clients, self._unverified):
+            # Entries are kept in least recently used order, so stop at the first fresh one
+            while clients:
+                key, (client, last_used) = next(iter(clients.items()))
+                if now - last_used <= self.idle_timeout:
+                    break
+                del clients[key]
+                evicted.append(client)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} idle tenant clients")
+            self._close_later(evicted)
+        return len(evicted)
+
+    def _close_later(self, clients: Iterable[TogglClient]):
+        """Close evicted clients in a task, as get and evict_idle are called synchronously"""
+        clients = list(clients)
+        if not clients:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop, so no background refreshes either; nothing is left to close
+            return
+        task = loop.create_task(self._close_clients(clients))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_clients(clients: Iterable[TogglClient]):
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close evicted tenant client: {e}")
+
+    async def close(self):
+        """Close all tenant clients and the shared connection pool"""
+        clients = [client for client, _ in (*self._clients.values(), *self._unverified.values())]
+        self._clients.clear()
+        self._unverified.clear()
+        await self._close_clients(clients)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        await self.http_client.aclose()
@@ -0,0 +1,241 @@
+"""
+In-process full-text index over time entries
+
+Every time entry the client fetches, creates or updates is added to an
+inverted index from case-folded words of its description and tag names to
+entry IDs; re-adding an entry replaces its old postings, so the index is
+built incrementally as entries come in. Each query word matches indexed
+words starting with it (found by bisecting the sorted vocabulary), all
+query words must match, and results are ranked most recent first.
+
+Project names are not copied into the index: entries are indexed by
+project_id, and project names matching a query word are expanded to their
+entries at query time, so renaming a project needs no reindexing.
+
+The index also remembers which date ranges have been fetched in full, so a
+search over a range fetched recently needs no upstream request.
+
+Memory is bounded per index (one per client, so per tenant): entries not
+re-added within max_age seconds are aged out, and beyond max_entries the
+oldest entries by start are dropped, popped from a heap of start times. A
+batch larger than max_entries is cut to its newest entries before any of
+it is tokenized, so indexing a huge listing costs no more than indexing
+max_entries of it.
+"""
+
+import heapq
+import re
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Case-folded words of text"""
+    return WORD.findall(text.casefold()) if text else []
+
+
+def to_timestamp(value: str) -> float:
+    """Timestamp of an ISO 8601 date or datetime; without an offset it is UTC"""
+    dt = datetime.fromisoformat(value)
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def newest(entries: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """The limit entries with the latest start, or entries itself when it has no more than limit"""
+    if len(entries) <= limit:
+        return entries
+    return heapq.nlargest(limit, (e for e in entries if e.get("start")), key=lambda e: to_timestamp(e["start"]))
+
+
+class TimeEntryIndex:
+    """Inverted index of time entries by description and tag words
+
+    Args:
+        max_entries: Entries kept; the oldest (by start) are dropped beyond it
+        max_age: Seconds an entry is kept after it was last added
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_age: float = 1800.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self._starts: Dict[int, float] = {}
+        # When each entry was last added, least recently added first
+        self._added: Dict[int, float] = {}
+        # (start, entry ID) of every entry, plus stale pairs of entries since
+        # removed or re-added with another start, skipped when popped
+        self._by_start: List[Tuple[float, int]] = []
+        self._tokens: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._by_project: Dict[int, Set[int]] = {}
+        self.workspace_ids: Set[int] = set()
+        self._vocabulary: List[str] = []
+        self._vocabulary_stale = False
+        # Fully fetched ranges: (start, end, fetched at)
+        self._covered: List[Tuple[float, float, float]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entries: Iterable[Dict[str, Any]]) -> bool:
+        """Index entries, replacing earlier versions of the same entries
+
+        Returns:
+            Whether every entry with an ID and start is still indexed
+            afterwards, i.e. none was cut or evicted for max_entries
+        """
+        now = time.monotonic()
+        batch = [entry for entry in entries if entry.get("id") is not None and entry.get("start")]
+        kept = newest(batch, self.max_entries)
+        complete = len(kept) == len(batch)
+        for entry in kept:
+            entry_id = entry["id"]
+            self._remove(entry_id)
+            tokens = set(tokenize(entry.get("description")))
+            for tag in entry.get("tags") or []:
+                tokens.update(tokenize(tag))
+            self.entries[entry_id] = entry
+            self._starts[entry_id] = start = to_timestamp(entry["start"])
+            self._added[entry_id] = now
+            heapq.heappush(self._by_start, (start, entry_id))
+            self._tokens[entry_id] = tokens
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    self._postings[token] = postings = set()
+                    self._vocabulary_stale = True
+                postings.add(entry_id)
+            if entry.get("workspace_id"):
+                self.workspace_ids.add(entry["workspace_id"])
+            if entry.get("project_id"):
+                self._by_project.setdefault(entry["project_id"], set()).add(entry_id)
+        self.expire()
+        if len(self.entries) > self.max_entries:
+            while len(self.entries) > self.max_entries:
+                start, entry_id = heapq.heappop(self._by_start)
+                if self._starts.get(entry_id) == start:
+                    self._remove(entry_id)
+            self._covered.clear()
+            complete = complete and all(entry["id"] in self.entries for entry in kept)
+        if len(self._by_start) > 2 * len(self.entries) + 1024:
+            self._by_start = [(start, entry_id) for entry_id, start in self._starts.items()]
+            heapq.heapify(self._by_start)
+        return complete
+
+    def expire(self):
+        """Drop entries last added more than max_age seconds ago"""
+        cutoff = time.monotonic() - self.max_age
+        expired = False
+        while self._added:
+            entry_id = next(iter(self._added))
+            if self._added[entry_id] >= cutoff:
+                break
+            self._remove(entry_id)
+            expired = True
+        if expired:
+            self._covered.clear()
+
+    def remove(self, entry_ids: Iterable[int]):
+        """Drop entries, e.g. after they were deleted"""
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+
+    def _remove(self, entry_id: int):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        del self._starts[entry_id]
+        del self._added[entry_id]
+        for token in self._tokens.pop(entry_id):
+            postings = self._postings[token]
+            postings.discard(entry_id)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_stale = True
+        project = self._by_project.get(entry.get("project_id"))
+        if project is not None:
+            project.discard(entry_id)
+
+    def _prefixed(self, prefix: str) -> Set[int]:
+        """Entries with a word starting with prefix"""
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+        matches: Set[int] = set()
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            token = self._vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def search(
+        self,
+        query: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        project_names: Optional[Dict[int, str]] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Entries matching every word of query, most recent first
+
+        Args:
+            query: Words to find; each matches words starting with it
+            start: Only entries starting at or after this timestamp
+            end: Only entries starting before this timestamp
+            project_names: Project names by ID; a query word may also match
+                           a word of the entry's project name
+            limit: Most entries returned
+
+        Returns:
+            (entries, total number of matches)
+        """
+        self.expire()
+        words = tokenize(query)
+        if not words:
+            return [], 0
+        project_words = {pid: set(tokenize(name)) for pid, name in (project_names or {}).items()}
+        matches: Optional[Set[int]] = None
+        # Longest, usually most selective, word first keeps the intersection small
+        for word in sorted(set(words), key=len, reverse=True):
+            found = self._prefixed(word)
+            for pid, names in project_words.items():
+                if any(name.startswith(word) for name in names):
+                    found |= self._by_project.get(pid, set())
+            matches = found if matches is None else matches & found
+            if not matches:
+                return [], 0
+        ranked = [
+            entry_id for entry_id in matches or ()
+            if (start is None or self._starts[entry_id] >= start) and (end is None or self._starts[entry_id] < end)
+        ]
+        ranked.sort(key=self._starts.__getitem__, reverse=True)
+        return [self.entries[entry_id] for entry_id in ranked[:limit]], len(ranked)
+
+    def mark_covered(self, start: float, end: float):
+        """Record that every entry starting in [start, end) has been indexed"""
+        self._covered.append((start, end, time.monotonic()))
+
+    def covers(self, start: float, end: float, max_age: float) -> bool:
+        """Whether [start, end) was fully fetched within the last max_age seconds"""
+        cutoff = time.monotonic() - max_age
+        self._covered = [c for c in self._covered if c[2] >= cutoff]
+        reached = start
+        for covered_start, covered_end, _ in sorted(self._covered):
+            if covered_start > reached:
+                break
+            reached = max(reached, covered_end)
+            if reached >= end:
+                return True
+        return False
+
+    def invalidate_coverage(self):
+        """Forget fetched ranges, e.g. after entries changed without returning their new state"""
+        self._covered.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self.entries), "words": len(self._postings), "covered_ranges": len(self._covered)}
@@ -0,0 +1,228 @@
+"""
+Timesheet checks: overlapping entries, gaps in working hours, entries crossing midnight
+
+Entries are turned into (start, stop) intervals in epoch seconds and sorted
+once. A single sweep over the sorted intervals finds overlaps and builds
+their union, which is then walked alongside the working-hour windows to
+find gaps. Midnight crossings are found by bisecting each interval into the
+sorted list of local midnights. Everything after the sort is linear or
+logarithmic per entry, so the check is O(n log n) overall.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dtime, timedelta, timezone, tzinfo
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+@dataclass(frozen=True)
+class WorkingHours:
+    """Daily working window, in local time, on the given weekdays (Monday is 0)"""
+
+    start: dtime = dtime(9, 0)
+    end: dtime = dtime(17, 0)
+    days: FrozenSet[int] = field(default_factory=lambda: frozenset(range(5)))
+
+    @classmethod
+    def parse(cls, start: str = "09:00", end: str = "17:00", days: Optional[Iterable[str]] = None) -> "WorkingHours":
+        """Build from "HH:MM" strings and weekday names ("mon", "Tuesday", ...)
+
+        Raises:
+            ValueError: If a time or weekday cannot be parsed, or end is not after start
+        """
+        hours = cls(
+            dtime.fromisoformat(start),
+            dtime.fromisoformat(end),
+            frozenset(range(5)) if days is None else frozenset(_weekday(day) for day in days),
+        )
+        if hours.end <= hours.start:
+            raise ValueError(f"Working hours must end after they start ({start}-{end})")
+        return hours
+
+
+def _weekday(name: str) -> int:
+    prefix = name.strip().lower()[:3]
+    if prefix not in WEEKDAYS:
+        raise ValueError(f"Unknown weekday '{name}'")
+    return WEEKDAYS.index(prefix)
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def interval(entry: Dict[str, Any], now: float) -> Optional[Tuple[float, float, Any]]:
+    """(start, stop, id) of an entry, None without a start; running entries stop at now"""
+    start_value = entry.get("start")
+    if not start_value:
+        return None
+    start = _timestamp(start_value)
+    duration = entry.get("duration")
+    if duration is not None and duration >= 0:
+        stop = start + duration
+    elif duration is None and entry.get("stop"):
+        stop = _timestamp(entry["stop"])
+    else:
+        stop = now  # Running
+    return start, max(start, stop), entry.get("id")
+
+
+def intervals(entries: Iterable[Dict[str, Any]], now: float) -> List[Tuple[float, float, Any]]:
+    """(start, stop, id) of each entry, sorted; running entries stop at now"""
+    result = [span for span in (interval(entry, now) for entry in entries) if span is not None]
+    result.sort()
+    return result
+
+
+def sweep(spans: List[Tuple[float, float, Any]]) -> Tuple[List[Tuple[Any, Any, float, float]], List[List[float]]]:
+    """Overlaps and merged coverage of sorted intervals
+
+    Each interval is checked against the one reaching furthest among those
+    before it, so every entry that overlaps another is reported at least once.
+
+    Returns:
+        ([(entry_id, other_entry_id, overlap_start, overlap_end)], [[start, end], ...])
+    """
+    overlaps: List[Tuple[Any, Any, float, float]] = []
+    merged: List[List[float]] = []
+    reach, reach_id = float("-inf"), None
+    for start, stop, entry_id in spans:
+        if start < reach:
+            overlaps.append((entry_id, reach_id, start, min(stop, reach)))
+        if stop > reach:
+            reach, reach_id = stop, entry_id
+        if merged and start <= merged[-1][1]:
+            if stop > merged[-1][1]:
+                merged[-1][1] = stop
+        else:
+            merged.append([start, stop])
+    return overlaps, merged
+
+
+def _local_midnights(first: date, last: date, tz: tzinfo) -> List[float]:
+    days = (last - first).days + 1
+    return [datetime.combine(first + timedelta(days=i), dtime(0), tzinfo=tz).timestamp() for i in range(days + 1)]
+
+
+def working_windows(range_start: float, range_end: float, tz: tzinfo, hours: WorkingHours) -> List[Tuple[float, float]]:
+    """Working-hour windows between two timestamps, clipped to them"""
+    first = datetime.fromtimestamp(range_start, tz).date()
+    last = datetime.fromtimestamp(range_end, tz).date()
+    windows = []
+    day = first
+    while day <= last:
+        if day.weekday() in hours.days:
+            start = max(datetime.combine(day, hours.start, tzinfo=tz).timestamp(), range_start)
+            end = min(datetime.combine(day, hours.end, tzinfo=tz).timestamp(), range_end)
+            if end > start:
+                windows.append((start, end))
+        day += timedelta(days=1)
+    return windows
+
+
+def gaps(merged: List[List[float]], windows: List[Tuple[float, float]], min_gap: float) -> List[Tuple[float, float]]:
+    """Stretches of at least min_gap seconds within windows not covered by merged intervals"""
+    result = []
+    min_gap = max(min_gap, 1e-9)  # Touching intervals leave no gap, even with min_gap 0
+    i = 0
+    for window_start, window_end in windows:
+        while i < len(merged) and merged[i][1] <= window_start:
+            i += 1
+        cursor = window_start
+        j = i
+        while j < len(merged) and merged[j][0] < window_end:
+            if merged[j][0] - cursor >= min_gap:
+                result.append((cursor, merged[j][0]))
+            cursor = max(cursor, merged[j][1])
+            j += 1
+        if window_end - cursor >= min_gap:
+            result.append((cursor, window_end))
+    return result
+
+
+def crossing_midnight(spans: List[Tuple[float, float, Any]], tz: tzinfo) -> List[Tuple[Any, float, float]]:
+    """Intervals that run past a local midnight"""
+    if not spans:
+        return []
+    first = datetime.fromtimestamp(spans[0][0], tz).date()
+    last = datetime.fromtimestamp(max(stop for _, stop, _ in spans), tz).date()
+    midnights = _local_midnights(first, last, tz)
+    return [
+        (entry_id, start, stop) for start, stop, entry_id in spans
+        if bisect_left(midnights, stop) > bisect_right(midnights, start)
+    ]
+
+
+def check_timesheet(
+    entries: Iterable[Dict[str, Any]],
+    range_start: datetime,
+    range_end: datetime,
+    tz: tzinfo = timezone.utc,
+    hours: WorkingHours = WorkingHours(),
+    min_gap: float = 900.0,
+    limit: int = 50,
+    now: Optional[float] = None
+) -> Dict[str, Any]:
+    """Find overlapping entries, working-hour gaps and entries crossing midnight
+
+    Args:
+        entries: Time entries as returned by the Toggl API
+        range_start: Start of the period checked for gaps
+        range_end: End of the period checked for gaps (clipped to now)
+        tz: Timezone of the working hours and of midnight
+        hours: Working hours to check for gaps
+        min_gap: Shortest reported gap, in seconds
+        limit: Most findings listed per kind; counts cover all of them
+        now: Current time as a timestamp, used as the stop of running entries
+
+    Returns:
+        {"entries", "tracked_hours", "overlaps", "gaps", "crossing_midnight"},
+        with "overlap_count", "gap_count", "crossing_midnight_count" and
+        "gap_hours" summarising the lists
+    """
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+    return check_intervals(intervals(entries, now), range_start, range_end, tz, hours, min_gap, limit, now)
+
+
+def check_intervals(
+    spans: List[Tuple[float, float, Any]],
+    range_start: datetime,
+    range_end: datetime,
+    tz: tzinfo,
+    hours: WorkingHours,
+    min_gap: float,
+    limit: int,
+    now: float
+) -> Dict[str, Any]:
+    """check_timesheet for entries already turned into sorted (start, stop, id) intervals"""
+    overlaps, merged = sweep(spans)
+    windows = working_windows(range_start.timestamp(), min(range_end.timestamp(), now), tz, hours)
+    missing = gaps(merged, windows, min_gap)
+    crossing = crossing_midnight(spans, tz)
+
+    def iso(ts: float) -> str:
+        return datetime.fromtimestamp(ts, tz).isoformat()
+
+    return {
+        "entries": len(spans),
+        "tracked_hours": round(sum(end - start for start, end in merged) / 3600, 2),
+        "overlap_count": len(overlaps),
+        "overlaps": [
+            {"entry_id": a, "other_entry_id": b, "start": iso(start), "end": iso(end),
+             "minutes": round((end - start) / 60, 1)}
+            for a, b, start, end in overlaps[:limit]
+        ],
+        "gap_count": len(missing),
+        "gap_hours": round(sum(end - start for start, end in missing) / 3600, 2),
+        "gaps": [
+            {"start": iso(start), "end": iso(end), "minutes": round((end - start) / 60, 1)}
+            for start, end in missing[:limit]
+        ],
+        "crossing_midnight_count": len(crossing),
+        "crossing_midnight": [
+            {"entry_id": entry_id, "start": iso(start), "stop": iso(stop)}
+            for entry_id, start, stop in crossing[:limit]
+        ],
+    }
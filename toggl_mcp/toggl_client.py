@@ -3,10 +3,27 @@ Toggl API v9 Client
 """
 
 from base64 import b64encode
-from typing import Dict, List, Optional
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import contextvars
+import heapq
+import itertools
 import logging
+import time
 import httpx
 
+from .accounting import charge
+from .admission import AdmissionController
+from .changes import WrittenState, changed_fields, plan_bulk_update
+from .directory import UserDirectory
+from .recent import RecentEntries
+from .search import TimeEntryIndex, newest, to_timestamp
+from .json_stream import iter_json_array
+from .limits import AdaptiveLimiter, RateBudget
+from .metrics import endpoint_template, metrics
+from .tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,11 +31,69 @@ class TogglClient:
     """Client for interacting with Toggl API v9"""
     
     BASE_URL = "https://api.track.toggl.com/api/v9"
+    CACHE_TTL = 60.0  # Seconds to keep reference data (projects, tags, ...) cached
+    BULK_CHUNK_SIZE = 100  # Maximum time entry IDs per bulk request
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5  # Seconds before the first retry, doubled after each attempt
+    MAX_RETRY_DELAY = 30.0
+    THROTTLE_STATUSES = (429, 502, 503, 504)
+    TASK_PAGE_SIZE = 200  # Tasks per page from the workspace tasks endpoint
+    TASK_FAN_OUT = 8  # Concurrent per-project task requests when building a task catalog
+    DIRECTORY_TTL = 300.0  # Seconds before the user directory refreshes a workspace's users
+    ENTRY_INDEX_SIZE = 10_000  # Most time entries kept in the search index
+    ENTRY_INDEX_TTL = 1800.0  # Seconds an entry stays in the search index after it was last fetched or written
+    WRITTEN_STATE_TTL = 10.0  # Seconds what this client wrote to an entry is trusted to skip unchanged update fields
     
-    def __init__(self, api_token: str):
+    def __init__(
+        self,
+        api_token: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache_ttl: Optional[float] = None,
+        rate_limit: Optional[float] = None,
+        admission: Optional[AdmissionController] = None,
+        base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            api_token: Toggl API token
+            http_client: Shared HTTP client (connection pool). The client is only
+                         closed by close() when it was created here.
+            cache_ttl: Seconds to cache reference data (0 disables caching)
+            rate_limit: Maximum requests per second for this token (unlimited if None)
+            admission: Controller scheduling this client's requests by call class.
+                       By default its capacity follows an AIMD adaptive limiter
+                       shared by every request this client makes.
+            base_url: API root to send requests to instead of BASE_URL, such as
+                      a local stub or proxy
+        """
         self.api_token = api_token
         self.headers = self._get_headers()
-        self.client = httpx.AsyncClient()
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+        self._owns_client = http_client is None
+        self.client = http_client or httpx.AsyncClient()
+        self.rate_budget = RateBudget(rate_limit) if rate_limit else None
+        self.admission = admission or AdmissionController(limiter=AdaptiveLimiter())
+        self.limiter = self.admission.limiter
+        self.cache_ttl = self.CACHE_TTL if cache_ttl is None else cache_ttl
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+        # Records by case-folded name, with the listing they were built from, by collection
+        self._named: Dict[str, Tuple[Any, Dict[str, Dict]]] = {}
+        # [lock, callers using it] held while a named record is created, by collection and case-folded name
+        self._name_locks: Dict[str, List[Any]] = {}
+        self.directory = UserDirectory(
+            lambda workspace_id: self._request("GET", f"/workspaces/{workspace_id}/users"), self.DIRECTORY_TTL
+        )
+        # Every time entry fetched, created or updated through this client
+        self.entry_index = TimeEntryIndex(self.ENTRY_INDEX_SIZE, self.ENTRY_INDEX_TTL)
+        self.recent_entries = RecentEntries()
+        # What this client last wrote to entries, and the update fields and
+        # entries not sent because it had just written them
+        self.written = WrittenState(self.WRITTEN_STATE_TTL)
+        self.elided = {"fields": 0, "entries": 0, "requests": 0}
+        # Whether the API has accepted the token, i.e. answered any request successfully
+        self.authenticated = False
     
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests"""
@@ -28,8 +103,113 @@ class TogglClient:
             "Content-Type": "application/json",
         }
     
+    @asynccontextmanager
+    async def _exchange(self, method: str, endpoint: str, stream: bool = False, **kwargs) -> AsyncIterator[httpx.Response]:
+        """One request through admission control, feeding the adaptive limiter and metrics
+        
+        The rate budget is waited for before admission, so a client throttled
+        by its own budget holds no slot while it waits. The admission slot is
+        held until the context exits. With stream the body is left unread, so
+        a streamed response counts against capacity while its body is read,
+        and its bytes are recorded once it is closed.
+        """
+        granted = None
+        try:
+            with tracer.span("toggl.queue"):
+                if self.rate_budget:
+                    await self.rate_budget.acquire()
+                granted = await self.admission.acquire()
+            with tracer.span("toggl.http", call_class=granted, stream=stream) as span:
+                started = time.monotonic()
+                try:
+                    request = self.client.build_request(
+                        method, f"{self.BASE_URL}{endpoint}", headers=self.headers, **kwargs
+                    )
+                    response = await self.client.send(request, stream=stream)
+                except httpx.TransportError as e:
+                    if self.limiter and isinstance(e, httpx.TimeoutException):
+                        self.limiter.on_backoff("timeout")
+                    metrics.observe_request(method, endpoint, type(e).__name__, time.monotonic() - started)
+                    charge(0, 0, counted=False)
+                    raise
+                latency = time.monotonic() - started
+                span.set("status", response.status_code)
+                if response.status_code < 400:
+                    self.authenticated = True
+                if self.limiter:
+                    # Only answered requests grow the limit; any server error
+                    # shrinks it, and other client errors say nothing about load
+                    if response.status_code in self.THROTTLE_STATUSES or response.status_code >= 500:
+                        self.limiter.on_backoff(f"HTTP {response.status_code}")
+                    elif response.status_code < 400:
+                        self.limiter.on_success(latency, self.admission.in_flight)
+                
+                def record(bytes_in: int, seconds: float):
+                    bytes_out = len(request.content)
+                    metrics.observe_request(method, endpoint, response.status_code, seconds, bytes_out, bytes_in)
+                    # Throttled requests are rejected before they count against the quota
+                    charge(bytes_out, bytes_in, counted=response.status_code != 429)
+                
+                if not stream:
+                    record(len(response.content), latency)
+                    yield response
+                    return
+                try:
+                    yield response
+                finally:
+                    await response.aclose()
+                    # Latency covers the whole body, as it does for buffered requests
+                    record(response.num_bytes_downloaded, time.monotonic() - started)
+        finally:
+            if granted:
+                self.admission.release(granted)
+    
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+        return min(self.RETRY_BACKOFF * 2 ** attempt, self.MAX_RETRY_DELAY)
+    
+    @asynccontextmanager
+    async def _attempts(self, method: str, endpoint: str, span: Any, stream: bool = False, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Send a request through _exchange, retrying throttled and failed attempts
+        
+        429 responses are retried for every method. 5xx responses, timeouts and
+        connection errors are only retried for idempotent methods. Yields the
+        last response; with stream, its body is read within the context.
+        """
+        url = f"{self.BASE_URL}{endpoint}"
+        idempotent = method in ("GET", "PUT", "DELETE")
+        for attempt in range(self.MAX_RETRIES + 1):
+            span.set("attempts", attempt + 1)
+            async with AsyncExitStack() as exchange:
+                try:
+                    response = await exchange.enter_async_context(
+                        self._exchange(method, endpoint, stream=stream, **kwargs)
+                    )
+                except httpx.TransportError as e:
+                    if not idempotent or attempt == self.MAX_RETRIES:
+                        raise
+                    logger.warning(f"{method} {url} failed ({e!r}), retrying")
+                    delay = self._retry_delay(attempt)
+                else:
+                    retryable = response.status_code == 429 or (
+                        idempotent and response.status_code in self.THROTTLE_STATUSES
+                    )
+                    if not retryable or attempt == self.MAX_RETRIES:
+                        yield response
+                        return
+                    delay = self._retry_delay(attempt, response)
+                    logger.warning(f"HTTP {response.status_code} for {method} {url}, retrying in {delay:.2f}s")
+            metrics.count_retry(method, endpoint)
+            await asyncio.sleep(delay)
+    
     async def _request(self, method: str, endpoint: str, **kwargs) -> Dict:
-        """Make an API request"""
+        """Make an API request, retrying as described in _attempts"""
         url = f"{self.BASE_URL}{endpoint}"
         
         # Log the request details
@@ -37,42 +217,128 @@ class TogglClient:
         if 'json' in kwargs:
             logger.debug(f"Request body: {kwargs['json']}")
         
-        try:
-            response = await self.client.request(
-                method, url, headers=self.headers, **kwargs
-            )
-            
-            # Log response details
-            logger.debug(f"Response status: {response.status_code}")
-            if response.content:
-                logger.debug(f"Response body: {response.text[:500]}...")  # First 500 chars
-            
-            # Raise for HTTP errors
-            response.raise_for_status()
-            
-            result = response.json() if response.content else {}
-            logger.debug(f"Parsed response: {result}")
+        with tracer.span("toggl.request", method=method, endpoint=endpoint_template(endpoint)) as span:
+            try:
+                async with self._attempts(method, endpoint, span, **kwargs) as response:
+                    pass  # Buffered: the body is read, so the admission slot is released before parsing
+                
+                # Log response details
+                logger.debug(f"Response status: {response.status_code}")
+                if response.content:
+                    logger.debug(f"Response body: {response.text[:500]}...")  # First 500 chars
+                
+                # Raise for HTTP errors
+                response.raise_for_status()
+                
+                if method != "GET":
+                    self._invalidate(endpoint)
+                
+                result = response.json() if response.content else {}
+                logger.debug(f"Parsed response: {result}")
+                return result
+                
+            except httpx.HTTPStatusError as e:
+                logger.error(f"HTTP {e.response.status_code} error for {method} {url}")
+                logger.error(f"Response body: {e.response.text}")
+                raise
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
+                raise
+    
+    async def _cached_get(self, endpoint: str) -> Any:
+        """GET reference data through the response cache
+        
+        Concurrent misses for the same endpoint share a single upstream request.
+        Cached results are shared between callers and must not be mutated.
+        """
+        return await self._cached(endpoint, lambda: self._request("GET", endpoint))
+    
+    async def _cached(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it on a miss
+        
+        Keys are endpoint paths so writes below them invalidate the entry.
+        Concurrent misses for the same key share a single load.
+        """
+        if self.cache_ttl <= 0:
+            return await load()
+        
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            metrics.count_cache(hit=True)
+            return cached[1]
+        
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                # Filled by the load we waited on
+                metrics.count_cache(hit=True)
+                return cached[1]
+            metrics.count_cache(hit=False)
+            result = await load()
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
             return result
-            
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP {e.response.status_code} error for {method} {url}")
-            logger.error(f"Response body: {e.response.text}")
-            raise
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
-            raise
+    
+    def _invalidate(self, endpoint: str):
+        """Drop cached collections affected by a write to endpoint"""
+        for key in list(self._cache):
+            # The collection itself, anything below it, or its direct parent collection
+            if key == endpoint or key.startswith(endpoint + "/") or (
+                endpoint.startswith(key + "/") and "/" not in endpoint[len(key) + 1:]
+            ):
+                del self._cache[key]
+    
+    def clear_cache(self):
+        """Drop all cached reference data"""
+        self._cache.clear()
+    
+    async def _stream(self, method: str, endpoint: str, consume: Callable[[Any], None], **kwargs) -> int:
+        """Make an API request whose JSON array response is parsed incrementally
+        
+        Passes the array elements to consume one at a time without buffering
+        the body. The request is retried like buffered ones and holds its
+        admission slot until the body has been read; consume is synchronous,
+        so it cannot send requests of its own that would wait for that slot.
+        It runs in the caller's context, so spans it opens are children of the
+        caller's span rather than of this request's.
+        
+        Returns:
+            Number of elements
+        """
+        url = f"{self.BASE_URL}{endpoint}"
+        logger.debug(f"Streaming {method} request to: {url}")
+        
+        count = 0
+        context = contextvars.copy_context()
+        with tracer.span("toggl.request", method=method, endpoint=endpoint_template(endpoint), stream=True) as span:
+            async with self._attempts(method, endpoint, span, stream=True, **kwargs) as response:
+                logger.debug(f"Response status: {response.status_code}")
+                if response.is_error:
+                    await response.aread()
+                    logger.error(f"HTTP {response.status_code} error for {method} {url}")
+                    logger.error(f"Response body: {response.text}")
+                    response.raise_for_status()
+                
+                async for item in iter_json_array(response.aiter_bytes()):
+                    context.run(consume, item)
+                    count += 1
+        return count
+    
+    def limiter_stats(self) -> Dict[str, Any]:
+        """Current adaptive concurrency limit and admission state"""
+        return self.admission.stats()
     
     async def get_me(self) -> Dict:
         """Get current user information"""
-        return await self._request("GET", "/me")
+        return await self._cached_get("/me")
     
     async def get_workspaces(self) -> List[Dict]:
         """Get all workspaces"""
-        return await self._request("GET", "/workspaces")
+        return await self._cached_get("/workspaces")
     
     async def get_projects(self, workspace_id: int) -> List[Dict]:
         """Get all projects in a workspace"""
-        return await self._request("GET", f"/workspaces/{workspace_id}/projects")
+        return await self._cached_get(f"/workspaces/{workspace_id}/projects")
     
     async def create_project(self, workspace_id: int, name: str, **kwargs) -> Dict:
         """Create a new project"""
@@ -87,6 +353,43 @@ class TogglClient:
         """Delete a project"""
         return await self._request("DELETE", f"/workspaces/{workspace_id}/projects/{project_id}")
     
+    def _index_entries(self, entries: Any, written: bool = False, covering: Optional[Tuple[str, str]] = None) -> Any:
+        """Add fetched or written entries to the entry index and recent combinations, and return them
+        
+        Of a listing longer than the index holds only the newest entries are
+        indexed; the older ones would be evicted straight away.
+        
+        Args:
+            entries: Entry or entries from a response
+            written: Whether the response is to a write of this client, so its
+                entries are also recorded as written
+            covering: (start, end) of the listed range, recorded as fully
+                fetched when every entry of it was indexed
+        """
+        if isinstance(entries, dict):
+            batch = [entries]
+        elif isinstance(entries, list):
+            batch = [e for e in entries if isinstance(e, dict)]
+        else:
+            return entries
+        kept = newest(batch, self.entry_index.max_entries)
+        complete = self.entry_index.add(kept) and len(kept) == len(batch)
+        self.recent_entries.add(kept)
+        if written:
+            for entry in batch:
+                if entry.get("id") is not None:
+                    self.written.record(entry["id"], entry)
+        if covering and complete:
+            self._mark_covered(*covering)
+        return entries
+    
+    def _mark_covered(self, start_date: Optional[str], end_date: Optional[str]):
+        if start_date and end_date:
+            try:
+                self.entry_index.mark_covered(to_timestamp(start_date), to_timestamp(end_date))
+            except ValueError:
+                pass  # Not ISO 8601; the range is simply fetched again next time
+    
     async def get_time_entries(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict]:
         """Get time entries"""
         params = {}
@@ -94,7 +397,52 @@ class TogglClient:
             params["start_date"] = start_date
         if end_date:
             params["end_date"] = end_date
-        return await self._request("GET", "/me/time_entries", params=params)
+        return self._index_entries(
+            await self._request("GET", "/me/time_entries", params=params), covering=(start_date, end_date)
+        )
+    
+    async def stream_time_entries(
+        self, consume: Callable[[Dict], None], start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> int:
+        """Pass time entries to consume one at a time as they are parsed, in constant memory
+        
+        consume is called while the response body is read (see _stream). The
+        newest entries, as many as the entry index holds, are kept aside and
+        indexed once the body is read, like the entries of get_time_entries.
+        
+        Returns:
+            Number of entries
+        """
+        params = {}
+        if start_date:
+            params["start_date"] = start_date
+        if end_date:
+            params["end_date"] = end_date
+        limit = self.entry_index.max_entries
+        # (start, arrival, entry) of the newest entries so far, oldest first
+        kept: List[Tuple[float, int, Dict]] = []
+        arrival = itertools.count()
+        cut = False
+        
+        def keep(entry: Any):
+            nonlocal cut
+            consume(entry)
+            if not isinstance(entry, dict) or entry.get("id") is None or not entry.get("start"):
+                return
+            item = (to_timestamp(entry["start"]), next(arrival), entry)
+            if len(kept) < limit:
+                heapq.heappush(kept, item)
+            else:
+                heapq.heappushpop(kept, item)
+                cut = True
+        
+        count = await self._stream("GET", "/me/time_entries", keep, params=params)
+        self._index_entries([entry for *_, entry in kept], covering=None if cut else (start_date, end_date))
+        return count
+    
+    async def get_time_entry(self, time_entry_id: int) -> Dict:
+        """Get one of the user's time entries"""
+        return self._index_entries(await self._request("GET", f"/me/time_entries/{time_entry_id}"))
     
     async def get_current_time_entry(self) -> Optional[Dict]:
         """Get the currently running time entry"""
@@ -110,23 +458,65 @@ class TogglClient:
             "created_with": kwargs.pop("created_with", "toggl-mcp"),
             **kwargs
         }
-        return await self._request("POST", f"/workspaces/{workspace_id}/time_entries", json=data)
+        return self._index_entries(
+            await self._request("POST", f"/workspaces/{workspace_id}/time_entries", json=data), written=True
+        )
+    
+    async def _write_entry(self, time_entry_id: int, method: str, endpoint: str, **kwargs) -> Any:
+        """Send a request writing one entry and index and record the entry it returns"""
+        self.written.begin([time_entry_id])
+        result = None
+        try:
+            result = self._index_entries(await self._request(method, endpoint, **kwargs))
+        finally:
+            self.written.finish(time_entry_id, result if isinstance(result, dict) else None)
+        return result
+    
+    def _written_entry(self, workspace_id: int, time_entry_id: int) -> Optional[Dict]:
+        """What this client wrote to an entry in the last WRITTEN_STATE_TTL seconds, if anything"""
+        state = self.written.get(time_entry_id)
+        return state if state is not None and state.get("workspace_id") == workspace_id else None
     
-    async def update_time_entry(self, workspace_id: int, time_entry_id: int, **kwargs) -> Dict:
-        """Update a time entry"""
-        return await self._request("PUT", f"/workspaces/{workspace_id}/time_entries/{time_entry_id}", json=kwargs)
+    async def update_time_entry(self, workspace_id: int, time_entry_id: int, force: bool = False, **kwargs) -> Dict:
+        """Update a time entry
+        
+        Fields this client wrote to the entry in the last WRITTEN_STATE_TTL
+        seconds are not sent again. An update changing nothing sends no
+        request and returns what was written, marked "elided": True; after a
+        bulk update that is only the fields it set, not the full entry.
+        Fetched state is never trusted for this, since the entry may have
+        been edited elsewhere since. force sends every field.
+        """
+        known = None if force else self._written_entry(workspace_id, time_entry_id)
+        if known is not None:
+            changes = changed_fields(known, kwargs)
+            self.elided["fields"] += len(kwargs) - len(changes)
+            if not changes:
+                logger.info(f"Time entry {time_entry_id} was just written as requested, not updating it")
+                self.elided["entries"] += 1
+                self.elided["requests"] += 1
+                return {**known, "id": time_entry_id, "elided": True}
+            kwargs = changes
+        return await self._write_entry(
+            time_entry_id, "PUT", f"/workspaces/{workspace_id}/time_entries/{time_entry_id}", json=kwargs
+        )
     
     async def delete_time_entry(self, workspace_id: int, time_entry_id: int) -> Dict:
         """Delete a time entry"""
-        return await self._request("DELETE", f"/workspaces/{workspace_id}/time_entries/{time_entry_id}")
+        result = await self._request("DELETE", f"/workspaces/{workspace_id}/time_entries/{time_entry_id}")
+        self.entry_index.remove([time_entry_id])
+        self.written.forget([time_entry_id])
+        return result
     
     async def stop_time_entry(self, workspace_id: int, time_entry_id: int) -> Dict:
         """Stop a running time entry"""
-        return await self._request("PATCH", f"/workspaces/{workspace_id}/time_entries/{time_entry_id}/stop")
+        return await self._write_entry(
+            time_entry_id, "PATCH", f"/workspaces/{workspace_id}/time_entries/{time_entry_id}/stop"
+        )
     
     async def get_tags(self, workspace_id: int) -> List[Dict]:
         """Get all tags in a workspace"""
-        return await self._request("GET", f"/workspaces/{workspace_id}/tags")
+        return await self._cached_get(f"/workspaces/{workspace_id}/tags")
     
     async def create_tag(self, workspace_id: int, name: str) -> Dict:
         """Create a new tag"""
@@ -144,51 +534,318 @@ class TogglClient:
     
     async def get_clients(self, workspace_id: int) -> List[Dict]:
         """Get all clients in a workspace"""
-        return await self._request("GET", f"/workspaces/{workspace_id}/clients")
+        return await self._cached_get(f"/workspaces/{workspace_id}/clients")
     
     async def create_client(self, workspace_id: int, name: str) -> Dict:
         """Create a new client"""
         data = {"name": name}
         return await self._request("POST", f"/workspaces/{workspace_id}/clients", json=data)
     
+    async def _ensure_named(
+        self,
+        collection: str,
+        names: List[str],
+        load: Callable[[], Awaitable[List[Dict]]],
+        create: Callable[[str], Awaitable[Dict]]
+    ) -> List[Dict]:
+        """Find records of a collection by name, creating the missing ones
+        
+        Names match ignoring case and surrounding whitespace. They are looked
+        up in an index of the cached collection, which records created here
+        are added to. Missing names are created concurrently, each while
+        holding a lock for its collection and name, and looked up again once
+        the lock is held, so concurrent callers ensuring the same name create
+        it only once. A create rejected because the name was taken meanwhile
+        (e.g. by another process) resolves to the record that took it.
+        
+        Args:
+            collection: Endpoint of the collection, e.g. /workspaces/1/tags
+            names: Names to find or create
+            load: Returns the (cached) records of the collection
+            create: Creates a record with the given name
+        
+        Returns:
+            {"name", "id", "created"} per distinct name in the order given,
+            or {"name", "error"} for names that could not be created
+        """
+        wanted: Dict[str, str] = {}
+        for name in names:
+            if name and name.strip():
+                wanted.setdefault(name.strip().casefold(), name.strip())
+        
+        async def index() -> Dict[str, Dict]:
+            records = await load() or []
+            built = self._named.get(collection)
+            if built is None or built[0] is not records:
+                built = self._named[collection] = (records, {})
+                for record in records:
+                    built[1].setdefault((record.get("name") or "").strip().casefold(), record)
+            return built[1]
+        
+        def found(record: Dict, created: bool = False) -> Dict:
+            return {"name": record["name"], "id": record["id"], "created": created}
+        
+        async def ensure(key: str, name: str) -> Dict:
+            lock_key = f"{collection}:{key}"
+            holder = self._name_locks.setdefault(lock_key, [asyncio.Lock(), 0])
+            holder[1] += 1
+            try:
+                async with holder[0]:
+                    record = self._named[collection][1].get(key)  # Created while we waited
+                    if record is not None:
+                        return found(record)
+                    try:
+                        record = await create(name)
+                    except httpx.HTTPStatusError as e:
+                        if e.response.status_code != 400:
+                            raise
+                        self._invalidate(collection)
+                        record = (await index()).get(key)
+                        if record is None:
+                            raise
+                        return found(record)
+                    self._named[collection][1][key] = record
+                    return found(record, created=True)
+            finally:
+                holder[1] -= 1
+                if not holder[1]:
+                    del self._name_locks[lock_key]
+        
+        known = await index()
+        missing = [(key, name) for key, name in wanted.items() if key not in known]
+        created = await asyncio.gather(*(ensure(key, name) for key, name in missing), return_exceptions=True)
+        
+        results: Dict[str, Dict] = {}
+        for (key, name), result in zip(missing, created):
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+            if isinstance(result, Exception):
+                logger.warning(f"Could not create {name!r} in {collection}: {result}")
+                result = {"name": name, "error": str(result)}
+            results[key] = result
+        return [results[key] if key in results else found(known[key]) for key in wanted]
+    
+    async def ensure_tags(self, workspace_id: int, names: List[str]) -> List[Dict]:
+        """Get or create tags by name (see _ensure_named)"""
+        return await self._ensure_named(
+            f"/workspaces/{workspace_id}/tags", names,
+            lambda: self.get_tags(workspace_id), lambda name: self.create_tag(workspace_id, name)
+        )
+    
+    async def ensure_clients(self, workspace_id: int, names: List[str]) -> List[Dict]:
+        """Get or create clients by name (see _ensure_named)"""
+        return await self._ensure_named(
+            f"/workspaces/{workspace_id}/clients", names,
+            lambda: self.get_clients(workspace_id), lambda name: self.create_client(workspace_id, name)
+        )
+    
+    async def ensure_projects(self, workspace_id: int, names: List[str], **kwargs) -> List[Dict]:
+        """Get or create projects by name; kwargs only apply to created projects"""
+        return await self._ensure_named(
+            f"/workspaces/{workspace_id}/projects", names,
+            lambda: self.get_projects(workspace_id), lambda name: self.create_project(workspace_id, name, **kwargs)
+        )
+    
     async def get_workspace_users(self, workspace_id: int) -> List[Dict]:
         """Get all users in a workspace"""
-        return await self._request("GET", f"/workspaces/{workspace_id}/users")
+        return await self._cached_get(f"/workspaces/{workspace_id}/users")
     
     async def get_organizations(self) -> List[Dict]:
         """Get user's organizations"""
-        return await self._request("GET", "/organizations")
+        return await self._cached_get("/organizations")
     
     # Bulk operations
     async def bulk_create_time_entries(self, workspace_id: int, time_entries: List[Dict]) -> List[Dict]:
         """Create multiple time entries at once"""
-        return await self._request("POST", f"/workspaces/{workspace_id}/time_entries", json=time_entries)
+        return self._index_entries(
+            await self._request("POST", f"/workspaces/{workspace_id}/time_entries", json=time_entries), written=True
+        )
     
-    async def bulk_update_time_entries(self, workspace_id: int, time_entry_ids: List[int], updates: Dict) -> Dict:
-        """Update multiple time entries at once"""
-        time_entry_ids_str = ",".join(map(str, time_entry_ids))
-        return await self._request("PATCH", f"/workspaces/{workspace_id}/time_entries/{time_entry_ids_str}", json=updates)
+    async def _bulk_request(self, method: str, workspace_id: int, time_entry_ids: List[int], **kwargs) -> Dict:
+        """Send a bulk time entry request in chunks of BULK_CHUNK_SIZE IDs"""
+        return await self._bulk_requests(method, workspace_id, [(time_entry_ids, kwargs)])
+    
+    async def _bulk_requests(
+        self, method: str, workspace_id: int, batches: List[Tuple[List[int], Dict[str, Any]]]
+    ) -> Dict:
+        """Send bulk time entry requests for batches of (IDs, request kwargs)
+        
+        Each batch is split into chunks of BULK_CHUNK_SIZE IDs. Chunks are
+        sent concurrently (bounded by admission control) and their
+        success/failure ID lists are merged. A chunk that still fails after
+        retries does not discard the others' results: its IDs are reported
+        under "failure" and the error under "errors". Only when every chunk
+        fails is the error raised.
+        """
+        chunks = [
+            (time_entry_ids[i:i + self.BULK_CHUNK_SIZE], kwargs)
+            for time_entry_ids, kwargs in batches
+            for i in range(0, len(time_entry_ids), self.BULK_CHUNK_SIZE)
+        ]
+        results = await asyncio.gather(*(
+            self._request(method, f"/workspaces/{workspace_id}/time_entries/{','.join(map(str, chunk))}", **kwargs)
+            for chunk, kwargs in chunks
+        ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        failed = [(chunk, result) for (chunk, _), result in zip(chunks, results) if isinstance(result, Exception)]
+        if len(failed) == len(results):
+            raise failed[0][1]
+        if len(results) == 1:
+            return results[0]
+        merged: Dict[str, List] = {"success": [], "failure": []}
+        for result in results:
+            if isinstance(result, dict):
+                merged["success"].extend(result.get("success") or [])
+                merged["failure"].extend(result.get("failure") or [])
+        if failed:
+            merged["errors"] = []
+            for chunk, error in failed:
+                logger.warning(f"Bulk {method} chunk of {len(chunk)} time entries failed: {error}")
+                merged["failure"].extend(chunk)
+                merged["errors"].append({"time_entry_ids": chunk, "error": str(error)})
+        return merged
+    
+    async def bulk_update_time_entries(
+        self, workspace_id: int, time_entry_ids: List[int], updates: Dict, force: bool = False
+    ) -> Dict:
+        """Update multiple time entries at once
+        
+        Entries this client just wrote as requested (see update_time_entry)
+        are not sent; they are reported under "elided", not "success". The
+        others are grouped by the fields that actually change for them, each
+        group sent as its own bulk PATCH, unless sending every changed field
+        to all of them takes fewer requests. force sends every field for
+        every entry.
+        """
+        known: Dict[int, Dict] = {}
+        if not force:
+            for time_entry_id in time_entry_ids:
+                entry = self._written_entry(workspace_id, time_entry_id)
+                if entry is not None:
+                    known[time_entry_id] = entry
+        skipped, groups = plan_bulk_update(time_entry_ids, updates, known, self.BULK_CHUNK_SIZE)
+        
+        def sent(changes: Dict, count: int) -> Tuple[int, int]:
+            """(fields, requests) of updating count entries with changes"""
+            return len(set(changes) - {"tag_action"}) * count, -(-count // self.BULK_CHUNK_SIZE)
+        
+        requested = sent(updates, len(time_entry_ids))
+        planned = [sent(changes, len(ids)) for changes, ids in groups]
+        self.elided["fields"] += requested[0] - sum(fields for fields, _ in planned)
+        self.elided["requests"] += requested[1] - sum(requests for _, requests in planned)
+        self.elided["entries"] += len(skipped)
+        if skipped:
+            logger.info(f"{len(skipped)} of {len(time_entry_ids)} time entries were just written as requested, not updating them")
+        if not groups:
+            return {"success": [], "failure": [], "elided": skipped}
+        
+        self.written.begin(entry_id for _, ids in groups for entry_id in ids)
+        result = None
+        try:
+            result = await self._bulk_requests(
+                "PATCH", workspace_id, [(ids, {"json": changes}) for changes, ids in groups]
+            )
+        finally:
+            # The response has no entries, so indexed copies are refreshed by the next fetch
+            self.entry_index.invalidate_coverage()
+            succeeded = set((result.get("success") or []) if isinstance(result, dict) else [])
+            for changes, ids in groups:
+                fields = {"workspace_id": workspace_id, **changes}
+                for entry_id in ids:
+                    self.written.finish(
+                        entry_id, fields if entry_id in succeeded else None, changes.get("tag_action")
+                    )
+        if skipped:
+            result = dict(result) if isinstance(result, dict) else {"success": [], "failure": []}
+            result["elided"] = skipped
+        return result
     
     async def bulk_delete_time_entries(self, workspace_id: int, time_entry_ids: List[int]) -> Dict:
         """Delete multiple time entries at once"""
-        time_entry_ids_str = ",".join(map(str, time_entry_ids))
-        return await self._request("DELETE", f"/workspaces/{workspace_id}/time_entries/{time_entry_ids_str}")
+        result = await self._bulk_request("DELETE", workspace_id, time_entry_ids)
+        failed = set((result.get("failure") or []) if isinstance(result, dict) else [])
+        deleted = [entry_id for entry_id in time_entry_ids if entry_id not in failed]
+        self.entry_index.remove(deleted)
+        self.written.forget(deleted)
+        return result
     
     # Project tasks (if enabled)
     async def get_project_tasks(self, workspace_id: int, project_id: int) -> List[Dict]:
-        """Get tasks for a project (only if tasks are enabled for the project)"""
+        """Get tasks for a project (only if tasks are enabled for the project)
+        
+        Projects without tasks answer 404; that answer is cached like a task
+        list so task-less projects are not asked again until the TTL expires.
+        """
+        endpoint = f"/workspaces/{workspace_id}/projects/{project_id}/tasks"
+        
+        async def load() -> List[Dict]:
+            try:
+                return await self._request("GET", endpoint)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 404:
+                    return []  # Tasks not enabled for this project
+                raise
+        
+        return await self._cached(endpoint, load)
+    
+    async def get_workspace_tasks(self, workspace_id: int) -> List[Dict]:
+        """Get the tasks of every project in a workspace
+        
+        Uses the workspace-level tasks endpoint, falling back to fetching the
+        projects' tasks concurrently where that endpoint is not available.
+        """
+        return await self._cached(
+            f"/workspaces/{workspace_id}/tasks", lambda: self._load_workspace_tasks(workspace_id)
+        )
+    
+    async def _load_workspace_tasks(self, workspace_id: int) -> List[Dict]:
+        endpoint = f"/workspaces/{workspace_id}/tasks"
         try:
-            return await self._request("GET", f"/workspaces/{workspace_id}/projects/{project_id}/tasks")
+            tasks: List[Dict] = []
+            for page in itertools.count(1):
+                result = await self._request(
+                    "GET", endpoint, params={"page": page, "per_page": self.TASK_PAGE_SIZE}
+                )
+                if isinstance(result, list):
+                    return result  # Unpaginated answer
+                data = result.get("data") or []
+                tasks.extend(data)
+                if len(data) < self.TASK_PAGE_SIZE:
+                    return tasks
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return []  # Tasks not enabled for this project
-            raise
+            if e.response.status_code not in (400, 403, 404):
+                raise
+            logger.info(f"Workspace tasks endpoint unavailable for {workspace_id}, fetching tasks per project")
+        
+        projects = await self.get_projects(workspace_id)
+        semaphore = asyncio.Semaphore(self.TASK_FAN_OUT)
+        
+        async def project_tasks(project_id: int) -> List[Dict]:
+            async with semaphore:
+                return await self.get_project_tasks(workspace_id, project_id)
+        
+        results = await asyncio.gather(*(project_tasks(p["id"]) for p in projects or []))
+        return [task for project in results for task in project]
     
     async def create_project_task(self, workspace_id: int, project_id: int, name: str) -> Dict:
         """Create a task for a project"""
         data = {"name": name}
-        return await self._request("POST", f"/workspaces/{workspace_id}/projects/{project_id}/tasks", json=data)
+        result = await self._request("POST", f"/workspaces/{workspace_id}/projects/{project_id}/tasks", json=data)
+        self._invalidate(f"/workspaces/{workspace_id}/tasks")
+        return result
+    
+    async def ensure_project_tasks(self, workspace_id: int, project_id: int, names: List[str]) -> List[Dict]:
+        """Get or create a project's tasks by name (see _ensure_named)"""
+        return await self._ensure_named(
+            f"/workspaces/{workspace_id}/projects/{project_id}/tasks", names,
+            lambda: self.get_project_tasks(workspace_id, project_id),
+            lambda name: self.create_project_task(workspace_id, project_id, name)
+        )
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Close the HTTP client if this instance owns it"""
+        self.directory.close()
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,159 @@
+"""
+Lightweight tracing for MCP tool calls and Toggl API requests
+
+Each tool call opens a root span whose trace ID doubles as the call ID;
+helpers and upstream requests made while handling it become child spans.
+Finished spans go to an exporter (see exporters): a local JSON Lines file
+or an OTLP/HTTP collector. With no exporter configured, tracer.span()
+returns a shared no-op object and tracing costs one attribute check per span.
+"""
+
+import functools
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("toggl_current_span", default=None)
+
+
+def current_call_id() -> Optional[str]:
+    """Trace ID of the tool call running in the current task, if tracing"""
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+class Span:
+    """A timed operation within a trace, used as a context manager"""
+
+    __slots__ = (
+        "tracer", "name", "attributes", "trace_id", "span_id", "parent",
+        "start_ns", "child_ns", "error", "_token"
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], root: bool):
+        parent = None if root else _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.child_ns = 0
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any):
+        """Set an attribute on the span"""
+        self.attributes[key] = value
+
+    def fail(self, message: str):
+        """Mark the span as failed"""
+        self.error = message
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        duration = end_ns - self.start_ns
+        if self.parent:
+            self.parent.child_ns += duration
+        if exc_type is not None and self.error is None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer._export({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": end_ns,
+            "duration_ms": duration / 1e6,
+            # Time not covered by child spans: local processing
+            "self_ms": max(0, duration - self.child_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        })
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled"""
+
+    trace_id = None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def fail(self, message: str):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured exporter"""
+
+    def __init__(self):
+        self.exporter: Optional[Any] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, root: bool = False, **attributes) -> Any:
+        """Open a span as a child of the current one
+
+        Args:
+            name: Operation name
+            root: Start a new trace (a new call ID) instead of joining the current one
+            **attributes: Span attributes
+        """
+        if self.exporter is None:
+            return _NOOP_SPAN
+        return Span(self, name, attributes, root)
+
+    def _export(self, record: Dict[str, Any]):
+        try:
+            self.exporter.export(record)
+        except Exception as e:
+            logger.warning(f"Span export failed: {e!r}")
+
+    def configure(self, exporter: Optional[Any]):
+        """Start sending spans to exporter (None disables tracing)"""
+        self.exporter = exporter
+
+    async def close(self):
+        """Flush and close the exporter"""
+        exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            await exporter.close()
+
+
+# Process-wide tracer, disabled until configured
+tracer = Tracer()
+
+
+def traced(name: str) -> Callable:
+    """Decorator wrapping a synchronous function in a span"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if tracer.exporter is None:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,179 @@
+"""
+Argument coercion and validation for tools, compiled from their signatures
+
+MCP clients send IDs as strings ("123") and booleans as strings or numbers,
+so every tool used to convert its own arguments. compile_validator turns a
+tool's signature into a table of per-argument coercers once, and the
+resulting validator converts and checks a call's arguments in one pass.
+
+Tools that write to the API also name their endpoint in api_params.API_ENDPOINTS.
+The documented field types (TimeEntryParams etc.) then take precedence over
+the tool's annotations, e.g. tag_ids items become ints, and the endpoint's
+required fields must be present, so a malformed payload is rejected before
+any request is sent instead of costing a round trip and a 400.
+"""
+
+import inspect
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, get_args, get_origin, get_type_hints
+
+from .api_params import API_ENDPOINTS, ClientParams, ProjectParams, TagParams, TaskParams, TimeEntryParams
+
+Coercer = Callable[[Any], Any]
+
+# Field types of each API resource
+RESOURCE_PARAMS = {
+    "time_entries": TimeEntryParams,
+    "projects": ProjectParams,
+    "tags": TagParams,
+    "clients": ClientParams,
+    "tasks": TaskParams,
+}
+
+# Path parameters, which the TypedDicts leave out
+ID_FIELDS = {"time_entry_id": int, "project_id": int, "tag_id": int, "client_id": int, "task_id": int}
+
+# Fields accepting only some values
+FIELD_CHOICES = {"tag_action": ("add", "replace")}
+
+# Filled in from the session or server default when not given
+DEFAULTED_FIELDS = {"workspace_id"}
+
+
+class ValidationError(ValueError):
+    """Tool arguments rejected before any request is sent"""
+
+
+def parse_bool(value: Any) -> bool:
+    """Convert a bool, number or string such as "yes"/"false"/"1" to bool"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lower_val = value.strip().lower()
+        if lower_val in ("true", "1", "yes", "y", "on"):
+            return True
+        if lower_val in ("false", "0", "no", "n", "off", ""):
+            return False
+        try:
+            return bool(int(lower_val))
+        except ValueError:
+            raise ValueError(f"Cannot convert '{value}' to boolean")
+    return bool(value)
+
+
+def parse_int(value: Any) -> int:
+    """Convert an int or integer string to int"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return int(value.strip())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError(f"expected an integer, got {value!r}")
+
+
+def parse_float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"expected a number, got {value!r}")
+    return float(value)
+
+
+def _list_of(item: Optional[Coercer]) -> Coercer:
+    def coerce(value: Any) -> List[Any]:
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"expected a list, got {value!r}")
+        return [item(v) for v in value] if item else list(value)
+    return coerce
+
+
+def _choice(coerce: Optional[Coercer], choices: Tuple[str, ...]) -> Coercer:
+    def check(value: Any) -> Any:
+        value = coerce(value) if coerce else value
+        if value not in choices:
+            raise ValueError(f"must be one of {', '.join(choices)}, got {value!r}")
+        return value
+    return check
+
+
+def coercer_for(annotation: Any) -> Optional[Coercer]:
+    """Coercer for values of annotation, or None when values are used as given
+
+    Unions of a type with str (e.g. Union[int, str], the form tools use to
+    accept IDs sent as strings) coerce to that type; bool wins over int.
+    """
+    origin = get_origin(annotation)
+    if origin is Union:
+        members = {arg for arg in get_args(annotation) if arg is not type(None)}
+        for target, coerce in ((bool, parse_bool), (int, parse_int), (float, parse_float)):
+            if target in members:
+                return coerce
+        lists = [arg for arg in members if get_origin(arg) in (list, List)]
+        return coercer_for(lists[0]) if len(members) == 1 and lists else None
+    if origin in (list, List):
+        args = get_args(annotation)
+        return _list_of(coercer_for(args[0]) if args else None)
+    return {bool: parse_bool, int: parse_int, float: parse_float}.get(annotation)
+
+
+def endpoint_fields(endpoint: str) -> Tuple[List[str], Dict[str, Any]]:
+    """Required fields and field types of an API_ENDPOINTS entry such as "time_entries.create"
+
+    Raises:
+        KeyError: If the endpoint is not documented
+    """
+    resource, action = endpoint.split(".")
+    definition = API_ENDPOINTS[resource][action]
+    types: Dict[str, Any] = dict(ID_FIELDS)
+    types.update(get_type_hints(RESOURCE_PARAMS[resource]))
+    fields = set(definition["required"]) | set(definition["optional"])
+    return list(definition["required"]), {name: types[name] for name in fields if name in types}
+
+
+Validator = Callable[[Tuple[Any, ...], Dict[str, Any]], Dict[str, Any]]
+
+
+def compile_validator(fn: Callable[..., Any], endpoint: Optional[str] = None) -> Validator:
+    """Build the argument validator of a tool
+
+    Args:
+        fn: Tool function; its annotations give the coercion of each argument
+        endpoint: API_ENDPOINTS entry the tool writes to, whose field types
+                  and required fields apply to arguments of the same name
+
+    Returns:
+        validate(args, kwargs) returning the coerced keyword arguments.
+        It raises ValidationError naming the first invalid or missing argument.
+    """
+    parameters = list(inspect.signature(fn).parameters)
+    hints = get_type_hints(fn)
+    required: List[str] = []
+    types: Dict[str, Any] = {}
+    if endpoint:
+        endpoint_required, types = endpoint_fields(endpoint)
+        required = [name for name in endpoint_required if name in parameters and name not in DEFAULTED_FIELDS]
+
+    coercers: List[Tuple[str, Coercer]] = []
+    for name in parameters:
+        coerce = coercer_for(types[name]) if name in types else None
+        if coerce is None:
+            coerce = coercer_for(hints.get(name))
+        if name in FIELD_CHOICES:
+            coerce = _choice(coerce, FIELD_CHOICES[name])
+        if coerce is not None:
+            coercers.append((name, coerce))
+
+    def validate(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        arguments = dict(zip(parameters, args)) if args else {}
+        arguments.update(kwargs)
+        for name, coerce in coercers:
+            value = arguments.get(name)
+            if value is not None:
+                try:
+                    arguments[name] = coerce(value)
+                except (TypeError, ValueError) as e:
+                    raise ValidationError(f"Invalid {name}: {e}") from None
+        for name in required:
+            if arguments.get(name) is None:
+                raise ValidationError(f"Missing required argument: {name}")
+        return arguments
+
+    return validate